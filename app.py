@@ -1,30 +1,90 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import copy
+import functools
 import json
 import os
 import sys
 from pathlib import Path
-import webview
 
 APP_DIR = Path(__file__).parent / "app"
 if str(APP_DIR) not in sys.path:
     sys.path.insert(0, str(APP_DIR))
 
-from core_engine.session_manager import SessionManager
+from core_engine.session_manager import SessionManager, client_session_state
 from core_engine.initial_state import InitialStateGenerator
 from core_engine.ledger import Ledger
 from core_engine.facility_manager import FacilityManager
 from core_engine.stats_registry import StatsRegistryLoader
 from core_engine.audit_log import AuditLog
-from core_engine.logger import setup_logger
+from core_engine.audit_archive import ARCHIVE_KEYS
+from core_engine.logger import apply_log_config, setup_logger
 from core_engine.pack_validator import PackValidator
 from core_engine.config_manager import ConfigManager
+from core_engine.state_delta import StateDelta
+from core_engine.session_guard import SessionGuard
+from core_engine.perf_stats import PERF, instrument_public_methods
+from core_engine.startup import LazyServices, StartupTimeline
 
 # Initialisiere Logger
 logger = setup_logger("app")
+STARTUP = StartupTimeline(logger, _STARTED)
+STARTUP.mark("modules imported")
+
+BATCH_EXCLUDED_METHODS = {"execute_batch", "get_session_delta"}
+PERF_UNTRACKED_METHODS = {"get_perf_stats", "set_perf_stats", "get_startup_timeline"}
+
+
+def _is_failed_result(result) -> bool:
+    return isinstance(result, dict) and (result.get("success") is False or bool(result.get("error")))
+
+
+def _client_snapshot(session_state: dict) -> dict:
+    """
+    Independent copy of the client view of a session. Call with the session lock held:
+    pywebview serializes return values after the lock is released, while writers may run.
+    """
+    return copy.deepcopy(client_session_state(session_state))
+
+
+def _session_reader(method):
+    """Run under the shared session lock (read-only calls may overlap)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._session_guard.read():
+            return method(self, *args, **kwargs)
+    wrapper.session_access = "read"
+    return wrapper
+
+
+def _session_writer(method):
+    """Run under the exclusive session lock; writers run in call order."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._session_guard.write():
+            return method(self, *args, **kwargs)
+    wrapper.session_access = "write"
+    return wrapper
+
+
+def _service(name: str) -> property:
+    """Subsystem built by the startup thread (or on first use); callers wait until it exists."""
+    return property(lambda self: self._services.get(name))
 
 class Api:
     """API für die Kommunikation zwischen Frontend und Backend"""
+
+    _config_manager = _service("config_manager")
+    _ledger = _service("ledger")
+    _facility_manager = _service("facility_manager")
+    _session_manager = _service("session_manager")
+    _stats_registry = _service("stats_registry")
+    _audit_log = _service("audit_log")
+    _pack_validator = _service("pack_validator")
     
-    def __init__(self):
+    def __init__(self, background_startup: bool = True):
         logger.info("Initializing Api...")
         self.data_dir = str(Path(__file__).parent / "data" / "facilities")
         self.custom_dir = str(Path(__file__).parent / "custom_packs")
@@ -32,21 +92,39 @@ class Api:
         
         # Slice 1: Session Management
         # WICHTIG: Nicht als self.xxx speichern - pywebview kann Path-Objekte nicht serialisieren!
-        self._session_manager = SessionManager(self.sessions_dir)
+        # Pack-reading subsystems are built lazily (in this order on the startup thread).
+        root_dir = Path(__file__).parent
+        self._services = LazyServices(STARTUP)
+        self._services.register("config_manager", self._build_config_manager)
+        self._services.register("ledger", lambda: Ledger(root_dir, self._config_manager))
+        self._services.register("facility_manager", lambda: FacilityManager(root_dir, self._ledger, self._config_manager))
+        self._services.register("session_manager", lambda: SessionManager(self.sessions_dir, self._config_manager))
+        self._services.register("stats_registry", lambda: StatsRegistryLoader(root_dir))
+        self._services.register("audit_log", lambda: AuditLog(self._config_manager))
+        self._services.register("pack_validator", lambda: PackValidator(root_dir, self._config_manager))
         self._initial_state_gen = InitialStateGenerator()
-        self._config_manager = ConfigManager(Path(__file__).parent)
-        self._ledger = Ledger(Path(__file__).parent, self._config_manager)
-        self._stats_registry = StatsRegistryLoader(Path(__file__).parent)
-        self._facility_manager = FacilityManager(Path(__file__).parent, self._ledger, self._config_manager)
-        self._pack_validator = PackValidator(Path(__file__).parent, self._config_manager)
-        self._audit_log = AuditLog(self._config_manager)
         self._ui_prefs_path = Path(__file__).parent / "data" / "config" / "ui_prefs.json"
         self._ui_prefs = self._load_ui_prefs()
+        self._state_delta = StateDelta(client_session_state)
+        # pywebview calls the js_api from worker threads: see _session_reader / _session_writer.
+        self._session_guard = SessionGuard()
+        self._logs_dir = str(Path(__file__).parent / "data" / "logs")
         
         # Current loaded session (in-memory)
         self.current_session = None
+        if background_startup:
+            self._services.start_background(lambda: STARTUP.mark("all subsystems ready"))
         logger.info("Api initialized successfully")
 
+    def _build_config_manager(self) -> ConfigManager:
+        config_manager = ConfigManager(Path(__file__).parent)
+        snapshot = config_manager.get_config_snapshot()
+        apply_log_config(snapshot)
+        self._apply_perf_config(snapshot)
+        config_manager.subscribe(apply_log_config, sections=["internal_settings"])
+        config_manager.subscribe(self._apply_perf_config, sections=["internal_settings"])
+        return config_manager
+
     def _load_ui_prefs(self) -> dict:
         try:
             if self._ui_prefs_path.exists():
@@ -64,12 +142,18 @@ class Api:
         except Exception as e:
             logger.warning(f"Failed to save ui_prefs.json: {e}")
 
+    def _apply_perf_config(self, config: dict, changed=None) -> None:
+        internal = config.get("internal_settings") if isinstance(config, dict) else None
+        if not isinstance(internal, dict):
+            internal = {}
+        PERF.configure(internal.get("perf_stats") is True, self._logs_dir, internal.get("perf_stats_dump_seconds", 0))
+
     def _ensure_treasury_keys(self, session_state: dict) -> None:
         if not isinstance(session_state, dict):
             return
         bastion = session_state.setdefault("bastion", {})
         wallet = bastion.setdefault("treasury", {})
-        currency = self._config_manager.get_config().get("currency", {})
+        currency = self._config_manager.get_config_snapshot().get("currency", {})
         types = currency.get("types") if isinstance(currency, dict) else []
         if not isinstance(types, list):
             return
@@ -114,6 +198,7 @@ class Api:
     
     # ===== SLICE 1: SESSION LIFECYCLE =====
     
+    @_session_writer
     def create_session(
         self,
         session_name: str,
@@ -174,7 +259,7 @@ class Api:
             return {
                 "success": success,
                 "message": message,
-                "session_state": state if success else None
+                "session_state": _client_snapshot(state) if success else None
             }
         
         except Exception as e:
@@ -184,6 +269,7 @@ class Api:
                 "session_state": None
             }
     
+    @_session_writer
     def save_session(self, session_state: dict = None) -> dict:
         """
         Speichere die aktuelle Session (oder übergebene Session).
@@ -198,12 +284,24 @@ class Api:
                 return {"success": False, "message": "No session to save"}
             self._ensure_treasury_base_from_wallet(state_to_save)
             self._ensure_treasury_base(state_to_save)
+            handover = self.current_session is not None and state_to_save is not self.current_session
+            if handover:
+                # Trimmed audit entries are archived from the server's copy, not the client's.
+                for key in ARCHIVE_KEYS:
+                    state_to_save.pop(key, None)
+                    if key in self.current_session:
+                        state_to_save[key] = self.current_session.pop(key)
             success, message = self._session_manager.create_session(state_to_save)
+            if handover:
+                for key in ARCHIVE_KEYS:
+                    if key in state_to_save:
+                        self.current_session[key] = state_to_save.pop(key)
             return {"success": success, "message": message}
         
         except Exception as e:
             return {"success": False, "message": f"Error saving session: {str(e)}"}
     
+    @_session_writer
     def load_session(self, filename: str) -> dict:
         """
         Lade eine Session aus Datei.
@@ -221,7 +319,7 @@ class Api:
             return {
                 "success": success,
                 "message": message,
-                "session_state": session_state
+                "session_state": _client_snapshot(session_state) if success else session_state
             }
         
         except Exception as e:
@@ -231,6 +329,7 @@ class Api:
                 "session_state": None
             }
 
+    @_session_writer
     def load_latest_session(self) -> dict:
         """
         Load most recently modified session file.
@@ -251,7 +350,7 @@ class Api:
             return {
                 "success": success,
                 "message": message,
-                "session_state": session_state,
+                "session_state": _client_snapshot(session_state) if success else session_state,
                 "filename": filename,
             }
         except Exception as e:
@@ -262,6 +361,7 @@ class Api:
                 "filename": None,
             }
     
+    @_session_reader
     def list_sessions(self) -> dict:
         """
         Liste alle verfügbaren Sessions auf.
@@ -284,21 +384,77 @@ class Api:
                 "message": f"Error listing sessions: {str(e)}"
             }
     
+    @_session_writer
     def apply_effects(self, effects: list, context: dict = None) -> dict:
         """
         Apply ledger effects to current session.
 
         Returns:
-            {success: bool, errors: list, entries: list, session_state: dict}
+            {success: bool, errors: list, entries: list}
         """
         try:
             if not self.current_session:
                 return {"success": False, "errors": ["No session loaded"], "entries": []}
             result = self._ledger.apply_effects(self.current_session, effects, context)
+            # The frontend syncs through get_session_delta; don't ship the whole session back.
+            result.pop("session_state", None)
             return result
         except Exception as e:
             return {"success": False, "errors": [str(e)], "entries": []}
 
+    @_session_reader
+    def get_audit_log(
+        self,
+        turn_from: int = None,
+        turn_to: int = None,
+        source_type: str = None,
+        page: int = 0,
+        page_size: int = 100,
+        event_type: str = None,
+        source_id: str = None,
+    ) -> dict:
+        """
+        Page through the whole audit history (archived + current entries), oldest first.
+        Filters: inclusive turn range, event_type, source_type, source_id.
+
+        Returns:
+            {success, entries, page, page_size, total, pages}
+        """
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded", "entries": []}
+            return self._session_manager.query_audit_log(
+                self.current_session, turn_from, turn_to, source_type, page, page_size, event_type, source_id
+            )
+        except Exception as e:
+            return {"success": False, "message": str(e), "entries": []}
+
+    @_session_reader
+    def get_event_history(
+        self,
+        event_id: str = None,
+        turn_from: int = None,
+        turn_to: int = None,
+        page: int = 0,
+        page_size: int = 100,
+        newest_first: bool = False,
+    ) -> dict:
+        """
+        Page through the event history, filtered by event_id and turn range (inclusive).
+
+        Returns:
+            {success, entries, page, page_size, total, pages}
+        """
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded", "entries": []}
+            return self._session_manager.query_event_history(
+                self.current_session, event_id, turn_from, turn_to, page, page_size, newest_first
+            )
+        except Exception as e:
+            return {"success": False, "message": str(e), "entries": []}
+
+    @_session_writer
     def add_audit_entry(self, event: dict) -> dict:
         """
         Add a custom audit log entry.
@@ -313,6 +469,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def add_build_facility(self, facility_id: str, allow_negative: bool = False) -> dict:
         """Start building a facility by id."""
         try:
@@ -322,6 +479,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def add_upgrade_facility(self, facility_id: str, allow_negative: bool = False) -> dict:
         """Start upgrading a facility by id."""
         try:
@@ -331,6 +489,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def demolish_facility(self, facility_id: str) -> dict:
         """Demolish a facility and refund a portion of build costs."""
         try:
@@ -340,6 +499,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def set_facility_owner(self, facility_id: str, player_id: str) -> dict:
         """Assign or change facility owner."""
         try:
@@ -349,6 +509,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_reader
     def get_facility_states(self) -> dict:
         """Return resolved facility states."""
         try:
@@ -359,6 +520,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e), "states": []}
 
+    @_session_writer
     def advance_turn(self) -> dict:
         """Advance turn and resolve build/upgrade completion."""
         try:
@@ -368,6 +530,29 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
+    def advance_turns(self, turns: int) -> dict:
+        """Fast-forward several turns, stopping early when an order becomes ready."""
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            return self._facility_manager.advance_turns(self.current_session, turns)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_writer
+    def preview_next_turn(self) -> dict:
+        """Dry run of the next turn (advance + roll/evaluate) without changing the session."""
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            # The session is left untouched, but the dry run swaps the engine's shared
+            # scheduler/index bindings and the random state, so no reader may run alongside.
+            return self._facility_manager.preview_next_turn(self.current_session)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_writer
     def start_order(self, facility_id: str, npc_id: str, order_id: str) -> dict:
         """Start an order for a specific NPC in a facility."""
         try:
@@ -377,6 +562,47 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
+    def queue_order(self, facility_id: str, order_id: str, npc_id: str = None) -> dict:
+        """Queue an order; it starts automatically once an NPC slot is free."""
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            return self._facility_manager.queue_order(self.current_session, facility_id, order_id, npc_id)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_writer
+    def remove_queued_order(self, facility_id: str, index: int) -> dict:
+        """Remove an entry from a facility's order queue."""
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            return self._facility_manager.remove_queued_order(self.current_session, facility_id, index)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_reader
+    def plan_order_assignments(self, include_reserve: bool = True, per_turn: bool = False) -> dict:
+        """Propose NPC/order pairs for all free slots (expected-value optimal)."""
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            return self._facility_manager.plan_order_assignments(self.current_session, include_reserve, per_turn)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_writer
+    def apply_order_plan(self, assignments: list) -> dict:
+        """Start the orders of a plan returned by plan_order_assignments."""
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            return self._facility_manager.apply_order_plan(self.current_session, assignments)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_writer
     def lock_order_roll(self, facility_id: str, order_id: str, roll_value: int = None, auto: bool = False) -> dict:
         """Lock a roll for a ready order."""
         try:
@@ -386,6 +612,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def evaluate_order(self, facility_id: str, order_id: str) -> dict:
         """Evaluate a ready order and apply effects."""
         try:
@@ -395,6 +622,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def evaluate_ready_orders(self) -> dict:
         """Evaluate all ready orders with locked rolls."""
         try:
@@ -404,6 +632,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def roll_and_evaluate_ready_orders(self) -> dict:
         """Auto-roll and evaluate all ready orders."""
         try:
@@ -413,6 +642,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def hire_npc(self, name: str, profession: str, level: int, upkeep: dict, facility_id: str = None) -> dict:
         """Hire an NPC and optionally assign to a facility."""
         try:
@@ -422,6 +652,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def move_npc(self, npc_id: str, target_facility_id: str = None) -> dict:
         """Move NPC to another facility or to reserve."""
         try:
@@ -431,6 +662,7 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
     def fire_npc(self, npc_id: str) -> dict:
         """Fire an NPC."""
         try:
@@ -440,6 +672,20 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    @_session_writer
+    def apply_npc_batch(self, operations: list) -> dict:
+        """
+        Hire, move or fire several NPCs in one call (all or nothing).
+        operations: [{action: "hire", name, profession, level, upkeep, facility_id?},
+                     {action: "move", npc_id, facility_id?}, {action: "fire", npc_id}]
+        """
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            return self._facility_manager.apply_npc_batch(self.current_session, operations)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
     # ===== DEBUGGING & LOGGING =====
     
     def log_client(self, level: str, message: str) -> dict:
@@ -465,11 +711,82 @@ class Api:
             logger.error(f"Error logging client message: {str(e)}")
             return {"success": False}
     
+    @_session_reader
     def get_current_session(self) -> dict:
         """
         Gebe die aktuell geladene Session zurueck.
         """
-        return self.current_session or {}
+        return _client_snapshot(self.current_session) if self.current_session else {}
+
+    @_session_reader
+    def get_session_delta(self, since_version: int = None) -> dict:
+        """
+        JSON-Patch style changes since the state version the frontend holds
+        (full session_state when versions diverge).
+        """
+        try:
+            if not self.current_session:
+                return {"success": False, "message": "No session loaded"}
+            # Snapshot under the read lock, see _client_snapshot.
+            return copy.deepcopy(self._state_delta.delta(self.current_session, since_version))
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_session_writer
+    def execute_batch(self, operations: list, stop_on_error: bool = True, atomic: bool = False, since_version: int = None) -> dict:
+        """
+        Run several Api calls in one round trip: operations = [{"method": str, "params": dict|list}].
+        atomic restores the in-memory session if any operation fails (files already written stay).
+        With since_version the result carries the session delta after the last operation.
+        """
+        try:
+            if not isinstance(operations, list) or not operations:
+                return {"success": False, "message": "Operations must be a non-empty list"}
+            backup = copy.deepcopy(self.current_session) if atomic else None
+            results = []
+            failed_index = None
+            for idx, operation in enumerate(operations):
+                result = self._run_batch_operation(operation)
+                results.append(result)
+                if _is_failed_result(result) and failed_index is None:
+                    failed_index = idx
+                    if stop_on_error or atomic:
+                        break
+            rolled_back = atomic and failed_index is not None
+            if rolled_back:
+                # A new session object: engine caches keyed on the session identity rebuild for it.
+                self.current_session = backup
+            response = {
+                "success": failed_index is None,
+                "message": f"{len(results)} operations run" if failed_index is None else f"Operation {failed_index} failed",
+                "results": results,
+                "failed_index": failed_index,
+                "rolled_back": rolled_back,
+            }
+            if since_version is not None and self.current_session:
+                response["state"] = self.get_session_delta(since_version)
+            return response
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    def _run_batch_operation(self, operation: dict):
+        if not isinstance(operation, dict):
+            return {"success": False, "message": "Operation must be an object"}
+        method = operation.get("method")
+        if not isinstance(method, str) or method.startswith("_") or method in BATCH_EXCLUDED_METHODS:
+            return {"success": False, "message": f"Method not allowed in batch: {method}"}
+        handler = getattr(self, method, None)
+        if not callable(handler):
+            return {"success": False, "message": f"Unknown method: {method}"}
+        params = operation.get("params")
+        try:
+            if isinstance(params, dict):
+                return handler(**params)
+            if isinstance(params, list):
+                return handler(*params)
+            return handler()
+        except Exception as e:
+            return {"success": False, "message": str(e)}
 
     def get_ui_prefs(self) -> dict:
         """
@@ -607,21 +924,21 @@ class Api:
         except Exception as e:
             return {"error": str(e)}
 
+    @_session_writer
     def save_settings(self, settings: dict) -> dict:
         """
         Validate and persist settings.json.
         """
         try:
             result = self._config_manager.save_settings(settings or {})
-            if result.get("success"):
-                self._ledger.reload_config()
-                self._facility_manager.reload_config()
-                if self.current_session:
-                    self._ensure_treasury_keys(self.current_session)
+            # Ledger and FacilityManager follow config changes through their subscriptions.
+            if result.get("success") and self.current_session:
+                self._ensure_treasury_keys(self.current_session)
             return result
         except Exception as e:
             return {"success": False, "errors": [str(e)], "warnings": []}
 
+    @_session_writer
     def save_formula_inputs(self, facility_id: str, order_id: str, trigger_id: str, inputs: dict) -> dict:
         """
         Save formula inputs for a ready order.
@@ -635,6 +952,36 @@ class Api:
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    def get_perf_stats(self, reset: bool = False) -> dict:
+        """
+        Per-method call counts, latency percentiles (ms), sampled response sizes and failures,
+        plus engine phase timings. reset starts a new measuring window.
+        """
+        try:
+            return {"success": True, **PERF.snapshot(reset)}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    def get_startup_timeline(self) -> dict:
+        """
+        Startup marks (ms since process start) and which subsystems are built.
+        """
+        return {
+            "success": True,
+            "marks": STARTUP.marks(),
+            "ready": {name: self._services.is_ready(name) for name in self._services.names()},
+        }
+
+    def set_perf_stats(self, enabled: bool, dump_seconds: int = 0) -> dict:
+        """
+        Switch instrumentation on/off at runtime; dump_seconds > 0 writes data/logs/perf_stats.json periodically.
+        """
+        try:
+            PERF.configure(bool(enabled), self._logs_dir, dump_seconds)
+            return {"success": True, "enabled": PERF.enabled}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
     # ===== SLICE 2: PACK VALIDATION =====
 
     def validate_packs(self) -> dict:
@@ -681,6 +1028,15 @@ class Api:
         except Exception as e:
             return {"error": str(e)}
     
+    def get_catalog_bundle(self, etag: str = None, slim: bool = False) -> dict:
+        """
+        Whole facility catalog and formula registry in one call ({unchanged: true} if etag matches).
+        """
+        try:
+            return self._facility_manager.get_catalog_bundle(etag, slim)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
     def get_facilities(self):
         """Gebe Liste aller verfügbaren Facilities"""
         facilities = []
@@ -704,9 +1060,16 @@ class Api:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+instrument_public_methods(Api, _is_failed_result, skip=PERF_UNTRACKED_METHODS)
+
+
 def main():
-    # API-Instanz
+    # Lazy import: rpc_server.py uses Api without a GUI.
+    import webview
+
+    # API-Instanz (subsystems keep loading in the background)
     api = Api()
+    STARTUP.mark("Api constructed")
     
     # HTML-Datei
     html_file = Path(__file__).parent / "app" / "html" / "index.html"
@@ -721,6 +1084,10 @@ def main():
         resizable=True,
         fullscreen=False,
     )
+    STARTUP.mark("window created")
+    events = getattr(window, "events", None)
+    if events is not None:
+        events.loaded += lambda: STARTUP.mark("window loaded")
     
     # Starten
     webview.start(debug=True)
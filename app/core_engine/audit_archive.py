@@ -0,0 +1,258 @@
+"""
+Append-only archive of trimmed audit entries, next to the session file.
+
+AuditLog parks entries it trims in session_state[PENDING_KEY]; SessionManager hands them to
+append() on the next save. session_state[ARCHIVED_KEY] counts the archive entries the session
+already accounts for, so a pending list restored by a rollback (or left in a session file
+that was not written after its archive was) is not archived twice. Entries are written in blocks of BLOCK_ENTRIES JSON lines to
+<stem>.audit.jsonl (or as one gzip member per block to <stem>.audit.jsonl.gz). <stem>.audit.idx
+is the sparse index: one JSON line per block with file, offset, length, count, min/max turn
+and counts per event_type / source_type / source_id, so queries skip or count whole blocks
+without reading them.
+"""
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .history_index import DEFAULT_PAGE_SIZE, normalize_page
+
+PENDING_KEY = "_audit_archive_pending"
+ARCHIVED_KEY = "_audit_archived_through"
+ARCHIVE_KEYS = (PENDING_KEY, ARCHIVED_KEY)
+BLOCK_ENTRIES = 256
+COUNTED_FIELDS = ("event_type", "source_type", "source_id")
+
+
+class AuditArchive:
+    def __init__(self, sessions_dir: Any) -> None:
+        self._dir = Path(sessions_dir)
+        self._lock = threading.Lock()
+        self._index_cache: Dict[str, Tuple[int, List[Dict[str, Any]]]] = {}
+
+    def append(
+        self,
+        session_filename: str,
+        entries: List[Dict[str, Any]],
+        compress: bool = False,
+        start: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Append entries (oldest first) to the archive of a session file. entries[i] belongs at
+        archive position start + i; positions the archive already holds are skipped (None: all
+        entries are new). Returns (entries written, archive position after the last entry).
+        """
+        stem = Path(session_filename).stem
+        data_name = f"{stem}.audit.jsonl.gz" if compress else f"{stem}.audit.jsonl"
+        index_lines: List[str] = []
+        with self._lock:
+            archived = _archived(self._load_index(self._index_path(session_filename)))
+            if start is None or start > archived:
+                start = archived
+            end = start + len(entries)
+            entries = [e for e in entries[archived - start:] if isinstance(e, dict)]
+            if not entries:
+                return 0, end
+            with open(self._dir / data_name, "ab") as data_file:
+                offset = data_file.tell()
+                for first in range(0, len(entries), BLOCK_ENTRIES):
+                    block = entries[first:first + BLOCK_ENTRIES]
+                    payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in block).encode("utf-8")
+                    if compress:
+                        payload = gzip.compress(payload)
+                    data_file.write(payload)
+                    index_lines.append(json.dumps(_block_meta(block, data_name, offset, len(payload))) + "\n")
+                    offset += len(payload)
+            # Data first: a crash in between leaves unindexed bytes, never an index entry without data.
+            with open(self._index_path(session_filename), "a", encoding="utf-8") as index_file:
+                index_file.write("".join(index_lines))
+        return len(entries), end
+
+    def count(self, session_filename: str) -> int:
+        """
+        Number of entries in the archive of a session file.
+        """
+        with self._lock:
+            return _archived(self._load_index(self._index_path(session_filename)))
+
+    def query(
+        self,
+        session_filename: Optional[str],
+        tail: Iterable[Tuple[Sequence[Any], Sequence[int]]],
+        filters: Dict[str, Any],
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        One page of archived + in-memory entries, oldest first. filters (field -> value) and the
+        inclusive turn range apply to the archive; tail holds the in-memory matches as
+        (records, positions) pairs. Only the requested page is materialized.
+        """
+        page, page_size = normalize_page(page, page_size)
+        skip = page * page_size
+        rows: List[Dict[str, Any]] = []
+        total = 0
+
+        blocks = self._read_index(session_filename) if session_filename else []
+        for block in blocks:
+            if not _block_overlaps(block, turn_from, turn_to):
+                continue
+            matches = _block_matches(block, filters, turn_from, turn_to)
+            if matches is not None and (total + matches <= skip or total >= skip + page_size):
+                total += matches
+                continue
+            for entry in self._read_block(block):
+                if _entry_matches(entry, filters, turn_from, turn_to):
+                    if skip <= total < skip + page_size:
+                        rows.append(entry)
+                    total += 1
+        for records, positions in tail:
+            start = max(skip - total, 0)
+            stop = min(skip + page_size - total, len(positions))
+            if start < stop:
+                rows.extend(records[pos] for pos in positions[start:stop])
+            total += len(positions)
+
+        return {
+            "success": True,
+            "entries": rows,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "pages": (total + page_size - 1) // page_size,
+        }
+
+    def delete(self, session_filename: str) -> None:
+        stem = Path(session_filename).stem
+        with self._lock:
+            for name in (f"{stem}.audit.jsonl", f"{stem}.audit.jsonl.gz", f"{stem}.audit.idx"):
+                path = self._dir / name
+                self._index_cache.pop(str(path), None)
+                if path.exists():
+                    path.unlink()
+
+    def _index_path(self, session_filename: str) -> Path:
+        return self._dir / f"{Path(session_filename).stem}.audit.idx"
+
+    def _read_index(self, session_filename: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._load_index(self._index_path(session_filename))
+
+    def _load_index(self, path: Path) -> List[Dict[str, Any]]:
+        # Caller holds self._lock.
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return []
+        cached = self._index_cache.get(str(path))
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        blocks: List[Dict[str, Any]] = []
+        with open(path, "r", encoding="utf-8") as index_file:
+            for line in index_file:
+                try:
+                    block = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(block, dict):
+                    blocks.append(block)
+        self._index_cache[str(path)] = (size, blocks)
+        return blocks
+
+    def _read_block(self, block: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        name = block.get("file")
+        if not isinstance(name, str) or Path(name).name != name:
+            return
+        with open(self._dir / name, "rb") as data_file:
+            data_file.seek(block.get("offset", 0))
+            payload = data_file.read(block.get("length", 0))
+        if name.endswith(".gz"):
+            payload = gzip.decompress(payload)
+        for line in payload.decode("utf-8").splitlines():
+            if line:
+                yield json.loads(line)
+
+
+def archived_through(session_state: Dict[str, Any]) -> Optional[int]:
+    """
+    session_state[ARCHIVED_KEY], or None when missing or invalid.
+    """
+    value = session_state.get(ARCHIVED_KEY)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        return None
+    return value
+
+
+def _archived(blocks: List[Dict[str, Any]]) -> int:
+    return sum(block["count"] for block in blocks if isinstance(block.get("count"), int))
+
+
+def _block_meta(block: List[Dict[str, Any]], data_name: str, offset: int, length: int) -> Dict[str, Any]:
+    turns = [e["turn"] for e in block if isinstance(e.get("turn"), int)]
+    # Only string values are counted; filters compare exactly, so other values never match a string.
+    counts: Dict[str, Dict[str, int]] = {field: {} for field in COUNTED_FIELDS}
+    for entry in block:
+        for field in COUNTED_FIELDS:
+            value = entry.get(field)
+            if isinstance(value, str):
+                counts[field][value] = counts[field].get(value, 0) + 1
+    return {
+        "file": data_name,
+        "offset": offset,
+        "length": length,
+        "count": len(block),
+        "untimed": len(block) - len(turns),
+        "min_turn": min(turns) if turns else None,
+        "max_turn": max(turns) if turns else None,
+        "counts": counts,
+    }
+
+
+def _block_overlaps(block: Dict[str, Any], turn_from: Optional[int], turn_to: Optional[int]) -> bool:
+    if turn_from is None and turn_to is None:
+        return True
+    if block.get("min_turn") is None:
+        return False
+    return (turn_from is None or block["max_turn"] >= turn_from) and (turn_to is None or block["min_turn"] <= turn_to)
+
+
+def _block_matches(block: Dict[str, Any], filters: Dict[str, Any], turn_from: Optional[int], turn_to: Optional[int]) -> Optional[int]:
+    """
+    Matches in a block known from the index alone (None = the block has to be read).
+    """
+    counts = block.get("counts") if isinstance(block.get("counts"), dict) else {}
+    known: List[int] = []
+    for field, value in filters.items():
+        field_counts = counts.get(field)
+        if isinstance(value, str) and isinstance(field_counts, dict):
+            count = field_counts.get(value, 0)
+            if count == 0:
+                return 0
+            known.append(count)
+    if turn_from is not None or turn_to is not None:
+        if block.get("untimed"):
+            return None
+        if turn_from is not None and block["min_turn"] < turn_from:
+            return None
+        if turn_to is not None and block["max_turn"] > turn_to:
+            return None
+    if not filters:
+        return block.get("count", 0)
+    if len(filters) == 1 and len(known) == 1:
+        return known[0]
+    return None
+
+
+def _entry_matches(entry: Dict[str, Any], filters: Dict[str, Any], turn_from: Optional[int], turn_to: Optional[int]) -> bool:
+    for field, value in filters.items():
+        if entry.get(field) != value:
+            return False
+    if turn_from is None and turn_to is None:
+        return True
+    turn = entry.get("turn")
+    if not isinstance(turn, int):
+        return False
+    return (turn_from is None or turn >= turn_from) and (turn_to is None or turn <= turn_to)
@@ -1,13 +1,59 @@
 from typing import Any, Dict, List, Optional
 
+from .audit_archive import PENDING_KEY
+from .history_index import HISTORY_INDEXES
 from .logger import setup_logger
+from .perf_stats import PERF
 
 logger = setup_logger("audit_log")
 
+TRIM_KEY = "_audit_trim"
+
+
+def _trim_state(entries: List[Dict[str, Any]], keep_turns: int) -> Dict[str, Any]:
+    """
+    What the last append left behind in the session's audit_log: length, last entry, highest
+    turn and whether turns are non-decreasing. Stored in session_state[TRIM_KEY], so it is
+    shared by every AuditLog (ledger, facility manager and Api each own one), saved and rolled
+    back with the session.
+    """
+    state = {
+        "keep_turns": keep_turns,
+        "max_turn": max(e["turn"] for e in entries) if entries else 0,
+        "ordered": all(entries[idx - 1]["turn"] <= entries[idx]["turn"] for idx in range(1, len(entries))),
+    }
+    _mark_end(state, entries)
+    return state
+
+
+def _mark_end(state: Dict[str, Any], entries: List[Dict[str, Any]]) -> None:
+    state["length"] = len(entries)
+    state["last"] = entries[-1] if entries else None
+
+
+def _follows(state: Any, entries: List[Dict[str, Any]], keep_turns: int) -> bool:
+    """
+    True if entries is the tracked list with exactly one entry appended since _mark_end().
+    """
+    if not isinstance(state, dict) or state.get("keep_turns") != keep_turns:
+        return False
+    if not isinstance(state.get("max_turn"), int) or not isinstance(state.get("ordered"), bool):
+        return False
+    length = state.get("length")
+    if not isinstance(length, int) or length != len(entries) - 1:
+        return False
+    if length == 0:
+        return True
+    last = state.get("last")
+    return isinstance(last, dict) and isinstance(last.get("turn"), int) and (entries[-2] is last or entries[-2] == last)
+
 
 class AuditLog:
     def __init__(self, config_manager: Optional[Any] = None):
         self._config_manager = config_manager
+        self._keep_turns: Optional[int] = None
+        self._archive = True
+        self._keep_turns_version: Any = None
 
     def add_entry_from_event(self, session_state: Dict[str, Any], event: Dict[str, Any]) -> None:
         if not isinstance(event, dict):
@@ -32,6 +78,7 @@ class AuditLog:
             result,
             changes,
             log_text,
+            event.get("details"),
         )
 
     def add_entry(
@@ -46,6 +93,7 @@ class AuditLog:
         result: str,
         changes: str,
         log_text: str,
+        details: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         if not session_state:
             return
@@ -62,17 +110,46 @@ class AuditLog:
             "changes": changes,
             "log_text": log_text,
         }
+        if details:
+            entry["details"] = details
         entries.append(entry)
-        self._trim_entries(entries)
-        logger.info(f"AuditLog: T{turn} {event_type} {source_type}:{source_id} {action} {result}")
+        with PERF.phase("audit_trim"):
+            dropped = self._trim_after_append(session_state, entries)
+        if dropped and self._archive_enabled():
+            # Archived by SessionManager on the next save (see audit_archive).
+            pending = session_state.setdefault(PENDING_KEY, [])
+            before = len(pending)
+            pending.extend(e for e in dropped if isinstance(e, dict))
+            HISTORY_INDEXES.update(pending, appended=len(pending) - before)
+        logger.debug("AuditLog: T%s %s %s:%s %s %s", turn, event_type, source_type, source_id, action, result)
 
     def _get_keep_turns(self, default: int = 2) -> int:
         if not self._config_manager:
             return default
+        version = getattr(self._config_manager, "version", None)
+        if version is not None and version == self._keep_turns_version and self._keep_turns is not None:
+            return self._keep_turns
         try:
-            config = self._config_manager.get_config()
+            config = self._config_manager.get_config_snapshot()
         except Exception:
             return default
+        keep_turns = self._read_keep_turns(config, default)
+        self._keep_turns = keep_turns
+        self._archive = self._read_archive_enabled(config)
+        self._keep_turns_version = version
+        return keep_turns
+
+    def _archive_enabled(self) -> bool:
+        self._get_keep_turns()
+        return self._archive
+
+    def _read_archive_enabled(self, config: Any) -> bool:
+        internal = config.get("internal_settings") if isinstance(config, dict) else None
+        if not isinstance(internal, dict):
+            return True
+        return internal.get("audit_archive", True) is not False
+
+    def _read_keep_turns(self, config: Any, default: int) -> int:
         if not isinstance(config, dict):
             return default
         internal = config.get("internal_settings")
@@ -83,14 +160,69 @@ class AuditLog:
             return value
         return default
 
-    def _trim_entries(self, entries: List[Dict[str, Any]]) -> None:
-        if not entries:
+    def _trim_after_append(self, session_state: Dict[str, Any], entries: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Same result as _trim_entries after every append, but only a new highest turn (a turn
+        advance) drops anything, and then only the expired prefix. Lists changed behind our
+        back (edited, or a session without trim state) fall back to one full trim. Returns the
+        dropped entries. Reports append + prefix drop to the history index; other reshapes
+        rebuild it on demand.
+        """
+        keep_turns = self._get_keep_turns()
+        state = session_state.get(TRIM_KEY)
+        turn = entries[-1].get("turn")
+        if not isinstance(turn, int) or not _follows(state, entries, keep_turns):
+            dropped = self._trim_entries(entries)
+            self._track(session_state, entries, keep_turns)
+            return dropped
+
+        dropped = []
+        if turn > state["max_turn"]:
+            state["max_turn"] = turn
+            cutoff = turn - keep_turns
+            if state["ordered"]:
+                count = 0
+                while entries[count]["turn"] < cutoff:
+                    count += 1
+                if count:
+                    dropped = entries[:count]
+                    del entries[:count]
+                HISTORY_INDEXES.update(entries, dropped=count)
+            else:
+                kept = []
+                for e in entries:
+                    (kept if e["turn"] >= cutoff else dropped).append(e)
+                entries[:] = kept
+                state["ordered"] = all(entries[idx - 1]["turn"] <= entries[idx]["turn"] for idx in range(1, len(entries)))
+        elif turn < state["max_turn"] - keep_turns:
+            # Older than the kept window: a full trim would drop it right away.
+            dropped = [entries.pop()]
+        else:
+            if state["ordered"] and state["last"] is not None and turn < state["last"]["turn"]:
+                state["ordered"] = False
+            HISTORY_INDEXES.update(entries)
+        _mark_end(state, entries)
+        return dropped
+
+    def _track(self, session_state: Dict[str, Any], entries: List[Dict[str, Any]], keep_turns: int) -> None:
+        if any(not isinstance(e, dict) or not isinstance(e.get("turn"), int) for e in entries):
+            session_state.pop(TRIM_KEY, None)
             return
+        session_state[TRIM_KEY] = _trim_state(entries, keep_turns)
+
+    def _trim_entries(self, entries: List[Dict[str, Any]]) -> List[Any]:
+        if not entries:
+            return []
         turns = [e.get("turn") for e in entries if isinstance(e, dict) and isinstance(e.get("turn"), int)]
         if not turns:
-            return
+            return []
         max_turn = max(turns)
         keep_turns = self._get_keep_turns()
         min_turn = max_turn - keep_turns
-        filtered = [e for e in entries if isinstance(e, dict) and isinstance(e.get("turn"), int) and e.get("turn") >= min_turn]
+        filtered = []
+        dropped = []
+        for e in entries:
+            keep = isinstance(e, dict) and isinstance(e.get("turn"), int) and e.get("turn") >= min_turn
+            (filtered if keep else dropped).append(e)
         entries[:] = filtered
+        return dropped
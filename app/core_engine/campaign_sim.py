@@ -0,0 +1,300 @@
+"""
+Headless campaign simulation (no webview).
+Generates a bastion from the loaded packs and runs it for many turns with a fixed policy.
+"""
+import math
+import multiprocessing.util
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config_manager import ConfigManager
+from .facility_manager import FacilityManager
+from .initial_state import InitialStateGenerator
+from .ledger import Ledger
+from .logger import quiet_logging, restart_logging, shutdown_logging
+
+DEFAULT_POLICY = {
+    "turns": 100,
+    "packs": [],
+    "max_facilities": 0,
+    "gold": 10000,
+    "npc_level": 1,
+    "npc_upkeep": {"silver": 5},
+    "auto_start_orders": True,
+    "order_choice": "random",
+    "evaluate": True,
+    "fast_forward": False,
+    "quiet": True,
+}
+
+PHASES = ["setup", "start_orders", "evaluate", "advance"]
+
+
+class CampaignSimulator:
+    def __init__(self, root_dir: Path, policy: Optional[Dict[str, Any]] = None):
+        self.root_dir = Path(root_dir)
+        self.policy = {**DEFAULT_POLICY, **(policy or {})}
+        if self.policy["quiet"]:
+            quiet_logging()
+        self._config_manager = ConfigManager(self.root_dir)
+        self._ledger = Ledger(self.root_dir, self._config_manager)
+        self._facility_manager = FacilityManager(self.root_dir, self._ledger, self._config_manager)
+
+    def run(self, seed: int) -> Dict[str, Any]:
+        random.seed(seed)
+        timings = {phase: 0.0 for phase in PHASES}
+        started = time.perf_counter()
+        session_state = self._generate_bastion()
+        timings["setup"] = time.perf_counter() - started
+
+        fm = self._facility_manager
+        start_base = float(session_state["bastion"].get("treasury_base", 0))
+        min_base = start_base
+        orders_started = 0
+        buckets: Dict[str, int] = {}
+        stalled_turn = None
+        target_turn = int(session_state.get("current_turn", 0)) + int(self.policy["turns"])
+
+        while int(session_state.get("current_turn", 0)) < target_turn:
+            if self.policy["auto_start_orders"]:
+                t0 = time.perf_counter()
+                orders_started += self._start_orders(session_state)
+                timings["start_orders"] += time.perf_counter() - t0
+
+            if self.policy["evaluate"]:
+                t0 = time.perf_counter()
+                result = fm.roll_and_evaluate_ready_orders(session_state)
+                for entry in result.get("results", []):
+                    bucket = entry.get("bucket") or "-"
+                    buckets[bucket] = buckets.get(bucket, 0) + 1
+                timings["evaluate"] += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            remaining = target_turn - int(session_state.get("current_turn", 0))
+            if self.policy["fast_forward"]:
+                advanced = fm.advance_turns(session_state, remaining)
+            else:
+                advanced = fm.advance_turn(session_state)
+            timings["advance"] += time.perf_counter() - t0
+            if not advanced.get("success"):
+                stalled_turn = int(session_state.get("current_turn", 0))
+                break
+
+            base = float(session_state["bastion"].get("treasury_base", 0))
+            min_base = min(min_base, base)
+
+        bastion = session_state["bastion"]
+        end_base = float(bastion.get("treasury_base", 0))
+        return {
+            "seed": seed,
+            "turns": int(session_state.get("current_turn", 0)),
+            "stalled_turn": stalled_turn,
+            "facilities": len(bastion.get("facilities", [])),
+            "npcs": sum(len(f.get("assigned_npcs", [])) for f in bastion.get("facilities", [])),
+            "treasury_base_start": start_base,
+            "treasury_base_end": end_base,
+            "treasury_base_min": min_base,
+            "treasury_delta": end_base - start_base,
+            "orders_started": orders_started,
+            "orders_evaluated": sum(buckets.values()),
+            "buckets": buckets,
+            "inventory": {e.get("item"): e.get("qty", 0) for e in bastion.get("inventory", []) if isinstance(e, dict)},
+            "stats": dict(bastion.get("stats", {})),
+            "timings": timings,
+        }
+
+    def _generate_bastion(self) -> Dict[str, Any]:
+        fm = self._facility_manager
+        candidates = self._candidate_facilities()
+        owner_limit = fm.get_facility_owner_limit()
+        player_count = max(1, math.ceil(len(candidates) / owner_limit))
+        players = [{"player_id": f"player_{idx + 1}", "name": f"Player {idx + 1}"} for idx in range(player_count)]
+
+        session_state = InitialStateGenerator.generate_session_state(
+            session_name="simulation",
+            bastion_name="Simulated Bastion",
+            players=players,
+            initial_treasury={"gold": int(self.policy["gold"])},
+        )
+        session_state["bastion"]["treasury_base"] = int(self.policy["gold"]) * self._ledger.factor_to_base.get("gold", 1)
+
+        for idx, facility_id in enumerate(candidates):
+            result = fm.add_build_facility(session_state, facility_id, allow_negative=True)
+            if not result.get("success"):
+                continue
+            fm.set_facility_owner(session_state, facility_id, players[idx // owner_limit]["player_id"])
+
+        longest_build = max(
+            [f["build_status"].get("remaining_turns", 0) for f in session_state["bastion"]["facilities"]] or [0]
+        )
+        if longest_build:
+            fm.advance_turns(session_state, longest_build)
+
+        for facility_id in candidates:
+            facility_def = fm.catalog.get(facility_id, {})
+            slots = facility_def.get("npc_slots")
+            if not isinstance(slots, int) or slots <= 0:
+                continue
+            professions = facility_def.get("npc_allowed_professions") or ["worker"]
+            for slot in range(slots):
+                fm.hire_npc(
+                    session_state,
+                    f"{facility_id}#{slot + 1}",
+                    professions[slot % len(professions)],
+                    self.policy["npc_level"],
+                    self.policy["npc_upkeep"],
+                    facility_id,
+                )
+        return session_state
+
+    def _candidate_facilities(self) -> List[str]:
+        packs = set(self.policy["packs"] or [])
+        candidates = []
+        for facility_id, facility in sorted(self._facility_manager.catalog.items()):
+            if facility.get("parent"):
+                continue
+            if packs and facility.get("_pack_id") not in packs:
+                continue
+            candidates.append(facility_id)
+        limit = int(self.policy["max_facilities"] or 0)
+        return candidates[:limit] if limit > 0 else candidates
+
+    def _start_orders(self, session_state: Dict[str, Any]) -> int:
+        fm = self._facility_manager
+        started = 0
+        for facility in session_state["bastion"]["facilities"]:
+            facility_id = facility.get("facility_id")
+            facility_def = fm.catalog.get(facility_id, {})
+            orders_def = [o for o in facility_def.get("orders", []) if isinstance(o, dict)]
+            if not orders_def:
+                continue
+            busy = {o.get("npc_id") for o in fm.get_active_orders(facility)}
+            for npc in list(facility.get("assigned_npcs", [])):
+                npc_id = npc.get("npc_id")
+                if npc_id in busy:
+                    continue
+                level = npc.get("level", 1)
+                options = [o for o in orders_def if o.get("min_npc_level", 1) <= level]
+                if not options:
+                    continue
+                order_def = self._choose_order(options)
+                result = fm.start_order(session_state, facility_id, npc_id, order_def.get("id"))
+                if not result.get("success"):
+                    continue
+                started += 1
+                self._fill_formula_inputs(session_state, facility_id, order_def)
+        return started
+
+    def _choose_order(self, options: List[Dict[str, Any]]) -> Dict[str, Any]:
+        choice = self.policy["order_choice"]
+        if choice == "first":
+            return options[0]
+        if choice == "longest":
+            return max(options, key=lambda o: o.get("duration_turns") or 1)
+        if choice == "shortest":
+            return min(options, key=lambda o: o.get("duration_turns") or 1)
+        return random.choice(options)
+
+    def _fill_formula_inputs(self, session_state: Dict[str, Any], facility_id: str, order_def: Dict[str, Any]) -> None:
+        fm = self._facility_manager
+        outcome = order_def.get("outcome") if isinstance(order_def.get("outcome"), dict) else {}
+        triggers = set()
+        for block in outcome.values():
+            effects = block.get("effects") if isinstance(block, dict) else None
+            for effect in effects or []:
+                if isinstance(effect, dict) and isinstance(effect.get("trigger"), str):
+                    triggers.add(effect["trigger"])
+        for trigger_id in sorted(triggers):
+            inputs: Dict[str, Any] = {}
+            for spec in fm.get_formula_inputs(trigger_id):
+                if spec["default"] is not None:
+                    continue
+                if spec["source"] == "check":
+                    inputs[spec["name"]] = random.randint(1, spec["sides"] or 1)
+                elif spec["source"] == "number":
+                    inputs[spec["name"]] = 1
+            fm.save_formula_inputs(session_state, facility_id, order_def.get("id"), trigger_id, inputs)
+
+
+def run_campaign(root_dir: str, policy: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    return CampaignSimulator(Path(root_dir), policy).run(seed)
+
+
+def _init_worker() -> None:
+    # A forked worker inherits the log handlers but not the listener thread that writes them.
+    restart_logging()
+    # Pool workers leave through os._exit, which skips atexit: flush the log queue on the way out.
+    multiprocessing.util.Finalize(None, shutdown_logging, exitpriority=0)
+
+
+def run_campaigns(
+    root_dir: Path,
+    policy: Dict[str, Any],
+    campaigns: int,
+    workers: int = 0,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """
+    Run independent campaigns (one per seed), fanned out over worker processes.
+    """
+    seeds = [seed + idx for idx in range(max(campaigns, 1))]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers <= 1 or len(seeds) == 1:
+        simulator = CampaignSimulator(root_dir, policy)
+        results = [simulator.run(s) for s in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(seeds)), initializer=_init_worker) as pool:
+            futures = [pool.submit(run_campaign, str(root_dir), policy, s) for s in seeds]
+            results = [f.result() for f in futures]
+    wall = time.perf_counter() - started
+    return {
+        "policy": {**DEFAULT_POLICY, **(policy or {})},
+        "campaigns": len(results),
+        "workers": workers,
+        "wall_seconds": wall,
+        "summary": summarize(results),
+        "results": results,
+    }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def describe(values: List[float]) -> Dict[str, float]:
+        if not values:
+            return {}
+        return {
+            "mean": statistics.fmean(values),
+            "stdev": statistics.pstdev(values),
+            "min": min(values),
+            "max": max(values),
+        }
+
+    turns_total = sum(r["turns"] for r in results) or 1
+    buckets: Dict[str, int] = {}
+    items: Dict[str, float] = {}
+    for r in results:
+        for bucket, count in r["buckets"].items():
+            buckets[bucket] = buckets.get(bucket, 0) + count
+        for item, qty in r["inventory"].items():
+            items[item] = items.get(item, 0) + qty / len(results)
+
+    timings = {}
+    for phase in PHASES:
+        total = sum(r["timings"][phase] for r in results)
+        timings[phase] = {"total_seconds": total, "per_turn_ms": total * 1000 / turns_total}
+
+    return {
+        "treasury_delta": describe([r["treasury_delta"] for r in results]),
+        "treasury_delta_per_turn": describe([r["treasury_delta"] / max(r["turns"], 1) for r in results]),
+        "treasury_min": describe([r["treasury_base_min"] for r in results]),
+        "orders_evaluated": describe([float(r["orders_evaluated"]) for r in results]),
+        "stalled_campaigns": len([r for r in results if r["stalled_turn"] is not None]),
+        "buckets": buckets,
+        "mean_inventory": items,
+        "timings": timings,
+    }
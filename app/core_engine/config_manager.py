@@ -1,7 +1,8 @@
 import copy
 import json
+import weakref
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from .logger import setup_logger
 
@@ -14,6 +15,56 @@ ALLOWED_SETTINGS_CURRENCY_KEYS = {"conversion", "hidden"}
 ALLOWED_CHECK_PROFILE_LEVELS = {"default", "apprentice", "experienced", "master"}
 
 
+def _read_only(self: Any, *args: Any, **kwargs: Any) -> None:
+    raise TypeError("Config snapshot is read-only; use ConfigManager.get_config() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict (still a dict for isinstance checks and JSON). deepcopy returns plain containers.
+    """
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> Any:
+        return (dict, (thaw(self),))
+
+
+class FrozenList(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> Any:
+        return (list, (thaw(self),))
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+    Plain, mutable deep copy of a (possibly frozen) config tree.
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return copy.deepcopy(value)
+
+
 class ConfigManager:
     def __init__(self, root_dir: Path):
         self.root_dir = root_dir
@@ -26,10 +77,62 @@ class ConfigManager:
         self._core_config: Dict[str, Any] = {}
         self._settings: Dict[str, Any] = {}
         self._warnings: List[str] = []
+        self._snapshot: Dict[str, Any] = FrozenDict()
+        self.version = 0
+        self._subscribers: List[Tuple[Any, Optional[Set[str]]]] = []
         self.reload()
 
     def get_config(self) -> Dict[str, Any]:
-        return copy.deepcopy(self._config)
+        """
+        Mutable deep copy of the merged config. Read-only consumers should use get_config_snapshot().
+        """
+        return thaw(self._snapshot)
+
+    def get_config_snapshot(self) -> Dict[str, Any]:
+        """
+        Shared read-only view of the merged config. A new snapshot (and version) is published on
+        reload/save_settings, so holders can compare `version` instead of copying.
+        """
+        return self._snapshot
+
+    def subscribe(self, callback: Callable[[Dict[str, Any], Set[str]], None], sections: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Call callback(snapshot, changed_sections) whenever a new config is published and one of
+        `sections` (top-level keys, e.g. "currency", "check_profiles"; None = any) changed.
+        Bound methods are held weakly. Returns an unsubscribe function.
+        """
+        ref: Any = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        entry = (ref, set(sections) if sections is not None else None)
+        self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+
+        return unsubscribe
+
+    def _publish(self, merged: Dict[str, Any]) -> None:
+        previous = self._config
+        self._config = merged
+        self._snapshot = freeze(merged)
+        self.version += 1
+        changed = {key for key in set(previous) | set(merged) if previous.get(key) != merged.get(key)}
+        if changed:
+            self._notify(changed)
+
+    def _notify(self, changed: Set[str]) -> None:
+        for entry in list(self._subscribers):
+            ref, sections = entry
+            callback = ref()
+            if callback is None:
+                self._subscribers.remove(entry)
+                continue
+            if sections is not None and not (sections & changed):
+                continue
+            try:
+                callback(self._snapshot, changed)
+            except Exception as e:
+                logger.warning(f"Config subscriber failed: {e}")
 
     def get_settings(self) -> Dict[str, Any]:
         return copy.deepcopy(self._settings)
@@ -64,7 +167,7 @@ class ConfigManager:
         merged = self._normalize_currency_config(merged)
 
         self._base_config = merged_base
-        self._config = merged
+        self._publish(merged)
         self._settings = settings
         self._warnings = pack_warnings + settings_errors + settings_warnings
         return self._config
@@ -93,7 +196,7 @@ class ConfigManager:
 
         merged = self._apply_settings(merged_base, settings)
         merged = self._normalize_currency_config(merged)
-        self._config = merged
+        self._publish(merged)
         self._base_config = merged_base
         self._settings = settings
         self._warnings = pack_warnings + warnings
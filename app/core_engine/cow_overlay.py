@@ -0,0 +1,174 @@
+"""
+Copy-on-write overlay for session dicts.
+
+CowDict/CowList copy only their own level and wrap child containers on first access,
+so the original tree is never mutated and untouched branches are shared, not copied.
+Containers inserted while working on the overlay are owned by it and left unwrapped.
+Copies of a CowDict (dict(cow), {**cow}, .copy()) hold wrapped children as well.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class _OverlayContext:
+    def __init__(self) -> None:
+        self.owned: Set[int] = set()
+        self._keep: List[Any] = []
+        self.materialized = 0
+
+    def own(self, value: Any) -> None:
+        if type(value) in (dict, list):
+            self.owned.add(id(value))
+            self._keep.append(value)
+
+    def wrap(self, value: Any) -> Any:
+        value_type = type(value)
+        if value_type is not dict and value_type is not list:
+            return value
+        if id(value) in self.owned:
+            return value
+        self.materialized += 1
+        if value_type is dict:
+            return CowDict(value, self)
+        return CowList(value, self)
+
+
+class CowDict(dict):
+    def __init__(self, source: Dict[Any, Any], ctx: _OverlayContext) -> None:
+        super().__init__(source)
+        self._ctx = ctx
+
+    def _wrapped(self, key: Any) -> Any:
+        value = dict.__getitem__(self, key)
+        wrapped = self._ctx.wrap(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._wrapped(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if dict.__contains__(self, key):
+            return self._wrapped(key)
+        return default
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if dict.__contains__(self, key):
+            return self._wrapped(key)
+        self._ctx.own(default)
+        dict.__setitem__(self, key, default)
+        return default
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        if dict.__contains__(self, key):
+            value = self._wrapped(key)
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._ctx.own(value)
+        dict.__setitem__(self, key, value)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __iter__(self):
+        # Overriding __iter__ takes dict(cow) / {**cow} off the C fast path that copies the
+        # raw children; they go through keys() + __getitem__ instead.
+        return dict.__iter__(self)
+
+    def values(self):  # type: ignore[override]
+        for key in list(dict.keys(self)):
+            self._wrapped(key)
+        return dict.values(self)
+
+    def items(self):  # type: ignore[override]
+        for key in list(dict.keys(self)):
+            self._wrapped(key)
+        return dict.items(self)
+
+    def copy(self) -> Dict[Any, Any]:
+        return dict(self.items())
+
+
+class CowList(list):
+    def __init__(self, source: Iterable[Any], ctx: _OverlayContext) -> None:
+        super().__init__(source)
+        self._ctx = ctx
+
+    def _wrapped(self, index: int) -> Any:
+        value = list.__getitem__(self, index)
+        wrapped = self._ctx.wrap(value)
+        if wrapped is not value:
+            list.__setitem__(self, index, wrapped)
+        return wrapped
+
+    def _wrap_all(self) -> None:
+        for index in range(len(self)):
+            self._wrapped(index)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            self._wrap_all()
+            return list.__getitem__(self, index)
+        return self._wrapped(index)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self):
+            yield self._wrapped(index)
+            index += 1
+
+    def __reversed__(self):
+        index = len(self) - 1
+        while index >= 0:
+            if index < len(self):
+                yield self._wrapped(index)
+            index -= 1
+
+    def pop(self, index: int = -1) -> Any:
+        value = self._wrapped(index)
+        list.pop(self, index)
+        return value
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            value = list(value)
+            for item in value:
+                self._ctx.own(item)
+        else:
+            self._ctx.own(value)
+        list.__setitem__(self, index, value)
+
+    def append(self, value: Any) -> None:
+        self._ctx.own(value)
+        list.append(self, value)
+
+    def insert(self, index: int, value: Any) -> None:
+        self._ctx.own(value)
+        list.insert(self, index, value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        for value in values:
+            self.append(value)
+
+    def copy(self) -> List[Any]:
+        return list(iter(self))
+
+
+def cow_overlay(source: Dict[str, Any], fresh_keys: Optional[Iterable[str]] = None) -> CowDict:
+    """
+    Wrap a session dict in a copy-on-write overlay.
+    `fresh_keys` are replaced by empty lists (e.g. logs the caller only wants new entries of).
+    """
+    ctx = _OverlayContext()
+    overlay = CowDict(source, ctx)
+    for key in fresh_keys or []:
+        overlay[key] = []
+    return overlay
+
+
+def materialized_count(overlay: CowDict) -> int:
+    return overlay._ctx.materialized
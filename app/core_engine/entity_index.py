@@ -0,0 +1,186 @@
+from contextlib import contextmanager
+from typing import Any, Dict, KeysView, List, Optional, Tuple
+
+
+class EntityIndex:
+    """
+    Lookup tables for the bound session: facility_id -> entry, npc_id -> (npc, facility)
+    and per facility order_id -> orders. Mutators report structural changes; binding a
+    different session (load, new session) rebuilds the tables.
+    """
+
+    def __init__(self, normalize_orders: Any) -> None:
+        self._normalize_orders = normalize_orders
+        self._session: Optional[Dict[str, Any]] = None
+        self._facilities: Dict[Any, Dict[str, Any]] = {}
+        self._npcs: Dict[Any, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = {}
+        self._orders: Dict[int, Tuple[Dict[str, Any], Dict[Any, List[Dict[str, Any]]]]] = {}
+        self._has_duplicates = False
+
+    def bind(self, session_state: Dict[str, Any]) -> bool:
+        if self._session is session_state:
+            return False
+        self._session = session_state
+        self.rebuild(session_state)
+        return True
+
+    @contextmanager
+    def isolated(self):
+        """
+        Index a throwaway session (e.g. a preview overlay) and restore the current tables afterwards.
+        """
+        saved = (self._session, self._facilities, self._npcs, self._orders, self._has_duplicates)
+        self._session = None
+        try:
+            yield self
+        finally:
+            self._session, self._facilities, self._npcs, self._orders, self._has_duplicates = saved
+
+    def rebuild(self, session_state: Dict[str, Any]) -> None:
+        self._facilities = {}
+        self._npcs = {}
+        self._orders = {}
+        self._has_duplicates = False
+        bastion = session_state.get("bastion", {}) if isinstance(session_state, dict) else {}
+        facilities = bastion.get("facilities", []) or []
+        for facility in facilities:
+            if not isinstance(facility, dict):
+                continue
+            self._index(self._facilities, facility.get("facility_id"), facility)
+            assigned = facility.get("assigned_npcs", [])
+            if isinstance(assigned, list):
+                for npc in assigned:
+                    if isinstance(npc, dict):
+                        self._index(self._npcs, npc.get("npc_id"), (npc, facility))
+        unassigned = bastion.get("npcs_unassigned", []) or []
+        if isinstance(unassigned, list):
+            for npc in unassigned:
+                if isinstance(npc, dict):
+                    self._index(self._npcs, npc.get("npc_id"), (npc, None))
+
+    def find_facility(self, session_state: Dict[str, Any], facility_id: Any) -> Optional[Dict[str, Any]]:
+        self.bind(session_state)
+        entry = self._facilities.get(facility_id) if _hashable(facility_id) else None
+        if entry is not None and entry.get("facility_id") != facility_id:
+            self.rebuild(session_state)
+            entry = self._facilities.get(facility_id)
+        return entry
+
+    def locate_npc(self, session_state: Dict[str, Any], npc_id: Any) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        self.bind(session_state)
+        found = self._npcs.get(npc_id) if _hashable(npc_id) else None
+        if found is not None and found[0].get("npc_id") != npc_id:
+            self.rebuild(session_state)
+            found = self._npcs.get(npc_id)
+        return found if found is not None else (None, None)
+
+    def npc_ids(self, session_state: Dict[str, Any]) -> KeysView[Any]:
+        self.bind(session_state)
+        return self._npcs.keys()
+
+    def find_order(self, facility_entry: Dict[str, Any], order_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        First order with order_id in the facility (same result as a scan of current_orders).
+        """
+        if not _hashable(order_id):
+            return None
+        by_id = self._orders_by_id(facility_entry)
+        orders = by_id.get(order_id)
+        return orders[0] if orders else None
+
+    def add_facility(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any]) -> None:
+        if self._session is not session_state:
+            return
+        self._index(self._facilities, facility_entry.get("facility_id"), facility_entry)
+
+    def remove_facility(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any]) -> None:
+        if self._session is not session_state:
+            return
+        self._orders.pop(id(facility_entry), None)
+        if self._has_duplicates:
+            self.rebuild(session_state)
+            return
+        facility_id = facility_entry.get("facility_id")
+        if _hashable(facility_id) and self._facilities.get(facility_id) is facility_entry:
+            del self._facilities[facility_id]
+
+    def rename_facility(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any], old_id: Any) -> None:
+        if self._session is not session_state:
+            return
+        if self._has_duplicates:
+            self.rebuild(session_state)
+            return
+        if _hashable(old_id) and self._facilities.get(old_id) is facility_entry:
+            del self._facilities[old_id]
+        self._index(self._facilities, facility_entry.get("facility_id"), facility_entry)
+
+    def add_npc(self, session_state: Dict[str, Any], npc_entry: Dict[str, Any], facility_entry: Optional[Dict[str, Any]]) -> None:
+        if self._session is not session_state:
+            return
+        npc_id = npc_entry.get("npc_id")
+        if _hashable(npc_id):
+            self._npcs[npc_id] = (npc_entry, facility_entry)
+
+    def remove_npc(self, session_state: Dict[str, Any], npc_id: Any, facility_entry: Optional[Dict[str, Any]]) -> None:
+        """
+        Drop npc_id if it is currently indexed at facility_entry (None = reserve).
+        """
+        if self._session is not session_state or not _hashable(npc_id):
+            return
+        found = self._npcs.get(npc_id)
+        if found is None or found[1] is not facility_entry:
+            return
+        if self._has_duplicates:
+            self.rebuild(session_state)
+            return
+        del self._npcs[npc_id]
+
+    def add_order(self, facility_entry: Dict[str, Any], order_entry: Dict[str, Any]) -> None:
+        cached = self._orders.get(id(facility_entry))
+        if cached is None or cached[0] is not facility_entry:
+            return
+        order_id = order_entry.get("order_id")
+        if _hashable(order_id):
+            cached[1].setdefault(order_id, []).append(order_entry)
+
+    def remove_order(self, facility_entry: Dict[str, Any], order_entry: Dict[str, Any]) -> None:
+        cached = self._orders.get(id(facility_entry))
+        if cached is None or cached[0] is not facility_entry:
+            return
+        order_id = order_entry.get("order_id")
+        orders = cached[1].get(order_id) if _hashable(order_id) else None
+        if not orders:
+            return
+        for idx, order in enumerate(orders):
+            if order is order_entry:
+                del orders[idx]
+                break
+        if not orders:
+            del cached[1][order_id]
+
+    def _orders_by_id(self, facility_entry: Dict[str, Any]) -> Dict[Any, List[Dict[str, Any]]]:
+        cached = self._orders.get(id(facility_entry))
+        if cached is not None and cached[0] is facility_entry:
+            return cached[1]
+        by_id: Dict[Any, List[Dict[str, Any]]] = {}
+        for order in self._normalize_orders(facility_entry):
+            if isinstance(order, dict) and _hashable(order.get("order_id")):
+                by_id.setdefault(order.get("order_id"), []).append(order)
+        self._orders[id(facility_entry)] = (facility_entry, by_id)
+        return by_id
+
+    def _index(self, table: Dict[Any, Any], key: Any, value: Any) -> None:
+        if not _hashable(key):
+            return
+        if key in table:
+            self._has_duplicates = True
+            return
+        table[key] = value
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
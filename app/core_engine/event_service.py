@@ -1,6 +1,8 @@
 import random
 from typing import Any, Dict, List, Optional
 
+from .history_index import HISTORY_INDEXES
+
 
 class EventService:
     def __init__(
@@ -60,6 +62,7 @@ class EventService:
         if events:
             history = self._get_event_history_list(session_state)
             history.extend(events)
+            HISTORY_INDEXES.update(history, appended=len(events))
             roll_text = "-" if roll is None else str(roll)
             for event in events:
                 event_id = event.get("event_id") or "unknown"
@@ -1,4 +1,8 @@
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .perf_stats import PERF
+from .turn_scheduler import DUE_KEY, build_remaining, order_progress
 
 
 class FacilityLifecycle:
@@ -12,7 +16,9 @@ class FacilityLifecycle:
         normalize_orders: Any,
         infer_order_status: Any,
         is_order_active: Any,
-        min_remaining_turns: Any,
+        scheduler: Any,
+        entity_index: Any,
+        drain_order_queue: Any,
     ) -> None:
         self._ledger = ledger
         self._catalog = catalog
@@ -22,7 +28,18 @@ class FacilityLifecycle:
         self._normalize_orders = normalize_orders
         self._infer_order_status = infer_order_status
         self._is_order_active = is_order_active
-        self._min_remaining_turns = min_remaining_turns
+        self._scheduler = scheduler
+        self._entity_index = entity_index
+        self._drain_order_queue = drain_order_queue
+        self._state_cache_lock = threading.Lock()
+        self._state_cache_session: Optional[Dict[str, Any]] = None
+        self._state_cache: Dict[int, Tuple[Dict[str, Any], Optional[int], Dict[str, Any]]] = {}
+        self._chain_costs: Dict[Tuple[str, Optional[str]], Dict[str, int]] = {}
+
+    def set_config(self, config: Dict[str, Any], changed: Optional[set] = None) -> None:
+        self._config = config
+        if changed is None or "default_build_costs" in changed:
+            self._chain_costs = {}
 
     def add_build_facility(self, session_state: Dict[str, Any], facility_id: str, allow_negative: bool = False) -> Dict[str, Any]:
         if not session_state:
@@ -34,7 +51,7 @@ class FacilityLifecycle:
 
         bastion = session_state.setdefault("bastion", {})
         facilities = bastion.setdefault("facilities", [])
-        if any(isinstance(entry, dict) and entry.get("facility_id") == facility_id for entry in facilities):
+        if self._entity_index.find_facility(session_state, facility_id):
             return {"success": False, "message": "Facility already exists"}
 
         build = facility_def.get("build", {}) if isinstance(facility_def.get("build"), dict) else {}
@@ -91,6 +108,8 @@ class FacilityLifecycle:
             "assigned_npcs": [],
         }
         facilities.append(facility_entry)
+        self._entity_index.add_facility(session_state, facility_entry)
+        self._scheduler.schedule_build(session_state, facility_entry)
 
         return {
             "success": True,
@@ -103,9 +122,9 @@ class FacilityLifecycle:
             return {"success": False, "message": "No session loaded"}
 
         bastion = session_state.setdefault("bastion", {})
-        facilities = bastion.setdefault("facilities", [])
+        bastion.setdefault("facilities", [])
 
-        facility_entry = next((f for f in facilities if isinstance(f, dict) and f.get("facility_id") == facility_id), None)
+        facility_entry = self._entity_index.find_facility(session_state, facility_id)
         if not facility_entry:
             return {"success": False, "message": f"Facility not found in bastion: {facility_id}"}
 
@@ -176,6 +195,8 @@ class FacilityLifecycle:
             "target_id": target_id,
         }
         facility_entry["current_order"] = None
+        self._scheduler.schedule_build(session_state, facility_entry)
+        self.invalidate_facility_state(facility_entry)
 
         return {
             "success": True,
@@ -190,7 +211,7 @@ class FacilityLifecycle:
         bastion = session_state.setdefault("bastion", {})
         facilities = bastion.setdefault("facilities", [])
 
-        facility_entry = next((f for f in facilities if isinstance(f, dict) and f.get("facility_id") == facility_id), None)
+        facility_entry = self._entity_index.find_facility(session_state, facility_id)
         if not facility_entry:
             return {"success": False, "message": f"Facility not found in bastion: {facility_id}"}
 
@@ -215,8 +236,14 @@ class FacilityLifecycle:
         npcs_unassigned = bastion.setdefault("npcs_unassigned", [])
         if assigned:
             npcs_unassigned.extend(assigned)
+            for npc in assigned:
+                if isinstance(npc, dict):
+                    self._entity_index.add_npc(session_state, npc, None)
 
         facilities.remove(facility_entry)
+        self._entity_index.remove_facility(session_state, facility_entry)
+        self._scheduler.discard_facility(session_state, facility_entry)
+        self.invalidate_facility_state(facility_entry)
 
         log_text = f"Facility demolished: {facility_id}"
         effects: List[Dict[str, Any]] = []
@@ -246,125 +273,192 @@ class FacilityLifecycle:
             return {"success": False, "message": "No session loaded"}
 
         bastion = session_state.setdefault("bastion", {})
-        facilities = bastion.setdefault("facilities", [])
-        for facility in facilities:
-            if not isinstance(facility, dict):
-                continue
-            orders = self._normalize_orders(facility)
-            if any(self._infer_order_status(order) == "ready" for order in orders if isinstance(order, dict)):
-                return {"success": False, "message": "Pending orders ready for evaluation"}
-
-        session_state["current_turn"] = int(session_state.get("current_turn", 0)) + 1
-        current_turn = session_state["current_turn"]
+        bastion.setdefault("facilities", [])
+        if self._scheduler.has_ready_orders(session_state):
+            return {"success": False, "message": "Pending orders ready for evaluation"}
 
-        self._npc_service.apply_npc_upkeep(session_state, current_turn)
+        completed = self._advance_span(session_state, 1)
 
-        completed = []
+        return {
+            "success": True,
+            "message": "Turn advanced",
+            "current_turn": session_state["current_turn"],
+            "completed": completed,
+        }
 
-        for facility in facilities:
-            if not isinstance(facility, dict):
-                continue
-            build_status = facility.get("build_status", {})
-            if not isinstance(build_status, dict):
-                continue
+    def advance_turns(self, session_state: Dict[str, Any], turns: Any) -> Dict[str, Any]:
+        """
+        Fast-forward up to `turns` turns, jumping from one build/order completion to the next.
+        Stops early as soon as an order becomes ready for evaluation.
+        """
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+        if not isinstance(turns, int) or isinstance(turns, bool) or turns <= 0:
+            return {"success": False, "message": "Turns must be a positive int"}
 
-            status = build_status.get("status")
-            remaining = build_status.get("remaining_turns")
-
-            if status in ["building", "upgrading"] and isinstance(remaining, int):
-                remaining -= 1
-                build_status["remaining_turns"] = remaining
-                if remaining <= 0:
-                    build_status["status"] = "operational"
-                    build_status.pop("remaining_turns", None)
-                    target_id = build_status.pop("target_id", None)
-
-                    if status == "building":
-                        facility["built_turn"] = current_turn
-                        completed.append({"facility_id": facility.get("facility_id"), "status": "built"})
-                    elif status == "upgrading":
-                        if target_id:
-                            facility["facility_id"] = target_id
-                        facility["upgraded_turn"] = current_turn
-                        completed.append({"facility_id": facility.get("facility_id"), "status": "upgraded"})
-
-            orders = self._normalize_orders(facility)
-            for order in orders:
-                if not isinstance(order, dict):
-                    continue
-                order_status = self._infer_order_status(order)
-                if order_status != "in_progress":
-                    continue
-                duration = order.get("duration_turns")
-                progress = order.get("progress")
-                if not isinstance(duration, int) or duration <= 0:
-                    continue
-                if not isinstance(progress, int):
-                    progress = 0
-                progress += 1
-                order["progress"] = progress
-                if progress >= duration:
-                    order["status"] = "ready"
-                    order.setdefault("ready_turn", current_turn)
+        bastion = session_state.setdefault("bastion", {})
+        bastion.setdefault("facilities", [])
+        if self._scheduler.has_ready_orders(session_state):
+            return {"success": False, "message": "Pending orders ready for evaluation"}
+
+        start_turn = int(session_state.get("current_turn", 0))
+        completed: List[Dict[str, Any]] = []
+        remaining = turns
+        stopped_early = False
+        while remaining > 0:
+            next_due = self._scheduler.next_due_turn(session_state)
+            span = remaining
+            if next_due is not None:
+                span = min(remaining, max(next_due - int(session_state.get("current_turn", 0)), 1))
+            completed.extend(self._advance_span(session_state, span))
+            remaining -= span
+            if self._scheduler.has_ready_orders(session_state):
+                stopped_early = remaining > 0
+                break
 
+        current_turn = session_state["current_turn"]
         return {
             "success": True,
-            "message": "Turn advanced",
+            "message": "Turns advanced",
             "current_turn": current_turn,
+            "turns_advanced": current_turn - start_turn,
+            "stopped_early": stopped_early,
             "completed": completed,
         }
 
-    def resolve_facility_states(self, session_state: Dict[str, Any]) -> List[Dict[str, Any]]:
-        bastion = (session_state or {}).get("bastion", {})
-        facilities = bastion.get("facilities", []) or []
-        results = []
+    def _advance_span(self, session_state: Dict[str, Any], span: int) -> List[Dict[str, Any]]:
+        self._scheduler.bind(session_state)
+        session_state["current_turn"] = int(session_state.get("current_turn", 0)) + span
+        current_turn = session_state["current_turn"]
 
-        for facility in facilities:
-            if not isinstance(facility, dict):
+        with PERF.phase("npc_upkeep"):
+            self._npc_service.apply_npc_upkeep(session_state, current_turn, span)
+
+        completed = []
+        finished = []
+
+        due = self._scheduler.pop_due(session_state, current_turn)
+        for kind, facility, target, due_turn in due:
+            target.pop(DUE_KEY, None)
+            if kind == "order":
+                target["progress"] = target.get("duration_turns")
+                target["status"] = "ready"
+                target.setdefault("ready_turn", due_turn)
                 continue
-            build_status = facility.get("build_status", {}) if isinstance(facility.get("build_status"), dict) else {}
-            status = build_status.get("status")
-            remaining_turns = None
+
+            status = target.get("status")
+            target["status"] = "operational"
+            target.pop("remaining_turns", None)
+            target_id = target.pop("target_id", None)
 
             if status == "building":
-                state = "building"
-                remaining_turns = build_status.get("remaining_turns")
+                facility["built_turn"] = due_turn
+                completed.append({"facility_id": facility.get("facility_id"), "status": "built"})
+                finished.append((facility, completed[-1]))
             elif status == "upgrading":
-                state = "upgrading"
-                remaining_turns = build_status.get("remaining_turns")
-            else:
-                orders = self._normalize_orders(facility)
-                active_orders = [o for o in orders if self._is_order_active(o)]
-                busy_orders = [o for o in active_orders if (self._infer_order_status(o) == "in_progress")]
-                ready_orders = [o for o in active_orders if (self._infer_order_status(o) == "ready")]
-
-                if ready_orders:
-                    state = "ready"
-                    remaining_turns = None
-                elif busy_orders:
-                    state = "busy"
-                    remaining_turns = self._min_remaining_turns(busy_orders)
-                else:
-                    state = "free"
-
-            facility_id = facility.get("facility_id")
-            facility_def = self._catalog.get(facility_id) if isinstance(facility_id, str) else None
-            slots_total = facility_def.get("npc_slots") if isinstance(facility_def, dict) else None
-            if not isinstance(slots_total, int):
-                slots_total = None
-            slots_used = len([o for o in self._normalize_orders(facility) if self._is_order_active(o)])
-
-            results.append({
-                "facility_id": facility_id,
-                "state": state,
-                "remaining_turns": remaining_turns,
-                "slots_total": slots_total,
-                "slots_used": slots_used,
-                "ready_orders": len([o for o in self._normalize_orders(facility) if self._infer_order_status(o) == "ready"]),
-                "busy_orders": len([o for o in self._normalize_orders(facility) if self._infer_order_status(o) == "in_progress"]),
-            })
-
-        return results
+                if target_id:
+                    old_id = facility.get("facility_id")
+                    facility["facility_id"] = target_id
+                    self._entity_index.rename_facility(session_state, facility, old_id)
+                facility["upgraded_turn"] = due_turn
+                completed.append({"facility_id": facility.get("facility_id"), "status": "upgraded"})
+                finished.append((facility, completed[-1]))
+
+        # Orders queued while the facility was being built/upgraded start now.
+        for facility, entry in finished:
+            started, dropped = self._drain_order_queue(session_state, facility)
+            if started:
+                entry["queue_started"] = started
+            if dropped:
+                entry["queue_dropped"] = dropped
+
+        return completed
+
+    def resolve_facility_states(self, session_state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Reads only the session; the summary cache has its own lock so concurrent readers can call it.
+        """
+        bastion = (session_state or {}).get("bastion", {})
+        facilities = bastion.get("facilities", []) or []
+        current_turn = int((session_state or {}).get("current_turn", 0))
+        with self._state_cache_lock:
+            if self._state_cache_session is not session_state:
+                self._state_cache_session = session_state
+                self._state_cache = {}
+            cache = self._state_cache
+
+            for facility in facilities:
+                if not isinstance(facility, dict):
+                    continue
+                cached = cache.get(id(facility))
+                if cached is None or cached[0] is not facility or (cached[1] is not None and cached[1] != current_turn):
+                    summary = self._summarize_facility(facility, current_turn)
+                    turn_key = current_turn if summary["remaining_turns"] is not None else None
+                    cache[id(facility)] = (facility, turn_key, summary)
+
+            return [
+                dict(cache[id(facility)][2])
+                for facility in facilities
+                if isinstance(facility, dict)
+            ]
+
+    def invalidate_facility_state(self, facility_entry: Any) -> None:
+        """
+        Drop the cached state summary of one facility (orders or build status changed).
+        """
+        with self._state_cache_lock:
+            self._state_cache.pop(id(facility_entry), None)
+
+    def _summarize_facility(self, facility: Dict[str, Any], current_turn: int) -> Dict[str, Any]:
+        ready_orders = 0
+        busy_orders = 0
+        min_remaining: Optional[int] = None
+        for order in self._normalize_orders(facility):
+            if not isinstance(order, dict):
+                continue
+            order_status = self._infer_order_status(order)
+            if order_status == "ready":
+                ready_orders += 1
+            elif order_status == "in_progress":
+                busy_orders += 1
+                duration = order.get("duration_turns")
+                if not isinstance(duration, int) or duration <= 0:
+                    continue
+                progress = order_progress(order, current_turn)
+                if not isinstance(progress, int):
+                    progress = 0
+                rem = max(duration - progress, 0)
+                min_remaining = rem if min_remaining is None else min(min_remaining, rem)
+
+        build_status = facility.get("build_status", {}) if isinstance(facility.get("build_status"), dict) else {}
+        status = build_status.get("status")
+        remaining_turns = None
+        if status in ["building", "upgrading"]:
+            state = status
+            remaining_turns = build_remaining(build_status, current_turn)
+        elif ready_orders:
+            state = "ready"
+        elif busy_orders:
+            state = "busy"
+            remaining_turns = min_remaining
+        else:
+            state = "free"
+
+        facility_id = facility.get("facility_id")
+        facility_def = self._catalog.get(facility_id) if isinstance(facility_id, str) else None
+        slots_total = facility_def.get("npc_slots") if isinstance(facility_def, dict) else None
+        if not isinstance(slots_total, int):
+            slots_total = None
+
+        return {
+            "facility_id": facility_id,
+            "state": state,
+            "remaining_turns": remaining_turns,
+            "slots_total": slots_total,
+            "slots_used": ready_orders + busy_orders,
+            "ready_orders": ready_orders,
+            "busy_orders": busy_orders,
+        }
 
     def _projected_treasury_base(self, session_state: Dict[str, Any], cost: Dict[str, Any]) -> Optional[float]:
         base = self._ledger.get_treasury_base(session_state)
@@ -406,6 +500,12 @@ class FacilityLifecycle:
         return [effect]
 
     def _sum_facility_chain_costs(self, facility_id: str, extra_target: Optional[str] = None) -> Dict[str, int]:
+        key = (facility_id, extra_target)
+        if key not in self._chain_costs:
+            self._chain_costs[key] = self._compute_chain_costs(facility_id, extra_target)
+        return dict(self._chain_costs[key])
+
+    def _compute_chain_costs(self, facility_id: str, extra_target: Optional[str]) -> Dict[str, int]:
         chain = self._collect_facility_chain(facility_id)
         if extra_target:
             target_def = self._catalog.get(extra_target)
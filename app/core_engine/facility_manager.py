@@ -1,16 +1,24 @@
+import hashlib
 import json
+import random
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from .logger import setup_logger
 from .ledger import Ledger
 from .audit_log import AuditLog
-from .facility_helpers import value_set
 from .formula_engine import FormulaEngine
 from .event_service import EventService
 from .npc_service import NpcService
-from .order_engine import OrderEngine
+from .order_engine import OrderEngine, note_queue_dropped
 from .facility_lifecycle import FacilityLifecycle
+from .turn_scheduler import TurnScheduler
+from .entity_index import EntityIndex
+from .order_planner import OrderPlanner
+from .outcome_tables import OutcomeTables, bucket_for_roll
+from .cow_overlay import cow_overlay, materialized_count
+from .perf_stats import PERF
 
 logger = setup_logger("facility_manager")
 
@@ -24,9 +32,11 @@ class FacilityManager:
         self.custom_packs_dir = root_dir / "custom_packs"
         self.config_path = root_dir / "data" / "config" / "bastion_config.json"
         self.config = self._load_config()
-        self.catalog = self._load_facility_catalog()
-        self.event_index, self.event_groups = self._load_event_tables()
-        self.formula_index = self._load_formula_engines()
+        packs = self._read_pack_files()
+        self.catalog = self._load_facility_catalog(packs)
+        self.event_index, self.event_groups = self._load_event_tables(packs)
+        self.formula_index = self._load_formula_engines(packs)
+        self._catalog_bundles: Dict[bool, Dict[str, Any]] = {}
         self._audit_log = AuditLog(self._config_manager)
         self._formula_engine = FormulaEngine(
             self.ledger,
@@ -39,6 +49,10 @@ class FacilityManager:
             self._audit_log,
             logger,
         )
+        self._scheduler = TurnScheduler(self._normalize_orders, self._infer_order_status)
+        self._entity_index = EntityIndex(self._normalize_orders)
+        self._outcome_tables = OutcomeTables(self._resolve_check_profile, self._get_check_profile_sides)
+        self._compile_outcome_tables()
         self._npc_service = NpcService(
             self.ledger,
             self.catalog,
@@ -48,6 +62,8 @@ class FacilityManager:
             self._normalize_orders,
             self._is_order_active,
             self._find_facility_entry,
+            self._invalidate_facility_state,
+            self._entity_index,
         )
         self._order_engine = OrderEngine(
             self.ledger,
@@ -66,6 +82,10 @@ class FacilityManager:
             self._dice_sides_from_profile,
             self._determine_outcome,
             self._get_effects_for_bucket,
+            self._scheduler,
+            self._invalidate_facility_state,
+            self._entity_index,
+            self._audit_log,
         )
         self._facility_lifecycle = FacilityLifecycle(
             self.ledger,
@@ -76,24 +96,43 @@ class FacilityManager:
             self._normalize_orders,
             self._infer_order_status,
             self._is_order_active,
-            self._min_remaining_turns,
+            self._scheduler,
+            self._entity_index,
+            self._order_engine.drain_order_queue,
+        )
+        self._order_planner = OrderPlanner(
+            self.ledger,
+            self.catalog,
+            self.get_outcome_probabilities,
+            self._get_effects_for_bucket,
+            self._normalize_orders,
+            self._is_order_active,
         )
+        if self._config_manager:
+            self._config_manager.subscribe(self._apply_config)
 
     def _load_config(self) -> Dict[str, Any]:
         try:
             if self._config_manager:
-                return self._config_manager.get_config()
+                return self._config_manager.get_config_snapshot()
             return json.loads(self.config_path.read_text(encoding="utf-8"))
         except Exception as e:
             logger.warning(f"Failed to load bastion_config.json: {e}")
             return {}
 
     def reload_config(self) -> None:
-        self.config = self._load_config()
-        if hasattr(self, "_npc_service"):
-            self._npc_service._config = self.config
-        if hasattr(self, "_facility_lifecycle"):
-            self._facility_lifecycle._config = self.config
+        self._apply_config(self._load_config())
+
+    def _apply_config(self, config: Dict[str, Any], changed: Optional[set] = None) -> None:
+        """
+        Hand a new config to the services; `changed` (top-level sections, None = all) limits
+        which derived tables are rebuilt.
+        """
+        self.config = config
+        self._npc_service.set_config(config)
+        self._facility_lifecycle.set_config(config, changed)
+        if changed is None or changed & {"check_profiles", "npc_progression"}:
+            self._compile_outcome_tables()
 
     def _get_internal_int_setting(self, key: str, default: int) -> int:
         if not isinstance(self.config, dict):
@@ -117,7 +156,10 @@ class FacilityManager:
             return float(value)
         return default
 
-    def _get_facility_owner_limit(self) -> int:
+    def get_facility_owner_limit(self) -> int:
+        """
+        How many facilities one player may own (facility_owner_limit, default 3).
+        """
         if not isinstance(self.config, dict):
             return 3
         value = self.config.get("facility_owner_limit")
@@ -125,8 +167,11 @@ class FacilityManager:
             return value
         return 3
 
-    def _load_facility_catalog(self) -> Dict[str, Dict[str, Any]]:
-        catalog: Dict[str, Dict[str, Any]] = {}
+    def _read_pack_files(self) -> List[Tuple[str, Path, Any]]:
+        """
+        Parse every core/custom pack once: [(source, pack_file, data)] in load order.
+        """
+        packs: List[Tuple[str, Path, Any]] = []
         pack_dirs = [
             ("core", self.facilities_dir),
             ("custom", self.custom_packs_dir),
@@ -144,151 +189,168 @@ class FacilityManager:
                 except Exception as e:
                     logger.warning(f"Failed to read pack file {pack_file.name}: {e}")
                     continue
+                packs.append((source, pack_file, data))
 
-                pack_id = data.get("pack_id") or pack_file.stem
-                facilities = data.get("facilities", []) or []
-                if not isinstance(facilities, list):
-                    continue
+        return packs
 
-                for facility in facilities:
-                    if not isinstance(facility, dict):
-                        continue
-                    facility_id = facility.get("id")
-                    if not isinstance(facility_id, str):
-                        continue
-                    if facility_id in catalog:
-                        logger.warning(f"Duplicate facility id in catalog: {facility_id}")
-                        continue
-                    item = dict(facility)
-                    item["_pack_id"] = pack_id
-                    item["_pack_source"] = source
-                    catalog[facility_id] = item
+    def _load_facility_catalog(self, packs: List[Tuple[str, Path, Any]]) -> Dict[str, Dict[str, Any]]:
+        catalog: Dict[str, Dict[str, Any]] = {}
+        for source, pack_file, data in packs:
+            pack_id = data.get("pack_id") or pack_file.stem
+            facilities = data.get("facilities", []) or []
+            if not isinstance(facilities, list):
+                continue
+
+            for facility in facilities:
+                if not isinstance(facility, dict):
+                    continue
+                facility_id = facility.get("id")
+                if not isinstance(facility_id, str):
+                    continue
+                if facility_id in catalog:
+                    logger.warning(f"Duplicate facility id in catalog: {facility_id}")
+                    continue
+                item = dict(facility)
+                item["_pack_id"] = pack_id
+                item["_pack_source"] = source
+                catalog[facility_id] = item
 
         return catalog
 
-    def _load_event_tables(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    def _load_event_tables(self, packs: List[Tuple[str, Path, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
         event_index: Dict[str, Dict[str, Any]] = {}
         event_groups: Dict[str, List[Dict[str, Any]]] = {}
-        pack_dirs = [
-            ("core", self.facilities_dir),
-            ("custom", self.custom_packs_dir),
-        ]
-
-        for source, pack_dir in pack_dirs:
-            if not pack_dir.exists():
+        for source, pack_file, data in packs:
+            pack_id = data.get("pack_id") or pack_file.stem
+            mechanics = data.get("custom_mechanics", []) or []
+            if not isinstance(mechanics, list):
                 continue
 
-            for pack_file in sorted(pack_dir.glob("*.json")):
-                try:
-                    data = json.loads(pack_file.read_text(encoding="utf-8"))
-                except Exception as e:
-                    logger.warning(f"Failed to read pack file {pack_file.name}: {e}")
+            for mech in mechanics:
+                if not isinstance(mech, dict):
+                    continue
+                if mech.get("type") != "event_table":
                     continue
 
-                pack_id = data.get("pack_id") or pack_file.stem
-                mechanics = data.get("custom_mechanics", []) or []
-                if not isinstance(mechanics, list):
+                config = mech.get("config", {}) if isinstance(mech.get("config"), dict) else {}
+                groups = config.get("groups", [])
+                if not isinstance(groups, list):
                     continue
 
-                for mech in mechanics:
-                    if not isinstance(mech, dict):
+                for group in groups:
+                    if not isinstance(group, dict):
                         continue
-                    if mech.get("type") != "event_table":
+                    group_id = group.get("id")
+                    if not isinstance(group_id, str) or not group_id:
                         continue
-
-                    config = mech.get("config", {}) if isinstance(mech.get("config"), dict) else {}
-                    groups = config.get("groups", [])
-                    if not isinstance(groups, list):
+                    entries = group.get("entries", [])
+                    if not isinstance(entries, list):
                         continue
 
-                    for group in groups:
-                        if not isinstance(group, dict):
+                    group_entries = event_groups.setdefault(group_id, [])
+                    for entry in entries:
+                        if not isinstance(entry, dict):
                             continue
-                        group_id = group.get("id")
-                        if not isinstance(group_id, str) or not group_id:
+                        event_id = entry.get("id")
+                        text = entry.get("text")
+                        if not isinstance(event_id, str) or not event_id:
                             continue
-                        entries = group.get("entries", [])
-                        if not isinstance(entries, list):
+                        if not isinstance(text, str) or not text:
                             continue
-
-                        group_entries = event_groups.setdefault(group_id, [])
-                        for entry in entries:
-                            if not isinstance(entry, dict):
-                                continue
-                            event_id = entry.get("id")
-                            text = entry.get("text")
-                            if not isinstance(event_id, str) or not event_id:
-                                continue
-                            if not isinstance(text, str) or not text:
-                                continue
-                            weight = entry.get("weight")
-                            if not isinstance(weight, int) or weight <= 0:
-                                weight = 1
-
-                            item = {
-                                "id": event_id,
-                                "text": text,
-                                "weight": weight,
-                                "group_id": group_id,
-                                "pack_id": pack_id,
-                                "pack_source": source,
-                            }
-                            group_entries.append(item)
-                            if event_id not in event_index:
-                                event_index[event_id] = item
-                            else:
-                                logger.warning(f"Duplicate event id '{event_id}' in {pack_file.name}")
+                        weight = entry.get("weight")
+                        if not isinstance(weight, int) or weight <= 0:
+                            weight = 1
+
+                        item = {
+                            "id": event_id,
+                            "text": text,
+                            "weight": weight,
+                            "group_id": group_id,
+                            "pack_id": pack_id,
+                            "pack_source": source,
+                        }
+                        group_entries.append(item)
+                        if event_id not in event_index:
+                            event_index[event_id] = item
+                        else:
+                            logger.warning(f"Duplicate event id '{event_id}' in {pack_file.name}")
 
         return event_index, event_groups
 
-    def _load_formula_engines(self) -> Dict[str, Dict[str, Any]]:
+    def _load_formula_engines(self, packs: List[Tuple[str, Path, Any]]) -> Dict[str, Dict[str, Any]]:
         formula_index: Dict[str, Dict[str, Any]] = {}
-        pack_dirs = [
-            ("core", self.facilities_dir),
-            ("custom", self.custom_packs_dir),
-        ]
-
-        for source, pack_dir in pack_dirs:
-            if not pack_dir.exists():
+        for source, pack_file, data in packs:
+            pack_id = data.get("pack_id") or pack_file.stem
+            mechanics = data.get("custom_mechanics", []) or []
+            if not isinstance(mechanics, list):
                 continue
 
-            for pack_file in sorted(pack_dir.glob("*.json")):
-                try:
-                    data = json.loads(pack_file.read_text(encoding="utf-8"))
-                except Exception as e:
-                    logger.warning(f"Failed to read pack file {pack_file.name}: {e}")
+            for mech in mechanics:
+                if not isinstance(mech, dict):
                     continue
-
-                pack_id = data.get("pack_id") or pack_file.stem
-                mechanics = data.get("custom_mechanics", []) or []
-                if not isinstance(mechanics, list):
+                if mech.get("type") != "formula_engine":
                     continue
-
-                for mech in mechanics:
-                    if not isinstance(mech, dict):
-                        continue
-                    if mech.get("type") != "formula_engine":
-                        continue
-                    name = mech.get("name") or mech.get("id")
-                    if not isinstance(name, str) or not name:
-                        continue
-                    item = {
-                        "id": mech.get("id") or name,
-                        "name": mech.get("name") or name,
-                        "config": mech.get("config") if isinstance(mech.get("config"), dict) else {},
-                        "pack_id": pack_id,
-                        "pack_source": source,
-                    }
-                    if name in formula_index:
-                        logger.warning(f"Duplicate formula engine name '{name}' in {pack_file.name}")
-                        continue
-                    formula_index[name] = item
-                    alt_id = mech.get("id")
-                    if isinstance(alt_id, str) and alt_id and alt_id != name and alt_id not in formula_index:
-                        formula_index[alt_id] = item
+                name = mech.get("name") or mech.get("id")
+                if not isinstance(name, str) or not name:
+                    continue
+                item = {
+                    "id": mech.get("id") or name,
+                    "name": mech.get("name") or name,
+                    "config": mech.get("config") if isinstance(mech.get("config"), dict) else {},
+                    "pack_id": pack_id,
+                    "pack_source": source,
+                }
+                if name in formula_index:
+                    logger.warning(f"Duplicate formula engine name '{name}' in {pack_file.name}")
+                    continue
+                formula_index[name] = item
+                alt_id = mech.get("id")
+                if isinstance(alt_id, str) and alt_id and alt_id != name and alt_id not in formula_index:
+                    formula_index[alt_id] = item
 
         return formula_index
 
+    def get_catalog_bundle(self, etag: Optional[str] = None, slim: bool = False) -> Dict[str, Any]:
+        """
+        Loaded catalog (pack order) plus formula registry in one payload. A matching etag
+        returns only {"unchanged": True}; slim drops order outcomes and formula configs.
+        """
+        bundle = self._catalog_bundles.get(bool(slim))
+        if bundle is None:
+            bundle = self._build_catalog_bundle(bool(slim))
+            self._catalog_bundles[bool(slim)] = bundle
+        if etag and etag == bundle["etag"]:
+            return {"success": True, "unchanged": True, "etag": bundle["etag"]}
+        return bundle
+
+    def _build_catalog_bundle(self, slim: bool) -> Dict[str, Any]:
+        facilities = list(self.catalog.values())
+        formulas = {name: item for name, item in self.formula_index.items() if item.get("name") == name}
+        if slim:
+            facilities = [self._slim_facility(facility) for facility in facilities]
+            formulas = {name: {k: v for k, v in item.items() if k != "config"} for name, item in formulas.items()}
+        payload = {"facilities": facilities, "formulas": formulas}
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return {
+            "success": True,
+            "unchanged": False,
+            "etag": f"{'slim' if slim else 'full'}-{digest[:16]}",
+            "slim": slim,
+            **payload,
+        }
+
+    @staticmethod
+    def _slim_facility(facility: Dict[str, Any]) -> Dict[str, Any]:
+        slim = {key: value for key, value in facility.items() if key != "orders"}
+        orders = facility.get("orders")
+        if isinstance(orders, list):
+            slim["orders"] = [
+                {key: order.get(key) for key in ("id", "name", "min_npc_level", "duration_turns") if key in order}
+                for order in orders
+                if isinstance(order, dict)
+            ]
+        return slim
+
     def add_build_facility(self, session_state: Dict[str, Any], facility_id: str, allow_negative: bool = False) -> Dict[str, Any]:
         return self._facility_lifecycle.add_build_facility(session_state, facility_id, allow_negative)
 
@@ -317,7 +379,7 @@ class FacilityManager:
         if not owner:
             return {"success": False, "message": "Player not found"}
 
-        limit = self._get_facility_owner_limit()
+        limit = self.get_facility_owner_limit()
         current_owner = facility_entry.get("owner_player_id")
         if current_owner != player_id:
             facilities = session_state.get("bastion", {}).get("facilities", [])
@@ -329,11 +391,94 @@ class FacilityManager:
         return {"success": True, "message": "Owner updated", "facility": facility_entry}
 
     def advance_turn(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
-        return self._facility_lifecycle.advance_turn(session_state)
+        with PERF.phase("advance_turn"):
+            return self._facility_lifecycle.advance_turn(session_state)
+
+    def advance_turns(self, session_state: Dict[str, Any], turns: int) -> Dict[str, Any]:
+        with PERF.phase("advance_turns"):
+            return self._facility_lifecycle.advance_turns(session_state, turns)
 
     def resolve_facility_states(self, session_state: Dict[str, Any]) -> List[Dict[str, Any]]:
         return self._facility_lifecycle.resolve_facility_states(session_state)
 
+    def _invalidate_facility_state(self, facility_entry: Any) -> None:
+        if hasattr(self, "_facility_lifecycle"):
+            self._facility_lifecycle.invalidate_facility_state(facility_entry)
+
+    def bind_session(self, session_state: Dict[str, Any]) -> None:
+        """
+        Build the scheduler and entity index for session_state now instead of on its first call.
+        """
+        self._scheduler.bind(session_state)
+        self._entity_index.bind(session_state)
+
+    @contextmanager
+    def _isolated_bindings(self):
+        """
+        Scheduler and entity index work on a throwaway session (overlay) inside this block.
+        """
+        with self._scheduler.isolated(), self._entity_index.isolated():
+            yield
+
+    def preview_next_turn(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Dry run of advance_turn + roll_and_evaluate_ready_orders on a copy-on-write overlay.
+        Orders that are already ready are evaluated first (as the turn could not advance
+        otherwise) and listed under "evaluated_ready".
+        The session, the scheduler binding and the random state are left untouched.
+        """
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+
+        overlay = cow_overlay(session_state, fresh_keys=["audit_log", "event_history"])
+        rng_state = random.getstate()
+        try:
+            with self._isolated_bindings():
+                base_before = self.ledger.get_treasury_base(overlay)
+                ready: Dict[str, Any] = {}
+                if self._scheduler.has_ready_orders(overlay):
+                    ready = self.roll_and_evaluate_ready_orders(overlay)
+                base_before_turn = self.ledger.get_treasury_base(overlay)
+                advanced = self.advance_turn(overlay)
+                if not advanced.get("success"):
+                    return {**advanced, "skipped": ready.get("skipped", [])}
+                base_after_upkeep = self.ledger.get_treasury_base(overlay)
+                evaluated = self.roll_and_evaluate_ready_orders(overlay)
+                base_after = self.ledger.get_treasury_base(overlay)
+        finally:
+            random.setstate(rng_state)
+
+        audit_entries = [dict(entry) for entry in overlay.get("audit_log", [])]
+        upkeep_by_currency: Dict[str, int] = {}
+        upkeep_entries = 0
+        for entry in audit_entries:
+            if entry.get("event_type") != "npc_upkeep":
+                continue
+            upkeep_entries += len(entry.get("details") or [])
+            for change in str(entry.get("changes") or "").split("|"):
+                parts = change.split(":")
+                if len(parts) == 3 and parts[0] == "currency":
+                    upkeep_by_currency[parts[1]] = upkeep_by_currency.get(parts[1], 0) + int(parts[2])
+        return {
+            "success": True,
+            "message": "Turn preview",
+            "current_turn": overlay.get("current_turn"),
+            "completed": advanced.get("completed", []),
+            "evaluated_ready": ready.get("results", []),
+            "evaluated": evaluated.get("results", []),
+            "skipped": ready.get("skipped", []) + evaluated.get("skipped", []),
+            "upkeep": {
+                "npcs": upkeep_entries,
+                "by_currency": upkeep_by_currency,
+                "base": base_before_turn - base_after_upkeep,
+            },
+            "treasury_base_before": base_before,
+            "treasury_base_after": base_after,
+            "treasury_delta": base_after - base_before,
+            "audit_entries": audit_entries,
+            "materialized": materialized_count(overlay),
+        }
+
     def hire_npc(
         self,
         session_state: Dict[str, Any],
@@ -343,7 +488,7 @@ class FacilityManager:
         upkeep: Dict[str, Any],
         facility_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        return self._npc_service.hire_npc(
+        result = self._npc_service.hire_npc(
             session_state,
             name,
             profession,
@@ -351,6 +496,7 @@ class FacilityManager:
             upkeep,
             facility_id,
         )
+        return self._drain_after(session_state, result, facility_id)
 
     def move_npc(
         self,
@@ -358,14 +504,95 @@ class FacilityManager:
         npc_id: str,
         target_facility_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        return self._npc_service.move_npc(session_state, npc_id, target_facility_id)
+        result = self._npc_service.move_npc(session_state, npc_id, target_facility_id)
+        return self._drain_after(session_state, result, target_facility_id)
 
     def fire_npc(self, session_state: Dict[str, Any], npc_id: str) -> Dict[str, Any]:
         return self._npc_service.fire_npc(session_state, npc_id)
 
+    def apply_npc_batch(self, session_state: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Hire/move/fire several NPCs atomically: the operations run once on the session and
+        the NPC lists and orders they touched are restored if any of them fails.
+        """
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+        if not isinstance(operations, list) or not operations:
+            return {"success": False, "message": "Operations must be a non-empty list"}
+
+        applied = self._npc_service.apply_npc_operations(session_state, operations)
+        if not applied.get("success"):
+            return {
+                "success": False,
+                "message": applied.get("message"),
+                "failed_index": applied.get("failed_index"),
+            }
+        targets = [op.get("facility_id") for op in operations if isinstance(op, dict) and op.get("action") in ["hire", "move"]]
+        return self._drain_after(session_state, applied, *dict.fromkeys(targets))
+
     def start_order(self, session_state: Dict[str, Any], facility_id: str, npc_id: str, order_id: str) -> Dict[str, Any]:
         return self._order_engine.start_order(session_state, facility_id, npc_id, order_id)
 
+    def queue_order(self, session_state: Dict[str, Any], facility_id: str, order_id: str, npc_id: Optional[str] = None) -> Dict[str, Any]:
+        return self._order_engine.queue_order(session_state, facility_id, order_id, npc_id)
+
+    def remove_queued_order(self, session_state: Dict[str, Any], facility_id: str, index: int) -> Dict[str, Any]:
+        return self._order_engine.remove_queued_order(session_state, facility_id, index)
+
+    def _drain_after(self, session_state: Dict[str, Any], result: Dict[str, Any], *facility_ids: Optional[str]) -> Dict[str, Any]:
+        """
+        NPCs arriving at a facility may start its queued orders.
+        """
+        if not result.get("success"):
+            return result
+        started: List[Dict[str, Any]] = []
+        dropped: List[Dict[str, Any]] = []
+        for facility_id in facility_ids:
+            facility_entry = self._find_facility_entry(session_state, facility_id) if facility_id else None
+            if facility_entry:
+                facility_started, facility_dropped = self._order_engine.drain_order_queue(session_state, facility_entry)
+                started.extend(facility_started)
+                dropped.extend(facility_dropped)
+        if started:
+            result["queue_started"] = started
+        return note_queue_dropped(result, dropped)
+
+    def plan_order_assignments(self, session_state: Dict[str, Any], include_reserve: bool = True, per_turn: bool = False) -> Dict[str, Any]:
+        return self._order_planner.plan(session_state, include_reserve, per_turn)
+
+    def apply_order_plan(self, session_state: Dict[str, Any], assignments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Start the orders of a plan (moving reserve NPCs first where the plan says so).
+        """
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+        if not isinstance(assignments, list):
+            return {"success": False, "message": "Assignments must be a list"}
+        started = []
+        failed = []
+        for assignment in assignments:
+            if not isinstance(assignment, dict):
+                continue
+            facility_id = assignment.get("facility_id")
+            npc_id = assignment.get("npc_id")
+            order_id = assignment.get("order_id")
+            if assignment.get("move"):
+                moved = self.move_npc(session_state, npc_id, facility_id)
+                if not moved.get("success"):
+                    failed.append({**assignment, "reason": moved.get("message")})
+                    continue
+            result = self.start_order(session_state, facility_id, npc_id, order_id)
+            if result.get("success"):
+                started.append(assignment)
+            else:
+                failed.append({**assignment, "reason": result.get("message")})
+        return {
+            "success": not failed,
+            "message": f"{len(started)} orders started",
+            "started": started,
+            "failed": failed,
+        }
+
     def lock_order_roll(self, session_state: Dict[str, Any], facility_id: str, order_id: str, roll_value: Optional[int] = None, auto: bool = False) -> Dict[str, Any]:
         return self._order_engine.lock_order_roll(session_state, facility_id, order_id, roll_value, auto)
 
@@ -438,6 +665,41 @@ class FacilityManager:
 
         return {"success": True, "message": "Formula inputs saved"}
 
+    def get_formula_inputs(self, trigger_id: str) -> List[Dict[str, Any]]:
+        """
+        User-supplied inputs of a registered formula: [{name, source, default, sides}].
+        sides is the die size of "check" inputs (None for other sources).
+        """
+        formula_def = self.formula_index.get(trigger_id)
+        config = formula_def.get("config", {}) if isinstance(formula_def, dict) else {}
+        input_defs = config.get("inputs", []) if isinstance(config.get("inputs"), list) else []
+        specs: List[Dict[str, Any]] = []
+        for input_def in input_defs:
+            if not isinstance(input_def, dict) or not self._is_formula_user_input_source(input_def.get("source")):
+                continue
+            source = self._normalize_formula_source(input_def.get("source"))
+            specs.append({
+                "name": input_def.get("name"),
+                "source": source,
+                "default": input_def.get("default"),
+                "sides": self._get_check_profile_sides(input_def.get("check_profile")) if source == "check" else None,
+            })
+        return specs
+
+    def run_formula(
+        self,
+        session_state: Dict[str, Any],
+        trigger_id: str,
+        inputs: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Effects a registered formula resolves to for the given inputs (not applied) and errors.
+        """
+        formula_def = self.formula_index.get(trigger_id)
+        if not isinstance(formula_def, dict):
+            return [], [f"Formula not found: {trigger_id}"]
+        return self._formula_engine.execute(session_state, formula_def, inputs)
+
     def evaluate_order(self, session_state: Dict[str, Any], facility_id: str, order_id: str) -> Dict[str, Any]:
         return self._order_engine.evaluate_order(session_state, facility_id, order_id)
 
@@ -503,13 +765,15 @@ class FacilityManager:
         return sides
 
     def evaluate_ready_orders(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
-        return self._order_engine.evaluate_ready_orders(session_state)
+        with PERF.phase("evaluate_ready_orders"):
+            return self._order_engine.evaluate_ready_orders(session_state)
 
     def roll_and_evaluate_ready_orders(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Auto-roll (if needed) and evaluate all ready orders.
         """
-        return self._order_engine.roll_and_evaluate_ready_orders(session_state)
+        with PERF.phase("roll_and_evaluate_ready_orders"):
+            return self._order_engine.roll_and_evaluate_ready_orders(session_state)
 
     def _normalize_orders(self, facility_entry: Dict[str, Any]) -> List[Dict[str, Any]]:
         orders = facility_entry.get("current_orders")
@@ -540,8 +804,8 @@ class FacilityManager:
             normalized[currency] = amount
         return normalized
 
-    def _apply_npc_upkeep(self, session_state: Dict[str, Any], current_turn: int) -> None:
-        self._npc_service.apply_npc_upkeep(session_state, current_turn)
+    def _apply_npc_upkeep(self, session_state: Dict[str, Any], current_turn: int, turns: int = 1) -> None:
+        self._npc_service.apply_npc_upkeep(session_state, current_turn, turns)
 
     def _xp_gain_for_order(
         self,
@@ -579,6 +843,12 @@ class FacilityManager:
             return "ready"
         return "in_progress"
 
+    def get_active_orders(self, facility_entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Orders of a facility entry that are in progress or ready for evaluation.
+        """
+        return [order for order in self._normalize_orders(facility_entry) if self._is_order_active(order)]
+
     def _is_order_active(self, order: Any) -> bool:
         if not isinstance(order, dict):
             return False
@@ -587,12 +857,11 @@ class FacilityManager:
 
     def _find_facility_entry(self, session_state: Dict[str, Any], facility_id: str) -> Optional[Dict[str, Any]]:
         bastion = session_state.setdefault("bastion", {})
-        facilities = bastion.setdefault("facilities", [])
-        return next((f for f in facilities if isinstance(f, dict) and f.get("facility_id") == facility_id), None)
+        bastion.setdefault("facilities", [])
+        return self._entity_index.find_facility(session_state, facility_id)
 
     def _find_order_entry(self, facility_entry: Dict[str, Any], order_id: str) -> Optional[Dict[str, Any]]:
-        orders = self._normalize_orders(facility_entry)
-        return next((o for o in orders if isinstance(o, dict) and o.get("order_id") == order_id), None)
+        return self._entity_index.find_order(facility_entry, order_id)
 
     def _find_order_def(self, facility_id: str, order_id: str) -> Optional[Dict[str, Any]]:
         facility_def = self.catalog.get(facility_id)
@@ -603,19 +872,6 @@ class FacilityManager:
             return None
         return next((o for o in orders if isinstance(o, dict) and o.get("id") == order_id), None)
 
-    def _min_remaining_turns(self, orders: List[Dict[str, Any]]) -> Optional[int]:
-        remaining = None
-        for order in orders:
-            duration = order.get("duration_turns")
-            progress = order.get("progress", 0)
-            if not isinstance(duration, int) or duration <= 0:
-                continue
-            if not isinstance(progress, int):
-                progress = 0
-            rem = max(duration - progress, 0)
-            remaining = rem if remaining is None else min(remaining, rem)
-        return remaining
-
     def _dice_sides_from_profile(self, check_profile: str) -> Optional[int]:
         return self._get_check_profile_sides(check_profile)
 
@@ -642,21 +898,32 @@ class FacilityManager:
     def _determine_outcome(self, check_profile: Any, npc_level: Any, roll: Any) -> str:
         if not check_profile:
             return "on_success"
+        bucket = self._outcome_tables.bucket(check_profile, npc_level, roll)
+        if bucket is not None:
+            return bucket
+        # Rolls outside 1..sides (manual locks) are resolved against the profile directly.
         profile = self._resolve_check_profile(check_profile, npc_level)
         if not profile or not isinstance(roll, int):
             return "on_failure"
+        return bucket_for_roll(profile, roll)
 
-        crit_success = value_set(profile.get("crit_success"))
-        crit_fail = value_set(profile.get("crit_fail"))
-        if roll in crit_success:
-            return "on_critical_success"
-        if roll in crit_fail:
-            return "on_critical_failure"
+    def get_outcome_probabilities(self, check_profile: Any, npc_level: Any) -> Optional[Dict[str, float]]:
+        """
+        Bucket probabilities of a check at an NPC level (None if the profile cannot be rolled).
+        """
+        return self._outcome_tables.probabilities(check_profile, npc_level)
 
-        dc = profile.get("dc")
-        if isinstance(dc, int) and roll >= dc:
-            return "on_success"
-        return "on_failure"
+    def _compile_outcome_tables(self) -> None:
+        self._outcome_tables.reset()
+        profiles = self.config.get("check_profiles", {}) if isinstance(self.config, dict) else {}
+        if not isinstance(profiles, dict):
+            return
+        levels = {1, 2, 3}
+        progression = self.config.get("npc_progression", {})
+        level_names = progression.get("level_names", {}) if isinstance(progression, dict) else {}
+        if isinstance(level_names, dict):
+            levels.update(int(key) for key in level_names if str(key).isdigit())
+        self._outcome_tables.compile_all(profiles.keys(), sorted(levels))
 
     def _get_effects_for_bucket(self, outcome: Dict[str, Any], bucket: str) -> List[Dict[str, Any]]:
         if not isinstance(outcome, dict):
@@ -18,6 +18,17 @@ class FormulaEngine:
         self._get_internal_int_setting = get_internal_int_setting
         self._get_check_profile_sides = get_check_profile_sides
 
+    def execute(
+        self,
+        session_state: Dict[str, Any],
+        formula_def: Dict[str, Any],
+        inputs: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Effects a formula definition resolves to for the given user inputs (not applied), and errors.
+        """
+        return self._execute_formula_engine(session_state, formula_def, inputs or {})
+
     def _expand_formula_triggers(
         self,
         formula_index: Dict[str, Any],
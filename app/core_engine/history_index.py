@@ -0,0 +1,239 @@
+"""
+Secondary indexes over the session's history lists (audit_log, pending audit entries,
+event_history) for filtered, paginated queries.
+
+A RecordIndex maps field value -> ascending sequence numbers of the records holding it.
+Record i of the list has sequence number base + i, so dropping a prefix (the audit trim)
+only moves base; postings below base are skipped by bisect and compacted by a rebuild once
+they pile up. Indexes are built on the first query of a list and then kept current by the
+writers (AuditLog.add_entry, EventService.resolve_event_effects). Any change they did not
+report (load, rollback, edits) is caught by an identity check and rebuilds on the next query.
+Indexes are keyed by id(list) and keep only markers of the list (length, first and last
+record), never the list itself, so a list that is replaced or dropped is not kept alive.
+"""
+import bisect
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+AUDIT_FIELDS = ("turn", "event_type", "source_type", "source_id")
+EVENT_FIELDS = ("turn", "event_id")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_TRACKED_LISTS = 6
+COMPACT_AFTER = 4096
+
+
+class RecordIndex:
+    def __init__(self, records: List[Any], fields: Sequence[str]) -> None:
+        self.fields = tuple(fields)
+        self.rebuild(records)
+
+    def rebuild(self, records: List[Any]) -> None:
+        self._base = 0
+        self._postings: Dict[str, Dict[Any, List[int]]] = {field: {} for field in self.fields}
+        for seq, record in enumerate(records):
+            self._add(seq, record)
+        self._mark(records)
+
+    def in_sync(self, records: List[Any]) -> bool:
+        return (
+            len(records) == self._length
+            and (not records or (records[0] is self._first and records[-1] is self._last))
+        )
+
+    def update(self, records: List[Any], dropped: int, appended: int) -> None:
+        """
+        Since the last report the first `dropped` records were removed and `appended` records
+        were added at the end.
+        """
+        kept = self._length - dropped
+        if (
+            dropped < 0
+            or appended < 0
+            or kept < 0
+            or len(records) != kept + appended
+            or (kept and records[kept - 1] is not self._last)
+        ):
+            self._length = -1  # out of sync, rebuilt by the next query
+            return
+        self._base += dropped
+        if self._base > max(COMPACT_AFTER, len(records)):
+            self.rebuild(records)
+            return
+        for idx in range(kept, len(records)):
+            self._add(self._base + idx, records[idx])
+        self._mark(records)
+
+    def select(
+        self,
+        records: List[Any],
+        filters: Dict[str, Any],
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+    ) -> Sequence[int]:
+        """
+        Positions (list indexes, ascending) of the records matching every filter (field -> value)
+        and the inclusive turn range. Walks the shortest candidate list and checks the rest.
+        """
+        candidates: List[Tuple[int, Iterable[int]]] = []
+        for field, value in filters.items():
+            postings = self._live(self._postings[field].get(value, ()) if _hashable(value) else ())
+            candidates.append((len(postings), postings))
+        if turn_from is not None or turn_to is not None:
+            lists = [
+                self._live(seqs)
+                for turn, seqs in self._postings["turn"].items()
+                if isinstance(turn, int)
+                and (turn_from is None or turn >= turn_from)
+                and (turn_to is None or turn <= turn_to)
+            ]
+            count = sum(len(seqs) for seqs in lists)
+            merged = lists[0] if len(lists) == 1 else heapq.merge(*lists)
+            candidates.append((count, merged))
+        if not candidates:
+            return range(len(records))
+
+        candidates.sort(key=lambda item: item[0])
+        base = self._base
+        if len(candidates) == 1:
+            return [seq - base for seq in candidates[0][1]]
+        positions = []
+        for seq in candidates[0][1]:
+            record = records[seq - base]
+            if _matches(record, filters, turn_from, turn_to):
+                positions.append(seq - base)
+        return positions
+
+    def _live(self, seqs: Sequence[int]) -> Sequence[int]:
+        if not seqs or seqs[0] >= self._base:
+            return seqs
+        return seqs[bisect.bisect_left(seqs, self._base):]
+
+    def _add(self, seq: int, record: Any) -> None:
+        if not isinstance(record, dict):
+            return
+        for field in self.fields:
+            value = record.get(field)
+            if _hashable(value):
+                self._postings[field].setdefault(value, []).append(seq)
+
+    def _mark(self, records: List[Any]) -> None:
+        self._length = len(records)
+        self._first = records[0] if records else None
+        self._last = records[-1] if records else None
+
+
+class HistoryIndexes:
+    """
+    The RecordIndex of each recently queried list, keyed by id(list).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[int, RecordIndex]" = OrderedDict()
+
+    def update(self, records: List[Any], dropped: int = 0, appended: int = 1) -> None:
+        """
+        Report a change to a list; a no-op unless the list has been queried.
+        """
+        with self._lock:
+            index = self._indexes.get(id(records))
+            if index is not None:
+                index.update(records, dropped, appended)
+
+    def discard(self, records: List[Any]) -> None:
+        with self._lock:
+            self._indexes.pop(id(records), None)
+
+    def select(
+        self,
+        records: List[Any],
+        fields: Sequence[str],
+        filters: Dict[str, Any],
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+    ) -> Sequence[int]:
+        with self._lock:
+            index = self._indexes.get(id(records))
+            if index is None or index.fields != tuple(fields):
+                index = RecordIndex(records, fields)
+                self._indexes[id(records)] = index
+            elif not index.in_sync(records):
+                index.rebuild(records)
+            self._indexes.move_to_end(id(records))
+            while len(self._indexes) > MAX_TRACKED_LISTS:
+                self._indexes.popitem(last=False)
+            return index.select(records, filters, turn_from, turn_to)
+
+    def query(
+        self,
+        records: List[Any],
+        fields: Sequence[str],
+        filters: Dict[str, Any],
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        newest_first: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        One page of matching records: {success, entries, page, page_size, total, pages}.
+        """
+        page, page_size = normalize_page(page, page_size)
+        positions = self.select(records, fields, filters, turn_from, turn_to)
+        total = len(positions)
+        if newest_first:
+            stop = total - page * page_size
+            window = positions[max(stop - page_size, 0):max(stop, 0)][::-1]
+        else:
+            window = positions[page * page_size:(page + 1) * page_size]
+        return {
+            "success": True,
+            "entries": [records[pos] for pos in window],
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "pages": (total + page_size - 1) // page_size,
+        }
+
+
+HISTORY_INDEXES = HistoryIndexes()
+
+
+def normalize_page(page: Any, page_size: Any) -> Tuple[int, int]:
+    if not isinstance(page, int) or isinstance(page, bool) or page < 0:
+        page = 0
+    if not isinstance(page_size, int) or isinstance(page_size, bool) or page_size <= 0:
+        page_size = DEFAULT_PAGE_SIZE
+    return page, min(page_size, MAX_PAGE_SIZE)
+
+
+def clean_filters(**filters: Any) -> Dict[str, Any]:
+    """
+    Drop unset filters (None or empty string).
+    """
+    return {field: value for field, value in filters.items() if value is not None and value != ""}
+
+
+def _matches(record: Any, filters: Dict[str, Any], turn_from: Optional[int], turn_to: Optional[int]) -> bool:
+    if not isinstance(record, dict):
+        return False
+    for field, value in filters.items():
+        if record.get(field) != value:
+            return False
+    if turn_from is None and turn_to is None:
+        return True
+    turn = record.get("turn")
+    if not isinstance(turn, int):
+        return False
+    return (turn_from is None or turn >= turn_from) and (turn_to is None or turn <= turn_to)
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
@@ -16,11 +16,13 @@ class Ledger:
         self.config = self._load_config()
         self.currency_types, self.base_currency, self.factor_to_base = self._build_currency_model()
         self._audit_log = AuditLog(self._config_manager)
+        if self._config_manager:
+            self._config_manager.subscribe(self._on_config_changed)
 
     def _load_config(self) -> Dict[str, Any]:
         try:
             if self._config_manager:
-                return self._config_manager.get_config()
+                return self._config_manager.get_config_snapshot()
             with open(self.config_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except Exception as e:
@@ -31,6 +33,11 @@ class Ledger:
         self.config = self._load_config()
         self.currency_types, self.base_currency, self.factor_to_base = self._build_currency_model()
 
+    def _on_config_changed(self, config: Dict[str, Any], changed: set) -> None:
+        self.config = config
+        if "currency" in changed:
+            self.currency_types, self.base_currency, self.factor_to_base = self._build_currency_model()
+
     def _build_currency_model(self) -> Tuple[List[str], str, Dict[str, float]]:
         currency = self.config.get("currency", {})
         types = currency.get("types")
@@ -199,6 +206,7 @@ class Ledger:
             result,
             changes,
             log_text,
+            ctx.get("details"),
         )
 
         return {
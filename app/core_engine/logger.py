@@ -1,56 +1,204 @@
 """
 Simple Logger Utility
 Schreibt Logs in data/logs/ Verzeichnis
+
+Module loggers only enqueue records (QueueHandler); one listener thread formats them and
+writes data/logs/{name}.log (size-based rotation) plus the console. Levels per module come
+from internal_settings.logging (see apply_log_config).
 """
+import atexit
 import logging
-import os
+import logging.handlers
+import queue
+import threading
 from pathlib import Path
-from datetime import datetime
+from typing import Any, Dict
+
+LOGS_DIR = Path(__file__).resolve().parents[2] / "data" / "logs"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 _initialized_loggers = set()
+_lock = threading.Lock()
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener = None
+_file_router = None
+_console_handler = None
+_levels: Dict[str, int] = {}
+_default_level = logging.DEBUG
+
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """
+    Same process, same objects: skip QueueHandler's copy/format unless the record has args
+    (those are merged now so later mutations of the arguments do not change the message).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args or record.exc_info:
+            return super().prepare(record)
+        return record
+
+
+class _FileRouter(logging.Handler):
+    """
+    Writes each record to the rotating file of its logger (opened on first record).
+    """
+
+    def __init__(self, max_bytes: int, backup_count: int) -> None:
+        super().__init__(logging.DEBUG)
+        self._files: Dict[str, logging.Handler] = {}
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.setFormatter(logging.Formatter(FORMAT, datefmt=DATE_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self._files.get(record.name)
+        if handler is None:
+            LOGS_DIR.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                LOGS_DIR / f"{record.name}.log",
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding='utf-8',
+            )
+            handler.setFormatter(self.formatter)
+            self._files[record.name] = handler
+        handler.handle(record)
+
+    def set_rotation(self, max_bytes: int, backup_count: int) -> None:
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        for handler in self._files.values():
+            handler.maxBytes = max_bytes
+            handler.backupCount = backup_count
+
+    def close(self) -> None:
+        for handler in self._files.values():
+            handler.close()
+        self._files = {}
+        super().close()
+
+
+def _ensure_listener() -> None:
+    global _listener, _file_router, _console_handler
+    if _listener is not None:
+        return
+    _file_router = _FileRouter(DEFAULT_MAX_BYTES, DEFAULT_BACKUP_COUNT)
+    _console_handler = logging.StreamHandler()
+    _console_handler.setLevel(logging.INFO)
+    _console_handler.setFormatter(logging.Formatter(FORMAT, datefmt=DATE_FORMAT))
+    _listener = logging.handlers.QueueListener(_queue, _file_router, _console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
 
 def setup_logger(name: str = "app"):
     """
     Erstelle einen Logger der in data/logs/ schreibt.
-    
+
     Args:
         name: Logger-Name (wird zur Datei: data/logs/{name}.log)
-    
+
     Returns:
         Logger-Objekt
     """
-    logs_dir = Path(__file__).resolve().parents[2] / "data" / "logs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    
-    log_file = logs_dir / f"{name}.log"
-    
-    # Erstelle Logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-    
-    # Entferne alte Handler (um Duplikate zu vermeiden)
-    logger.handlers.clear()
-    
-    # File Handler
-    file_mode = 'w' if name not in _initialized_loggers else 'a'
-    file_handler = logging.FileHandler(log_file, mode=file_mode, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    
-    # Console Handler (für schnelle Übersicht)
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    _initialized_loggers.add(name)
-    
+    with _lock:
+        _ensure_listener()
+        logger = logging.getLogger(name)
+        logger.setLevel(_levels.get(name, _default_level))
+        # Entferne alte Handler (um Duplikate zu vermeiden)
+        logger.handlers.clear()
+        logger.addHandler(_EnqueueHandler(_queue))
+        logger.propagate = False
+        _initialized_loggers.add(name)
     return logger
+
+
+def apply_log_config(config: Any, changed: Any = None) -> None:
+    """
+    Apply internal_settings.logging: {"levels": {"default": "DEBUG", "<module>": "INFO"},
+    "console_level": "INFO", "max_bytes": int, "backup_count": int}. Missing keys keep defaults.
+    """
+    global _levels, _default_level
+    internal = config.get("internal_settings") if isinstance(config, dict) else None
+    settings = internal.get("logging") if isinstance(internal, dict) else None
+    if not isinstance(settings, dict):
+        settings = {}
+    levels = settings.get("levels") if isinstance(settings.get("levels"), dict) else {}
+    with _lock:
+        _ensure_listener()
+        _default_level = _parse_level(levels.get("default"), logging.DEBUG)
+        _levels = {
+            name: _parse_level(value, _default_level)
+            for name, value in levels.items()
+            if isinstance(name, str) and name != "default"
+        }
+        for name in _initialized_loggers:
+            logging.getLogger(name).setLevel(_levels.get(name, _default_level))
+        _console_handler.setLevel(_parse_level(settings.get("console_level"), logging.INFO))
+        max_bytes = settings.get("max_bytes")
+        backup_count = settings.get("backup_count")
+        _file_router.set_rotation(
+            max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else DEFAULT_MAX_BYTES,
+            backup_count if isinstance(backup_count, int) and backup_count >= 0 else DEFAULT_BACKUP_COUNT,
+        )
+
+
+def quiet_logging(level: Any = "WARNING") -> None:
+    """
+    Raise all module loggers and the console to `level` (headless runs), the same as an
+    internal_settings.logging block with only a default level. Other loggers are untouched.
+    """
+    apply_log_config({"internal_settings": {"logging": {"levels": {"default": level}, "console_level": level}}})
+
+
+def restart_logging() -> None:
+    """
+    Give a forked child process its own queue and listener. fork copies the handlers that
+    enqueue records but not the parent's listener thread, so without this the child's
+    records are never written. Levels, console level and rotation are kept.
+    """
+    global _lock, _queue, _listener, _file_router, _console_handler
+    _lock = threading.Lock()  # may have been held by another thread of the parent at fork time
+    with _lock:
+        console_level = _console_handler.level if _console_handler is not None else logging.INFO
+        rotation = (
+            (_file_router.max_bytes, _file_router.backup_count)
+            if _file_router is not None
+            else (DEFAULT_MAX_BYTES, DEFAULT_BACKUP_COUNT)
+        )
+        _queue = queue.SimpleQueue()
+        _listener = None
+        _ensure_listener()
+        _console_handler.setLevel(console_level)
+        _file_router.set_rotation(*rotation)
+        for name in _initialized_loggers:
+            logger = logging.getLogger(name)
+            logger.handlers.clear()
+            logger.addHandler(_EnqueueHandler(_queue))
+
+
+def shutdown_logging() -> None:
+    """
+    Flush the queue and close the log files (registered with atexit).
+    """
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def _parse_level(value: Any, default: int) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        level = logging.getLevelName(value.strip().upper())
+        if isinstance(level, int):
+            return level
+    return default
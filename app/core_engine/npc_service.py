@@ -1,5 +1,10 @@
 import uuid
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, KeysView, List, Optional, Tuple
+
+# Fields hire/move/fire change in place: restored when an NPC batch fails part-way.
+BASTION_NPC_FIELDS = ("npcs_unassigned",)
+FACILITY_NPC_FIELDS = ("assigned_npcs", "current_orders", "current_order")
+_MISSING = object()
 
 
 class NpcService:
@@ -13,6 +18,8 @@ class NpcService:
         normalize_orders: Any,
         is_order_active: Any,
         find_facility_entry: Any,
+        invalidate_facility_state: Any,
+        entity_index: Any,
     ) -> None:
         self._ledger = ledger
         self._catalog = catalog
@@ -22,6 +29,11 @@ class NpcService:
         self._normalize_orders = normalize_orders
         self._is_order_active = is_order_active
         self._find_facility_entry = find_facility_entry
+        self._invalidate_facility_state = invalidate_facility_state
+        self._entity_index = entity_index
+
+    def set_config(self, config: Dict[str, Any]) -> None:
+        self._config = config
 
     def hire_npc(
         self,
@@ -78,6 +90,7 @@ class NpcService:
                 unassigned = []
                 bastion["npcs_unassigned"] = unassigned
             unassigned.append(npc_entry)
+            self._entity_index.add_npc(session_state, npc_entry, None)
 
         return {"success": True, "message": "NPC hired", "npc": npc_entry}
 
@@ -100,13 +113,14 @@ class NpcService:
             if current_facility is None:
                 return {"success": False, "message": "NPC already in reserve"}
             canceled = self._remove_npc_orders(current_facility, npc_id)
-            self._remove_npc_from_facility(current_facility, npc_id)
+            self._remove_npc_from_facility(session_state, current_facility, npc_id)
             bastion = session_state.setdefault("bastion", {})
             unassigned = bastion.setdefault("npcs_unassigned", [])
             if not isinstance(unassigned, list):
                 unassigned = []
                 bastion["npcs_unassigned"] = unassigned
             unassigned.append(npc_entry)
+            self._entity_index.add_npc(session_state, npc_entry, None)
             return {"success": True, "message": "NPC moved to reserve", "canceled_orders": canceled}
 
         if current_facility and current_facility.get("facility_id") == target_facility_id:
@@ -119,7 +133,7 @@ class NpcService:
         canceled = 0
         if current_facility:
             canceled = self._remove_npc_orders(current_facility, npc_id)
-            self._remove_npc_from_facility(current_facility, npc_id)
+            self._remove_npc_from_facility(session_state, current_facility, npc_id)
         else:
             self._remove_npc_from_unassigned(session_state, npc_id)
 
@@ -139,13 +153,99 @@ class NpcService:
             return {"success": False, "message": "NPC has active order"}
 
         if current_facility:
-            self._remove_npc_from_facility(current_facility, npc_id)
+            self._remove_npc_from_facility(session_state, current_facility, npc_id)
         else:
             self._remove_npc_from_unassigned(session_state, npc_id)
 
         return {"success": True, "message": "NPC fired"}
 
-    def apply_npc_upkeep(self, session_state: Dict[str, Any], current_turn: int) -> None:
+    def apply_npc_operations(self, session_state: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply hire/move/fire operations in order, all or nothing. Before each operation the
+        NPC lists and orders it can touch are saved; if one fails, everything saved is put
+        back (same list objects) and the results of the batch are discarded.
+        """
+        saved: Dict[int, Tuple[Dict[str, Any], Dict[str, Tuple[Any, Optional[List[Any]]]]]] = {}
+        results = []
+        for idx, operation in enumerate(operations):
+            self._save_npc_fields(session_state, operation, saved)
+            result = self._apply_npc_operation(session_state, operation)
+            results.append(result)
+            if not result.get("success"):
+                self._restore_npc_fields(session_state, saved)
+                return {
+                    "success": False,
+                    "message": f"Operation {idx + 1}: {result.get('message')}",
+                    "failed_index": idx,
+                    "results": results,
+                }
+        return {"success": True, "message": f"{len(results)} NPC operations applied", "results": results}
+
+    def _save_npc_fields(self, session_state: Dict[str, Any], operation: Any, saved: Dict[int, Any]) -> None:
+        """
+        Remember the NPC fields of the bastion and of the facilities `operation` can touch
+        (its target facility and the current facility of its NPC), once per batch.
+        """
+        containers = [(session_state.setdefault("bastion", {}), BASTION_NPC_FIELDS)]
+        if isinstance(operation, dict):
+            facility_id = operation.get("facility_id")
+            if isinstance(facility_id, str) and facility_id:
+                containers.append((self._find_facility_entry(session_state, facility_id), FACILITY_NPC_FIELDS))
+            npc_id = operation.get("npc_id")
+            if npc_id:
+                containers.append((self._locate_npc(session_state, npc_id)[1], FACILITY_NPC_FIELDS))
+        for container, keys in containers:
+            if not isinstance(container, dict) or id(container) in saved:
+                continue
+            fields = {}
+            for key in keys:
+                value = container.get(key, _MISSING)
+                fields[key] = (value, list(value) if isinstance(value, list) else None)
+            saved[id(container)] = (container, fields)
+
+    def _restore_npc_fields(self, session_state: Dict[str, Any], saved: Dict[int, Any]) -> None:
+        bastion = session_state.get("bastion")
+        for container, fields in saved.values():
+            for key, (value, items) in fields.items():
+                if value is _MISSING:
+                    container.pop(key, None)
+                    continue
+                if items is not None:
+                    value[:] = items
+                container[key] = value
+            if container is not bastion:
+                self._invalidate_facility_state(container)
+        if not self._entity_index.bind(session_state):
+            self._entity_index.rebuild(session_state)
+
+    def _apply_npc_operation(self, session_state: Dict[str, Any], operation: Any) -> Dict[str, Any]:
+        if not isinstance(operation, dict):
+            return {"success": False, "message": "Operation must be an object"}
+        action = operation.get("action")
+        if action == "hire":
+            return self.hire_npc(
+                session_state,
+                operation.get("name"),
+                operation.get("profession"),
+                operation.get("level"),
+                operation.get("upkeep"),
+                operation.get("facility_id"),
+            )
+        if action == "move":
+            return self.move_npc(session_state, operation.get("npc_id"), operation.get("facility_id"))
+        if action == "fire":
+            return self.fire_npc(session_state, operation.get("npc_id"))
+        return {"success": False, "message": f"Unknown NPC action: {action}"}
+
+    def apply_npc_upkeep(self, session_state: Dict[str, Any], current_turn: int, turns: int = 1) -> None:
+        """
+        Charge upkeep for every NPC as one summed ledger posting per currency; the audit entry
+        keeps per-NPC sub-entries. `turns` > 1 posts the accumulated upkeep of a skipped span.
+        """
+        if not isinstance(turns, int) or turns <= 0:
+            turns = 1
+        totals: Dict[str, int] = {}
+        details: List[Dict[str, Any]] = []
         for npc, facility_id in self._collect_npcs_with_location(session_state):
             upkeep = npc.get("upkeep")
             if not isinstance(upkeep, dict) or not upkeep:
@@ -156,7 +256,7 @@ class NpcService:
                     continue
                 if currency not in self._ledger.currency_types:
                     continue
-                effect[currency] = -amount
+                effect[currency] = -amount * turns
             if not effect:
                 continue
             npc_name = npc.get("name") or npc.get("npc_id") or "NPC"
@@ -165,17 +265,27 @@ class NpcService:
                 facility_def = self._catalog.get(facility_id)
                 if isinstance(facility_def, dict) and facility_def.get("name"):
                     facility_label = facility_def.get("name")
-            log_text = self._format_upkeep_log(npc_name, effect, facility_label)
-            context = {
-                "event_type": "npc_upkeep",
-                "source_type": "npc",
-                "source_id": npc.get("npc_id") or npc_name,
-                "action": "upkeep",
-                "roll": "-",
-                "result": "applied",
-                "log_text": log_text,
-            }
-            self._ledger.apply_effects(session_state, [effect], context)
+            for currency, amount in effect.items():
+                totals[currency] = totals.get(currency, 0) + amount
+            details.append({
+                "npc_id": npc.get("npc_id") or npc_name,
+                "name": npc_name,
+                "facility": facility_label,
+                "cost": {currency: -amount for currency, amount in effect.items()},
+            })
+        if not totals:
+            return
+        context = {
+            "event_type": "npc_upkeep",
+            "source_type": "npc",
+            "source_id": "*",
+            "action": "upkeep",
+            "roll": "-",
+            "result": "applied",
+            "log_text": self._format_upkeep_log(len(details), totals, turns),
+            "details": details,
+        }
+        self._ledger.apply_effects(session_state, [totals], context)
 
     def xp_gain_for_order(
         self,
@@ -262,25 +372,8 @@ class NpcService:
             new_level = 3
         return new_level
 
-    def _collect_npc_ids(self, session_state: Dict[str, Any]) -> set:
-        ids = set()
-        bastion = session_state.get("bastion", {}) if isinstance(session_state, dict) else {}
-        facilities = bastion.get("facilities", []) or []
-        for facility in facilities:
-            if not isinstance(facility, dict):
-                continue
-            assigned = facility.get("assigned_npcs", [])
-            if not isinstance(assigned, list):
-                continue
-            for npc in assigned:
-                if isinstance(npc, dict) and isinstance(npc.get("npc_id"), str):
-                    ids.add(npc["npc_id"])
-        unassigned = bastion.get("npcs_unassigned", []) or []
-        if isinstance(unassigned, list):
-            for npc in unassigned:
-                if isinstance(npc, dict) and isinstance(npc.get("npc_id"), str):
-                    ids.add(npc["npc_id"])
-        return ids
+    def _collect_npc_ids(self, session_state: Dict[str, Any]) -> KeysView[str]:
+        return self._entity_index.npc_ids(session_state)
 
     def _generate_npc_id(self, session_state: Dict[str, Any], name: str) -> str:
         base = "".join(ch for ch in (name or "npc") if ch.isalnum() or ch in ["_", "-"]).lower()
@@ -334,28 +427,13 @@ class NpcService:
             return "NPC already assigned to facility"
 
         assigned.append(npc_entry)
+        self._entity_index.add_npc(session_state, npc_entry, facility_entry)
         return None
 
     def _locate_npc(self, session_state: Dict[str, Any], npc_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
-        bastion = session_state.get("bastion", {}) if isinstance(session_state, dict) else {}
-        facilities = bastion.get("facilities", []) or []
-        for facility in facilities:
-            if not isinstance(facility, dict):
-                continue
-            assigned = facility.get("assigned_npcs", [])
-            if not isinstance(assigned, list):
-                continue
-            for npc in assigned:
-                if isinstance(npc, dict) and npc.get("npc_id") == npc_id:
-                    return npc, facility
-        unassigned = bastion.get("npcs_unassigned", []) or []
-        if isinstance(unassigned, list):
-            for npc in unassigned:
-                if isinstance(npc, dict) and npc.get("npc_id") == npc_id:
-                    return npc, None
-        return None, None
+        return self._entity_index.locate_npc(session_state, npc_id)
 
-    def _remove_npc_from_facility(self, facility_entry: Dict[str, Any], npc_id: str) -> None:
+    def _remove_npc_from_facility(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any], npc_id: str) -> None:
         if not facility_entry or not npc_id:
             return
         assigned = facility_entry.get("assigned_npcs", [])
@@ -364,6 +442,7 @@ class NpcService:
         for npc in list(assigned):
             if isinstance(npc, dict) and npc.get("npc_id") == npc_id:
                 assigned.remove(npc)
+                self._entity_index.remove_npc(session_state, npc_id, facility_entry)
                 return
 
     def _remove_npc_from_unassigned(self, session_state: Dict[str, Any], npc_id: str) -> None:
@@ -374,6 +453,7 @@ class NpcService:
         for npc in list(unassigned):
             if isinstance(npc, dict) and npc.get("npc_id") == npc_id:
                 unassigned.remove(npc)
+                self._entity_index.remove_npc(session_state, npc_id, None)
                 return
 
     def _npc_has_active_order(self, facility_entry: Dict[str, Any], npc_id: str) -> bool:
@@ -400,10 +480,13 @@ class NpcService:
                 continue
             if self._is_order_active(order):
                 orders.remove(order)
+                self._entity_index.remove_order(facility_entry, order)
                 removed += 1
         current_order = facility_entry.get("current_order")
         if isinstance(current_order, dict) and current_order.get("npc_id") == npc_id and self._is_order_active(current_order):
             facility_entry["current_order"] = None
+        if removed:
+            self._invalidate_facility_state(facility_entry)
         return removed
 
     def _collect_npcs_with_location(self, session_state: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Optional[str]]]:
@@ -426,9 +509,10 @@ class NpcService:
                     results.append((npc, None))
         return results
 
-    def _format_upkeep_log(self, npc_name: str, effect: Dict[str, int], facility_label: str) -> str:
+    def _format_upkeep_log(self, npc_count: int, effect: Dict[str, int], turns: int = 1) -> str:
         parts = []
         for currency, amount in effect.items():
             parts.append(f"{abs(amount)} {currency}")
         cost = ", ".join(parts) if parts else "-"
-        return f"NPC upkeep: {npc_name} ({facility_label}) -{cost}"
+        span_note = f" ({turns} Turns)" if turns > 1 else ""
+        return f"NPC upkeep: {npc_count} NPC{'s' if npc_count != 1 else ''} -{cost}{span_note}"
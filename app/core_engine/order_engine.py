@@ -1,5 +1,21 @@
 import random
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .perf_stats import PERF
+
+QUEUE_CHECK_LIMIT = 4096
+
+
+def note_queue_dropped(result: Dict[str, Any], dropped: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Report queued orders a drain dropped: listed under "queue_dropped" and counted in the message.
+    """
+    if dropped:
+        result["queue_dropped"] = result.get("queue_dropped", []) + dropped
+        if result.get("message"):
+            plural = "s" if len(dropped) != 1 else ""
+            result["message"] = f"{result['message']} ({len(dropped)} queued order{plural} dropped)"
+    return result
 
 
 class OrderEngine:
@@ -21,6 +37,10 @@ class OrderEngine:
         dice_sides_from_profile: Any,
         determine_outcome: Any,
         get_effects_for_bucket: Any,
+        scheduler: Any,
+        invalidate_facility_state: Any,
+        entity_index: Any,
+        audit_log: Any,
     ) -> None:
         self._ledger = ledger
         self._catalog = catalog
@@ -38,6 +58,11 @@ class OrderEngine:
         self._dice_sides_from_profile = dice_sides_from_profile
         self._determine_outcome = determine_outcome
         self._get_effects_for_bucket = get_effects_for_bucket
+        self._scheduler = scheduler
+        self._invalidate_facility_state = invalidate_facility_state
+        self._entity_index = entity_index
+        self._audit_log = audit_log
+        self._queue_checks: Dict[int, Tuple[Dict[str, Any], Any, Optional[Dict[str, Any]], Optional[str]]] = {}
 
     def start_order(self, session_state: Dict[str, Any], facility_id: str, npc_id: str, order_id: str) -> Dict[str, Any]:
         if not session_state:
@@ -110,6 +135,9 @@ class OrderEngine:
             "roll_source": None,
         }
         current_orders.append(order_entry)
+        self._entity_index.add_order(facility_entry, order_entry)
+        self._scheduler.schedule_order(session_state, facility_entry, order_entry)
+        self._invalidate_facility_state(facility_entry)
 
         return {"success": True, "message": "Order started", "order": order_entry}
 
@@ -164,6 +192,10 @@ class OrderEngine:
         return {"success": True, "message": "Roll locked", "roll": roll}
 
     def evaluate_order(self, session_state: Dict[str, Any], facility_id: str, order_id: str) -> Dict[str, Any]:
+        with PERF.phase("order_evaluation"):
+            return self._evaluate_order(session_state, facility_id, order_id)
+
+    def _evaluate_order(self, session_state: Dict[str, Any], facility_id: str, order_id: str) -> Dict[str, Any]:
         if not session_state:
             return {"success": False, "message": "No session loaded"}
 
@@ -224,15 +256,194 @@ class OrderEngine:
         current_orders = self._normalize_orders(facility_entry)
         if order_entry in current_orders:
             current_orders.remove(order_entry)
+            self._entity_index.remove_order(facility_entry, order_entry)
+        self._invalidate_facility_state(facility_entry)
+        queue_started, queue_dropped = self.drain_order_queue(session_state, facility_entry)
 
-        return {
+        return note_queue_dropped({
             "success": ledger_result.get("success", False),
             "message": "Order evaluated",
             "bucket": result_bucket,
             "roll": roll,
             "entries": ledger_result.get("entries", []),
             "events": events,
-        }
+            "queue_started": queue_started,
+        }, queue_dropped)
+
+    def queue_order(self, session_state: Dict[str, Any], facility_id: str, order_id: str, npc_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Append an order to the facility's queue (session: facility.order_queue). Without npc_id any
+        idle assigned NPC of sufficient level runs it. The queue is drained right away if a slot is free.
+        """
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+        if not facility_id or not order_id:
+            return {"success": False, "message": "Missing facility or order id"}
+
+        facility_entry = self._find_facility_entry(session_state, facility_id)
+        if not facility_entry:
+            return {"success": False, "message": f"Facility not found in bastion: {facility_id}"}
+
+        item = {"order_id": order_id, "npc_id": npc_id or None, "queued_turn": int(session_state.get("current_turn", 0))}
+        order_def, error = self._queue_check(facility_entry, item)
+        if error:
+            self._queue_checks.pop(id(item), None)
+            return {"success": False, "message": error}
+        if npc_id:
+            assigned = facility_entry.get("assigned_npcs", []) if isinstance(facility_entry.get("assigned_npcs"), list) else []
+            npc = next((n for n in assigned if isinstance(n, dict) and n.get("npc_id") == npc_id), None)
+            if not npc:
+                self._queue_checks.pop(id(item), None)
+                return {"success": False, "message": f"NPC not assigned to facility: {npc_id}"}
+            if not self._npc_meets_level(npc, order_def):
+                self._queue_checks.pop(id(item), None)
+                return {"success": False, "message": "NPC level too low for this order"}
+
+        queue = facility_entry.get("order_queue")
+        if not isinstance(queue, list):
+            queue = []
+            facility_entry["order_queue"] = queue
+        queue.append(item)
+        started, dropped = self.drain_order_queue(session_state, facility_entry)
+        result = {"success": True, "message": "Order queued", "queued": item, "started": started, "queue": queue}
+        return note_queue_dropped(result, dropped)
+
+    def remove_queued_order(self, session_state: Dict[str, Any], facility_id: str, index: int) -> Dict[str, Any]:
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+        facility_entry = self._find_facility_entry(session_state, facility_id)
+        if not facility_entry:
+            return {"success": False, "message": f"Facility not found in bastion: {facility_id}"}
+        queue = facility_entry.get("order_queue")
+        if not isinstance(queue, list) or not isinstance(index, int) or index < 0 or index >= len(queue):
+            return {"success": False, "message": "Queued order not found"}
+        item = queue.pop(index)
+        if isinstance(item, dict):
+            self._queue_checks.pop(id(item), None)
+        return {"success": True, "message": "Queued order removed", "queue": queue}
+
+    def drain_order_queue(
+        self,
+        session_state: Dict[str, Any],
+        facility_entry: Dict[str, Any],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Start queued orders (first fit, queue order kept) while NPC slots are free.
+        Items that can never start (unknown order, NPC gone) are dropped with an audit entry.
+        Returns (started, dropped).
+        """
+        queue = facility_entry.get("order_queue") if isinstance(facility_entry, dict) else None
+        if not isinstance(queue, list) or not queue:
+            return [], []
+        build_status = facility_entry.get("build_status", {})
+        if isinstance(build_status, dict) and build_status.get("status") in ["building", "upgrading"]:
+            return [], []
+        facility_id = facility_entry.get("facility_id")
+        facility_def = self._catalog.get(facility_id)
+        npc_slots = facility_def.get("npc_slots") if isinstance(facility_def, dict) else None
+        if not isinstance(npc_slots, int) or npc_slots <= 0:
+            return [], []
+
+        active = [o for o in self._normalize_orders(facility_entry) if self._is_order_active(o)]
+        free_slots = npc_slots - len(active)
+        busy = {o.get("npc_id") for o in active if isinstance(o, dict)}
+        assigned = facility_entry.get("assigned_npcs", []) if isinstance(facility_entry.get("assigned_npcs"), list) else []
+        idle = [n for n in assigned if isinstance(n, dict) and n.get("npc_id") and n.get("npc_id") not in busy]
+
+        started: List[Dict[str, Any]] = []
+        dropped: List[Dict[str, Any]] = []
+        for item in list(queue):
+            if free_slots <= 0 or not idle:
+                break
+            if not isinstance(item, dict):
+                queue.remove(item)
+                continue
+            order_def, error = self._queue_check(facility_entry, item)
+            if error:
+                dropped.append(self._drop_unstartable(session_state, facility_id, queue, item, error))
+                continue
+            wanted = item.get("npc_id")
+            if wanted:
+                npc = next((n for n in idle if n.get("npc_id") == wanted), None)
+                if npc is None:
+                    if not any(isinstance(n, dict) and n.get("npc_id") == wanted for n in assigned):
+                        reason = f"NPC not assigned to facility: {wanted}"
+                        dropped.append(self._drop_unstartable(session_state, facility_id, queue, item, reason))
+                    continue
+            else:
+                npc = next((n for n in idle if self._npc_meets_level(n, order_def)), None)
+                if npc is None:
+                    continue
+            result = self.start_order(session_state, facility_id, npc.get("npc_id"), item.get("order_id"))
+            if not result.get("success"):
+                continue
+            self._drop_queued(queue, item)
+            idle.remove(npc)
+            free_slots -= 1
+            started.append({"facility_id": facility_id, "order_id": item.get("order_id"), "npc_id": npc.get("npc_id")})
+        return started, dropped
+
+    def _queue_check(self, facility_entry: Dict[str, Any], item: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Static validation of a queued item (order known for this facility), cached per item.
+        Re-validated when the facility id changed (upgrade).
+        """
+        facility_id = facility_entry.get("facility_id")
+        cached = self._queue_checks.get(id(item))
+        if cached is not None and cached[0] is item and cached[1] == facility_id:
+            return cached[2], cached[3]
+        order_def = None
+        error = None
+        facility_def = self._catalog.get(facility_id)
+        if not facility_def:
+            error = f"Unknown facility_id: {facility_id}"
+        else:
+            orders_def = facility_def.get("orders") if isinstance(facility_def.get("orders"), list) else []
+            order_def = next((o for o in orders_def if isinstance(o, dict) and o.get("id") == item.get("order_id")), None)
+            if not order_def:
+                error = f"Unknown order_id: {item.get('order_id')}"
+        if len(self._queue_checks) >= QUEUE_CHECK_LIMIT:
+            self._queue_checks.clear()
+        self._queue_checks[id(item)] = (item, facility_id, order_def, error)
+        return order_def, error
+
+    def _drop_unstartable(
+        self,
+        session_state: Dict[str, Any],
+        facility_id: Any,
+        queue: List[Any],
+        item: Dict[str, Any],
+        reason: str,
+    ) -> Dict[str, Any]:
+        self._drop_queued(queue, item)
+        order_id = item.get("order_id")
+        self._audit_log.add_entry(
+            session_state,
+            int(session_state.get("current_turn", 0)),
+            "order_queue_dropped",
+            "facility",
+            facility_id,
+            str(order_id),
+            "-",
+            "dropped",
+            "-",
+            f"Queued order {order_id} dropped: {reason}",
+        )
+        return {"facility_id": facility_id, "order_id": order_id, "npc_id": item.get("npc_id"), "reason": reason}
+
+    def _drop_queued(self, queue: List[Any], item: Dict[str, Any]) -> None:
+        for idx, queued in enumerate(queue):
+            if queued is item:
+                del queue[idx]
+                break
+        self._queue_checks.pop(id(item), None)
+
+    def _npc_meets_level(self, npc: Dict[str, Any], order_def: Optional[Dict[str, Any]]) -> bool:
+        min_level = order_def.get("min_npc_level", 1) if isinstance(order_def, dict) else 1
+        npc_level = npc.get("level", 1)
+        if isinstance(min_level, int) and isinstance(npc_level, int) and npc_level < min_level:
+            return False
+        return True
 
     def evaluate_ready_orders(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
         if not session_state:
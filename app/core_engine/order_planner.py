@@ -0,0 +1,325 @@
+"""
+NPC-to-order assignment planner.
+
+Feasibility comes from npc_slots, min_npc_level and npc_allowed_professions. Each NPC/facility
+pair is scored by the expected treasury value (base units) of the best order the NPC can run
+there, derived from the check profile at the NPC's level. The assignment is solved as a
+min-cost flow that starts as many orders as possible and, among those, maximizes value.
+"""
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+VALUE_SCALE = 1000
+
+
+class OrderPlanner:
+    def __init__(
+        self,
+        ledger: Any,
+        catalog: Dict[str, Any],
+        get_outcome_probabilities: Any,
+        get_effects_for_bucket: Any,
+        normalize_orders: Any,
+        is_order_active: Any,
+    ) -> None:
+        self._ledger = ledger
+        self._catalog = catalog
+        self._get_outcome_probabilities = get_outcome_probabilities
+        self._get_effects_for_bucket = get_effects_for_bucket
+        self._normalize_orders = normalize_orders
+        self._is_order_active = is_order_active
+
+    def plan(self, session_state: Dict[str, Any], include_reserve: bool = True, per_turn: bool = False) -> Dict[str, Any]:
+        """
+        Propose which idle NPC should start which order. Reserve NPCs are placed into
+        facilities with a free seat whose allowed professions match (move = True).
+        """
+        if not session_state:
+            return {"success": False, "message": "No session loaded"}
+
+        bastion = session_state.get("bastion", {}) or {}
+        players = session_state.get("players", [])
+        player_ids = {p.get("player_id") for p in players if isinstance(p, dict)} if isinstance(players, list) else set()
+        value_cache: Dict[Tuple[str, str, Any], Optional[float]] = {}
+
+        sites: List[Dict[str, Any]] = []
+        for facility in bastion.get("facilities", []) or []:
+            site = self._facility_site(facility, player_ids)
+            if site:
+                sites.append(site)
+
+        reserve: List[Dict[str, Any]] = []
+        if include_reserve:
+            unassigned = bastion.get("npcs_unassigned", []) or []
+            if isinstance(unassigned, list):
+                reserve = [npc for npc in unassigned if isinstance(npc, dict) and npc.get("npc_id")]
+
+        # NPCs with the same level (and, in reserve, profession) are interchangeable: one group node each.
+        groups: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        for idx, site in enumerate(sites):
+            for npc in site["idle"]:
+                groups.setdefault(("home", idx, _level_key(npc)), []).append(npc)
+        for npc in reserve:
+            groups.setdefault(("reserve", npc.get("profession"), _level_key(npc)), []).append(npc)
+
+        # Candidate edges: (group key, site index, order_id, value)
+        candidates: List[Tuple[Tuple[Any, ...], int, str, float]] = []
+        for key, members in groups.items():
+            sample = members[0]
+            if key[0] == "home":
+                targets = [key[1]]
+            else:
+                targets = [
+                    idx for idx, site in enumerate(sites)
+                    if site["free_seats"] > 0 and (not site["allowed"] or key[1] in site["allowed"])
+                ]
+            for idx in targets:
+                best = self._best_order(sites[idx], sample, per_turn, value_cache)
+                if best:
+                    candidates.append((key, idx, best[0], best[1]))
+
+        assignments = self._solve(sites, groups, candidates)
+        total = sum(a["expected_value"] for a in assignments)
+        return {
+            "success": True,
+            "message": f"{len(assignments)} orders planned",
+            "assignments": assignments,
+            "total_expected_value": total,
+            "value_unit": "base_per_turn" if per_turn else "base",
+        }
+
+    def _facility_site(self, facility: Any, player_ids: set) -> Optional[Dict[str, Any]]:
+        if not isinstance(facility, dict):
+            return None
+        build_status = facility.get("build_status", {})
+        status = build_status.get("status") if isinstance(build_status, dict) else None
+        if status in ["building", "upgrading"]:
+            return None
+        if facility.get("owner_player_id") not in player_ids:
+            return None
+        facility_id = facility.get("facility_id")
+        facility_def = self._catalog.get(facility_id)
+        if not isinstance(facility_def, dict):
+            return None
+        npc_slots = facility_def.get("npc_slots")
+        if not isinstance(npc_slots, int) or npc_slots <= 0:
+            return None
+        orders_def = [o for o in facility_def.get("orders", []) or [] if isinstance(o, dict) and o.get("id")]
+        if not orders_def:
+            return None
+
+        active = [o for o in self._normalize_orders(facility) if self._is_order_active(o)]
+        order_slots = npc_slots - len(active)
+        if order_slots <= 0:
+            return None
+        busy = {o.get("npc_id") for o in active}
+        assigned = facility.get("assigned_npcs", [])
+        assigned = [npc for npc in assigned if isinstance(npc, dict)] if isinstance(assigned, list) else []
+        allowed = facility_def.get("npc_allowed_professions")
+        return {
+            "facility_id": facility_id,
+            "orders": orders_def,
+            "order_slots": order_slots,
+            "free_seats": max(npc_slots - len(assigned), 0),
+            "idle": [npc for npc in assigned if npc.get("npc_id") and npc.get("npc_id") not in busy],
+            "allowed": allowed if isinstance(allowed, list) else [],
+        }
+
+    def _best_order(
+        self,
+        site: Dict[str, Any],
+        npc: Dict[str, Any],
+        per_turn: bool,
+        value_cache: Dict[Tuple[str, str, Any], Optional[float]],
+    ) -> Optional[Tuple[str, float]]:
+        npc_level = npc.get("level", 1)
+        best: Optional[Tuple[str, float]] = None
+        for order_def in site["orders"]:
+            min_level = order_def.get("min_npc_level", 1)
+            if isinstance(min_level, int) and isinstance(npc_level, int) and npc_level < min_level:
+                continue
+            key = (site["facility_id"], order_def.get("id"), npc_level)
+            if key not in value_cache:
+                value_cache[key] = self._expected_value(order_def, npc_level, per_turn)
+            value = value_cache[key]
+            if value is None or value < 0:
+                continue
+            if best is None or value > best[1]:
+                best = (order_def.get("id"), value)
+        return best
+
+    def _expected_value(self, order_def: Dict[str, Any], npc_level: Any, per_turn: bool) -> Optional[float]:
+        outcome = order_def.get("outcome") if isinstance(order_def.get("outcome"), dict) else {}
+        check_profile = outcome.get("check_profile")
+        if check_profile:
+            probabilities = self._get_outcome_probabilities(check_profile, npc_level)
+            if probabilities is None:
+                return None
+        else:
+            probabilities = {"on_success": 1.0}
+
+        value = 0.0
+        for bucket, probability in probabilities.items():
+            value += probability * self._effects_value(self._get_effects_for_bucket(outcome, bucket))
+        duration = order_def.get("duration_turns")
+        if per_turn and isinstance(duration, int) and duration > 0:
+            value /= duration
+        return value
+
+    def _effects_value(self, effects: List[Dict[str, Any]]) -> float:
+        """
+        Treasury delta in base units; items, stats and formula triggers carry no price and count as 0.
+        """
+        factors = self._ledger.factor_to_base
+        total = 0.0
+        for effect in effects:
+            if not isinstance(effect, dict):
+                continue
+            currency = effect.get("currency")
+            amount = effect.get("amount")
+            if isinstance(currency, str) and currency in factors and isinstance(amount, int) and currency not in effect:
+                total += amount * factors[currency]
+            for currency in self._ledger.currency_types:
+                delta = effect.get(currency)
+                if isinstance(delta, int) and currency in factors:
+                    total += delta * factors[currency]
+        return total
+
+    def _solve(
+        self,
+        sites: List[Dict[str, Any]],
+        groups: Dict[Tuple[Any, ...], List[Dict[str, Any]]],
+        candidates: List[Tuple[Tuple[Any, ...], int, str, float]],
+    ) -> List[Dict[str, Any]]:
+        if not candidates:
+            return []
+        group_nodes = {key: idx + 1 for idx, key in enumerate(groups)}
+        site_count = len(sites)
+        seat_base = len(group_nodes) + 1
+        facility_base = seat_base + site_count
+        sink = facility_base + site_count
+        flow = _MinCostFlow(sink + 1)
+
+        # Every started order outweighs any value difference: maximize count first, then value.
+        scaled = [int(round(c[3] * VALUE_SCALE)) for c in candidates]
+        bonus = sum(value * len(groups[c[0]]) for c, value in zip(candidates, scaled)) + 1
+
+        for key, node in group_nodes.items():
+            flow.add_edge(0, node, len(groups[key]), 0)
+        edges = []
+        for (key, site_idx, _order, _value), value in zip(candidates, scaled):
+            target = seat_base + site_idx if key[0] == "reserve" else facility_base + site_idx
+            edges.append(flow.add_edge(group_nodes[key], target, len(groups[key]), -(bonus + value)))
+        for idx, site in enumerate(sites):
+            flow.add_edge(seat_base + idx, facility_base + idx, site["free_seats"], 0)
+            flow.add_edge(facility_base + idx, sink, site["order_slots"], 0)
+        flow.run(0, sink)
+
+        pools = {key: list(members) for key, members in groups.items()}
+        assignments = []
+        for edge, (key, site_idx, order_id, value) in zip(edges, candidates):
+            for _ in range(flow.flow(edge)):
+                npc = pools[key].pop(0)
+                assignments.append({
+                    "facility_id": sites[site_idx]["facility_id"],
+                    "npc_id": npc.get("npc_id"),
+                    "npc_name": npc.get("name"),
+                    "order_id": order_id,
+                    "move": key[0] == "reserve",
+                    "expected_value": value,
+                })
+        assignments.sort(key=lambda a: (a["facility_id"], a["npc_id"]))
+        return assignments
+
+
+def _level_key(npc: Dict[str, Any]) -> Any:
+    level = npc.get("level", 1)
+    return level if isinstance(level, (int, str)) else repr(level)
+
+
+class _MinCostFlow:
+    """
+    Successive shortest paths with Dijkstra and potentials. Nodes must be numbered so that
+    every initial edge points to a higher node (layered graph), which gives the first potentials
+    in one pass even with negative costs.
+    """
+
+    def __init__(self, nodes: int) -> None:
+        self._graph: List[List[int]] = [[] for _ in range(nodes)]
+        self._to: List[int] = []
+        self._cap: List[int] = []
+        self._cost: List[int] = []
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> int:
+        edge = len(self._to)
+        self._graph[u].append(edge)
+        self._to.append(v)
+        self._cap.append(cap)
+        self._cost.append(cost)
+        self._graph[v].append(edge + 1)
+        self._to.append(u)
+        self._cap.append(0)
+        self._cost.append(-cost)
+        return edge
+
+    def flow(self, edge: int) -> int:
+        return self._cap[edge ^ 1]
+
+    def run(self, source: int, sink: int) -> None:
+        """
+        Augment along cheapest paths while they still lower the total cost.
+        """
+        graph, to, cap, cost = self._graph, self._to, self._cap, self._cost
+        count = len(graph)
+        inf = float("inf")
+        potential = [inf] * count
+        potential[source] = 0
+        for u in range(count):
+            if potential[u] == inf:
+                continue
+            for edge in graph[u]:
+                if cap[edge] > 0 and potential[u] + cost[edge] < potential[to[edge]]:
+                    potential[to[edge]] = potential[u] + cost[edge]
+        potential = [0 if p == inf else p for p in potential]
+
+        while True:
+            dist = [inf] * count
+            prev = [-1] * count
+            done = [False] * count
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if done[u]:
+                    continue
+                done[u] = True
+                if u == sink:
+                    break
+                pu = potential[u]
+                for edge in graph[u]:
+                    if cap[edge] <= 0:
+                        continue
+                    v = to[edge]
+                    nd = d + cost[edge] + pu - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = edge
+                        heapq.heappush(heap, (nd, v))
+            limit = dist[sink]
+            if limit == inf or limit + potential[sink] - potential[source] >= 0:
+                return
+            for v in range(count):
+                potential[v] += dist[v] if dist[v] < limit else limit
+
+            push = inf
+            v = sink
+            while v != source:
+                edge = prev[v]
+                push = min(push, cap[edge])
+                v = to[edge ^ 1]
+            v = sink
+            while v != source:
+                edge = prev[v]
+                cap[edge] -= push
+                cap[edge ^ 1] += push
+                v = to[edge ^ 1]
@@ -0,0 +1,80 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .facility_helpers import value_set
+
+OutcomeTable = Tuple[Tuple[str, ...], Dict[str, float]]
+
+
+def bucket_for_roll(profile: Dict[str, Any], roll: int) -> str:
+    """
+    Outcome bucket of a roll against a resolved (default + level) check profile.
+    """
+    if roll in value_set(profile.get("crit_success")):
+        return "on_critical_success"
+    if roll in value_set(profile.get("crit_fail")):
+        return "on_critical_failure"
+    dc = profile.get("dc")
+    if isinstance(dc, int) and roll >= dc:
+        return "on_success"
+    return "on_failure"
+
+
+class OutcomeTables:
+    """
+    Compiled roll -> bucket arrays (index roll - 1) and bucket probabilities per
+    (check_profile, npc_level). Built when the config loads; levels not seen then are
+    compiled on first use. reset() after the config changed.
+    """
+
+    def __init__(self, resolve_check_profile: Any, get_check_profile_sides: Any) -> None:
+        self._resolve_check_profile = resolve_check_profile
+        self._get_check_profile_sides = get_check_profile_sides
+        self._tables: Dict[Tuple[Any, Any], Optional[OutcomeTable]] = {}
+
+    def reset(self) -> None:
+        self._tables = {}
+
+    def compile_all(self, check_profiles: Iterable[Any], levels: Iterable[Any]) -> None:
+        levels = list(levels)
+        for check_profile in check_profiles:
+            for npc_level in levels:
+                self.table(check_profile, npc_level)
+
+    def table(self, check_profile: Any, npc_level: Any) -> Optional[OutcomeTable]:
+        try:
+            key = (check_profile, npc_level)
+            if key in self._tables:
+                return self._tables[key]
+        except TypeError:
+            return self._compile(check_profile, npc_level)
+        compiled = self._compile(check_profile, npc_level)
+        self._tables[key] = compiled
+        return compiled
+
+    def bucket(self, check_profile: Any, npc_level: Any, roll: Any) -> Optional[str]:
+        """
+        Bucket for an in-range roll, None if the caller has to resolve the profile itself.
+        """
+        if not isinstance(roll, int):
+            return None
+        compiled = self.table(check_profile, npc_level)
+        if compiled is None or roll < 1 or roll > len(compiled[0]):
+            return None
+        return compiled[0][roll - 1]
+
+    def probabilities(self, check_profile: Any, npc_level: Any) -> Optional[Dict[str, float]]:
+        compiled = self.table(check_profile, npc_level)
+        return dict(compiled[1]) if compiled is not None else None
+
+    def _compile(self, check_profile: Any, npc_level: Any) -> Optional[OutcomeTable]:
+        sides = self._get_check_profile_sides(check_profile)
+        if sides is None:
+            return None
+        profile = self._resolve_check_profile(check_profile, npc_level)
+        if not profile:
+            return None
+        rolls: List[str] = [bucket_for_roll(profile, roll) for roll in range(1, sides + 1)]
+        counts: Dict[str, int] = {}
+        for bucket in rolls:
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return tuple(rolls), {bucket: count / sides for bucket, count in counts.items()}
@@ -0,0 +1,236 @@
+"""
+Call and phase timings.
+
+PERF collects per Api method call counts, latency histograms, response sizes (sampled),
+failed results and raised exceptions, plus timings of the engine phases (upkeep, order
+evaluation, audit trim, session save). It is off by default; while disabled an instrumented call costs
+one attribute check and phase() hands out a shared no-op context.
+"""
+import bisect
+import functools
+import itertools
+import json
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .logger import setup_logger
+
+logger = setup_logger("perf_stats")
+
+# Histogram bucket upper bounds in ms, 25% apart (0.01 ms .. ~7 min); percentiles report the bound.
+BUCKET_BOUNDS_MS = tuple(0.01 * 1.25 ** idx for idx in range(80))
+PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+# Response sizes cost a json.dumps of the result (the whole session for some calls): only the
+# first call and every SIZE_SAMPLE_EVERY-th call of a method are measured.
+SIZE_SAMPLE_EVERY = 32
+
+_NO_PHASE = nullcontext()
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction: float) -> float:
+        target = max(1, int(fraction * self.count + 0.999999))
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                bound = BUCKET_BOUNDS_MS[idx] if idx < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def summary(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+        for label, fraction in PERCENTILES:
+            data[f"{label}_ms"] = self.percentile(fraction) if self.count else 0.0
+        return data
+
+
+class _Metric:
+    def __init__(self) -> None:
+        self.latency = _Histogram()
+        self.failures = 0
+        self.exceptions = 0
+        self.last_exception: Optional[str] = None
+        self.size_count = 0
+        self.size_total = 0
+        self.size_max = 0
+
+    def summary(self) -> Dict[str, Any]:
+        data = self.latency.summary()
+        data["failures"] = self.failures
+        data["exceptions"] = self.exceptions
+        if self.last_exception:
+            data["last_exception"] = self.last_exception
+        if self.size_count:
+            data["bytes_mean"] = self.size_total // self.size_count
+            data["bytes_max"] = self.size_max
+            data["bytes_samples"] = self.size_count
+        return data
+
+
+class _PhaseTimer:
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats: "PerfStats", name: str) -> None:
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._stats.record("phases", self._name, time.perf_counter() - self._start, error=exc)
+        return False
+
+
+class PerfStats:
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, _Metric]] = {"api": {}, "phases": {}}
+        self._since = time.time()
+        self._dump_stop: Optional[threading.Event] = None
+
+    def configure(self, enabled: bool, dump_dir: Any = None, dump_seconds: int = 0) -> None:
+        """
+        Switch collection on/off and (re)start the periodic dump (dump_seconds <= 0: no dump).
+        """
+        self.enabled = bool(enabled)
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+        if self.enabled and dump_dir is not None and isinstance(dump_seconds, int) and dump_seconds > 0:
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=self._dump_loop,
+                args=(Path(dump_dir) / "perf_stats.json", dump_seconds, stop),
+                name="perf-stats-dump",
+                daemon=True,
+            )
+            self._dump_stop = stop
+            thread.start()
+
+    def phase(self, name: str):
+        """
+        Context manager timing an engine phase (no-op while disabled).
+        """
+        return _PhaseTimer(self, name) if self.enabled else _NO_PHASE
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        seconds: float,
+        size: Optional[int] = None,
+        failed: bool = False,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            table = self._metrics.setdefault(kind, {})
+            metric = table.get(name)
+            if metric is None:
+                metric = table[name] = _Metric()
+            metric.latency.add(seconds * 1000.0)
+            if failed:
+                metric.failures += 1
+            if error is not None:
+                metric.exceptions += 1
+                metric.last_exception = f"{type(error).__name__}: {error}"
+            if size is not None:
+                metric.size_count += 1
+                metric.size_total += size
+                if size > metric.size_max:
+                    metric.size_max = size
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "since": self._since,
+                "now": time.time(),
+            }
+            for kind, table in self._metrics.items():
+                data[kind] = {name: metric.summary() for name, metric in sorted(table.items())}
+            if reset:
+                self._metrics = {kind: {} for kind in self._metrics}
+                self._since = data["now"]
+        return data
+
+    def dump(self, path: Any) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        tmp.replace(target)
+
+    def _dump_loop(self, path: Path, seconds: int, stop: threading.Event) -> None:
+        while not stop.wait(seconds):
+            try:
+                self.dump(path)
+            except Exception as e:
+                logger.warning(f"Failed to dump perf stats: {e}")
+
+
+PERF = PerfStats()
+
+
+def instrument(name: str, method: Callable[..., Any], is_failed: Callable[[Any], bool], stats: PerfStats = PERF) -> Callable[..., Any]:
+    """
+    Wrap an Api method: latency, sampled response size (JSON bytes), failed results and exceptions.
+    """
+    calls = itertools.count()
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not stats.enabled:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException as e:
+            stats.record("api", name, time.perf_counter() - start, error=e)
+            raise
+        elapsed = time.perf_counter() - start
+        size = _payload_size(result) if next(calls) % SIZE_SAMPLE_EVERY == 0 else None
+        stats.record("api", name, elapsed, size=size, failed=is_failed(result))
+        return result
+    return wrapper
+
+
+def instrument_public_methods(cls: type, is_failed: Callable[[Any], bool], skip: Iterable[str] = ()) -> type:
+    for name, value in list(vars(cls).items()):
+        if name.startswith("_") or name in skip or not callable(value):
+            continue
+        setattr(cls, name, instrument(name, value, is_failed))
+    return cls
+
+
+def _payload_size(result: Any) -> Optional[int]:
+    """
+    None if the result cannot be serialized (or changed while it was, e.g. the live session).
+    """
+    try:
+        return len(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return None
@@ -0,0 +1,87 @@
+"""
+Reader/writer guard for the in-memory session.
+
+Read-only calls share the guard; mutations are exclusive and run in the order they asked
+for it (ticket queue), so two writes issued one after the other by the frontend cannot
+overtake each other. Queued writers block new readers so a stream of reads cannot starve
+them. The guard is reentrant per thread: a writer may read or write again (batches call
+other Api methods), a reader may read again. Upgrading a read to a write raises.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Set
+
+
+class SessionGuard:
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer: int = 0
+        self._write_depth = 0
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned: Set[int] = set()
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                while self._writer or self._serving != self._next_ticket:
+                    self._cond.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                count = self._readers[me] - 1
+                if count:
+                    self._readers[me] = count
+                else:
+                    del self._readers[me]
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                if me in self._readers:
+                    raise RuntimeError("Cannot write to the session while reading it")
+                ticket = self._next_ticket
+                self._next_ticket += 1
+                try:
+                    while self._writer or self._readers or self._serving != ticket:
+                        self._cond.wait()
+                except BaseException:
+                    self._abandoned.add(ticket)
+                    self._advance()
+                    raise
+                self._writer = me
+                self._write_depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = 0
+                    self._serving += 1
+                    self._advance()
+
+    def _advance(self) -> None:
+        # Skip tickets of writers that gave up waiting (interrupted), then wake everyone.
+        while self._serving in self._abandoned:
+            self._abandoned.discard(self._serving)
+            self._serving += 1
+        self._cond.notify_all()
+
+    def pending_writes(self) -> int:
+        """
+        Writers queued or running (for diagnostics).
+        """
+        with self._cond:
+            return self._next_ticket - self._serving - len(self._abandoned)
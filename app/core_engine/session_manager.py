@@ -9,24 +9,46 @@ from datetime import datetime
 import shutil
 from .logger import setup_logger
 from .file_utils import sanitize_filename
+from .perf_stats import PERF
+from .audit_archive import ARCHIVE_KEYS, ARCHIVED_KEY, AuditArchive, PENDING_KEY, archived_through
+from .audit_log import TRIM_KEY
+from .history_index import AUDIT_FIELDS, DEFAULT_PAGE_SIZE, EVENT_FIELDS, HISTORY_INDEXES, clean_filters
+from .turn_scheduler import visible_state, write_visible_fields
 
 logger = setup_logger("session_manager")
 
+# Bookkeeping the session carries for the engine (saved with it, never sent to the frontend).
+SERVER_ONLY_KEYS = ARCHIVE_KEYS + (TRIM_KEY,)
+
+
+def client_session_state(session_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The session as the frontend sees it: order progress / build remaining_turns derived from
+    the scheduled due turns, SERVER_ONLY_KEYS left out. Copies only what differs.
+    """
+    if any(key in session_state for key in SERVER_ONLY_KEYS):
+        session_state = {key: value for key, value in session_state.items() if key not in SERVER_ONLY_KEYS}
+    return visible_state(session_state)
+
+
 class SessionManager:
     """Verwaltet Session-Dateien (Speichern, Laden, Migrationen)"""
     
-    def __init__(self, sessions_dir: str = "sessions"):
+    def __init__(self, sessions_dir: str = "sessions", config_manager: Optional[Any] = None):
         """
         Initialisiere Session Manager mit Sessions-Verzeichnis.
         
         Args:
             sessions_dir: Pfad zum Verzeichnis, in dem Session-Dateien gespeichert werden
+            config_manager: optional, liefert internal_settings.audit_archive_compress
         """
         # Verwende Path intern, speichere aber sessions_dir als str um pywebview Serialisierungsfehler zu vermeiden
         sessions_path = Path(sessions_dir)
         sessions_path.mkdir(parents=True, exist_ok=True)
         self.sessions_dir = str(sessions_path)
         self._sessions_path = sessions_path  # Interne Path-Referenz für Operationen
+        self._config_manager = config_manager
+        self._audit_archive = AuditArchive(sessions_path)
         logger.info(f"SessionManager initialized with sessions_dir: {self.sessions_dir}")
     
     def create_session(self, session_state: Dict[str, Any]) -> Tuple[bool, str]:
@@ -40,8 +62,13 @@ class SessionManager:
         Returns:
             (success: bool, message: str)
         """
+        with PERF.phase("session_save"):
+            return self._write_session(session_state)
+
+    def _write_session(self, session_state: Dict[str, Any]) -> Tuple[bool, str]:
         try:
             self._ensure_event_history(session_state)
+            write_visible_fields(session_state)
             filename = session_state.get("_session_filename")
 
             if not isinstance(filename, str) or not filename.strip():
@@ -67,6 +94,7 @@ class SessionManager:
             session_state["_session_filename"] = filename
             filepath = self._sessions_path / filename
             logger.debug(f"Session file path: {filepath}")
+            self._flush_audit_archive(session_state, filename)
             
             # Speichere JSON
             with open(filepath, 'w', encoding='utf-8') as f:
@@ -79,6 +107,93 @@ class SessionManager:
             logger.error(f"Error saving session: {str(e)}", exc_info=True)
             return (False, f"Error saving session: {str(e)}")
 
+    def _flush_audit_archive(self, session_state: Dict[str, Any], filename: str) -> None:
+        """
+        Move trimmed audit entries into the session's archive; on failure they stay in the
+        session (and its file) and are retried on the next save. session_state[ARCHIVED_KEY]
+        is where they start in the archive, so entries an earlier save of this state already
+        wrote (before a rollback) are skipped.
+        """
+        pending = session_state.get(PENDING_KEY)
+        if not isinstance(pending, list):
+            pending = []
+        start = archived_through(session_state)
+        if not pending and start is not None:
+            session_state.pop(PENDING_KEY, None)
+            return
+        try:
+            written, end = self._audit_archive.append(filename, pending, self._archive_compress(), start)
+        except Exception as e:
+            logger.warning(f"Failed to archive {len(pending)} audit entries: {e}")
+            return
+        session_state.pop(PENDING_KEY, None)
+        session_state[ARCHIVED_KEY] = end
+        if pending:
+            HISTORY_INDEXES.discard(pending)
+            logger.debug(f"Archived {written} of {len(pending)} audit entries for {filename}")
+
+    def _archive_compress(self) -> bool:
+        if not self._config_manager:
+            return False
+        try:
+            internal = self._config_manager.get_config_snapshot().get("internal_settings")
+        except Exception:
+            return False
+        return isinstance(internal, dict) and internal.get("audit_archive_compress") is True
+
+    def query_audit_log(
+        self,
+        session_state: Dict[str, Any],
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+        source_type: Optional[str] = None,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        event_type: Optional[str] = None,
+        source_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Page through the whole audit history of a session: archive, not yet archived and live entries.
+        """
+        filename = session_state.get("_session_filename")
+        if not isinstance(filename, str) or not filename or Path(filename).name != filename:
+            filename = None
+        filters = clean_filters(event_type=event_type, source_type=source_type, source_id=source_id)
+        tail = []
+        for key in (PENDING_KEY, "audit_log"):
+            records = session_state.get(key)
+            if isinstance(records, list) and records:
+                tail.append((records, HISTORY_INDEXES.select(records, AUDIT_FIELDS, filters, turn_from, turn_to)))
+        return self._audit_archive.query(filename, tail, filters, turn_from, turn_to, page, page_size)
+
+    def query_event_history(
+        self,
+        session_state: Dict[str, Any],
+        event_id: Optional[str] = None,
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        newest_first: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Page through event_history, filtered by event_id and turn range (inclusive).
+        """
+        history = session_state.get("event_history")
+        for alt_key in ("EventHistory", "Eventhsitory"):
+            if not isinstance(history, list):
+                history = session_state.get(alt_key)
+        return HISTORY_INDEXES.query(
+            history if isinstance(history, list) else [],
+            EVENT_FIELDS,
+            clean_filters(event_id=event_id),
+            turn_from,
+            turn_to,
+            page,
+            page_size,
+            newest_first,
+        )
+
     def _ensure_event_history(self, session_state: Dict[str, Any]) -> None:
         if not isinstance(session_state, dict):
             return
@@ -130,6 +245,9 @@ class SessionManager:
             # Merke Dateiname im State, damit Save denselben Namen nutzt
             if isinstance(migrated_state, dict):
                 migrated_state["_session_filename"] = filepath.name
+                if archived_through(migrated_state) is None:
+                    # Saved before the archive mark existed: its pending entries are not archived yet.
+                    migrated_state[ARCHIVED_KEY] = self._audit_archive.count(filepath.name)
             
             return (True, migrated_state, f"Session loaded: {filename}")
         
@@ -190,6 +308,7 @@ class SessionManager:
                 return (False, f"Session not found: {filename}")
             
             filepath.unlink()  # Lösche Datei
+            self._audit_archive.delete(filepath.name)
             return (True, f"Session deleted: {filename}")
         except Exception as e:
             return (False, f"Error deleting session: {str(e)}")
@@ -0,0 +1,89 @@
+"""
+Startup helpers: a timeline of labelled marks and lazily built services.
+
+LazyServices builds registered factories on first use; start_background() warms them up in
+registration order on a daemon thread so the window can appear first. A call that needs a
+service still being built waits for it; one that needs a service not reached yet builds it
+itself. A factory that raises is retried by the next caller.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class StartupTimeline:
+    def __init__(self, logger: Any, started: Optional[float] = None) -> None:
+        self._logger = logger
+        self._started = started if started is not None else time.perf_counter()
+        self._lock = threading.Lock()
+        self._marks: List[Dict[str, Any]] = []
+
+    def mark(self, label: str) -> float:
+        elapsed_ms = (time.perf_counter() - self._started) * 1000.0
+        with self._lock:
+            self._marks.append({"label": label, "ms": round(elapsed_ms, 1), "thread": threading.current_thread().name})
+        self._logger.info(f"[startup] +{elapsed_ms:8.1f} ms  {label}")
+        return elapsed_ms
+
+    def marks(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(mark) for mark in self._marks]
+
+
+class _Slot:
+    __slots__ = ("factory", "lock", "value", "ready")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.value: Any = None
+        self.ready = False
+
+
+class LazyServices:
+    def __init__(self, timeline: Optional[StartupTimeline] = None) -> None:
+        self._timeline = timeline
+        self._slots: Dict[str, _Slot] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._slots[name] = _Slot(factory)
+
+    def get(self, name: str) -> Any:
+        slot = self._slots[name]
+        if slot.ready:
+            return slot.value
+        with slot.lock:
+            if not slot.ready:
+                started = time.perf_counter()
+                slot.value = slot.factory()
+                slot.ready = True
+                if self._timeline:
+                    self._timeline.mark(f"{name} built in {(time.perf_counter() - started) * 1000.0:.1f} ms")
+        return slot.value
+
+    def names(self) -> List[str]:
+        return list(self._slots)
+
+    def is_ready(self, name: str) -> bool:
+        return self._slots[name].ready
+
+    def start_background(self, on_done: Optional[Callable[[], None]] = None) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._warm_up, args=(on_done,), name="startup", daemon=True)
+        self._thread.start()
+
+    def wait_all(self) -> None:
+        for name in list(self._slots):
+            self.get(name)
+
+    def _warm_up(self, on_done: Optional[Callable[[], None]]) -> None:
+        for name in list(self._slots):
+            try:
+                self.get(name)
+            except Exception as e:
+                if self._timeline:
+                    self._timeline.mark(f"{name} failed in background: {e}")
+        if on_done:
+            on_done()
@@ -0,0 +1,131 @@
+"""
+Session deltas for the frontend bridge.
+
+StateDelta keeps a plain copy of the state the client was last sent and answers later requests
+with a JSON-Patch style list of operations (add / remove / replace, RFC 6901 paths) plus a
+version number. Each delta compares the whole session with the client copy (an unchanged
+subtree is skipped after one deep equality check), so it costs a comparison pass over the
+session; only the changed parts are copied and turned into operations.
+"""
+import copy
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_PATCH_OPS = 10000
+MAX_DROP_PROBES = 4
+
+
+class StateDelta:
+    def __init__(self, view: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> None:
+        # view maps the session to what the client is sent (e.g. without server-only keys).
+        self._view = view
+        self._lock = threading.Lock()
+        self._source: Optional[Dict[str, Any]] = None
+        self._shadow: Any = None
+        self.version = 0
+
+    def client_copy(self) -> Any:
+        """
+        The state as the client holds it after the last delta (read-only for callers).
+        """
+        return self._shadow
+
+    def delta(self, session_state: Dict[str, Any], since_version: Any = None) -> Dict[str, Any]:
+        """
+        Patch from `since_version` to the current state, or the full state when the client
+        copy is unknown, belongs to another session or the patch grows too long.
+        The client copy is updated under a lock, so readers of the session may call this concurrently.
+        """
+        with self._lock:
+            if (
+                self._source is not session_state
+                or self._shadow is None
+                or not isinstance(since_version, int)
+                or since_version != self.version
+            ):
+                return self._full(session_state)
+
+            ops: List[Dict[str, Any]] = []
+            self._shadow = _diff(self._shadow, self._client_state(session_state), "", ops)
+            if len(ops) > MAX_PATCH_OPS:
+                return self._full(session_state)
+            if ops:
+                self.version += 1
+            return {"success": True, "full": False, "version": self.version, "patch": ops}
+
+    def _full(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        self._source = session_state
+        client_state = self._client_state(session_state)
+        self._shadow = copy.deepcopy(client_state)
+        self.version += 1
+        return {"success": True, "full": True, "version": self.version, "session_state": client_state}
+
+    def _client_state(self, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        return self._view(session_state) if self._view else session_state
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Dict[str, Any]]) -> Any:
+    """
+    Append the operations turning old into new and return the updated client copy.
+    """
+    if type(old) is type(new) and old == new:
+        return old
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in [k for k in old if k not in new]:
+            ops.append({"op": "remove", "path": _child(path, key)})
+            del old[key]
+        for key, value in new.items():
+            child = _child(path, key)
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+                old[key] = copy.deepcopy(value)
+            else:
+                old[key] = _diff(old[key], value, child, ops)
+        return old
+    if isinstance(old, list) and isinstance(new, list):
+        return _diff_list(old, new, path, ops)
+    ops.append({"op": "replace", "path": path, "value": new})
+    return copy.deepcopy(new)
+
+
+def _diff_list(old: List[Any], new: List[Any], path: str, ops: List[Dict[str, Any]]) -> List[Any]:
+    # Logs are trimmed at the front and appended at the back: find the kept window first.
+    dropped = _leading_drop(old, new) if old and new else 0
+    if dropped:
+        for _ in range(dropped):
+            ops.append({"op": "remove", "path": _child(path, 0)})
+        del old[:dropped]
+    common = min(len(old), len(new))
+    for idx in range(common):
+        old[idx] = _diff(old[idx], new[idx], _child(path, idx), ops)
+    for idx in range(len(old) - 1, common - 1, -1):
+        ops.append({"op": "remove", "path": _child(path, idx)})
+        del old[idx]
+    for idx in range(common, len(new)):
+        ops.append({"op": "add", "path": _child(path, "-"), "value": new[idx]})
+        old.append(copy.deepcopy(new[idx]))
+    return old
+
+
+def _leading_drop(old: List[Any], new: List[Any]) -> int:
+    """
+    Number of leading entries of old to drop so that the rest is a prefix of new (0 if none fits).
+    Only the first MAX_DROP_PROBES positions holding new[0] are tried, so the search stays linear.
+    """
+    if old[: len(new)] == new[: len(old)]:
+        return 0
+    first = new[0]
+    start = 0
+    for _ in range(MAX_DROP_PROBES):
+        try:
+            start = old.index(first, start + 1)
+        except ValueError:
+            return 0
+        if old[start:] == new[: len(old) - start]:
+            return start
+    return 0
+
+
+def _child(path: str, key: Any) -> str:
+    token = str(key).replace("~", "~0").replace("/", "~1")
+    return f"{path}/{token}"
@@ -0,0 +1,237 @@
+"""
+Synthetic packs and sessions for benchmarks and load tests.
+Sizes (facilities, NPCs, orders, inventory, audit log) are freely scalable.
+"""
+import json
+import random
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .initial_state import InitialStateGenerator
+
+SYNTHETIC_PACK_ID = "synthetic"
+SYNTHETIC_FORMULA = "synthetic_formula"
+SYNTHETIC_STAT = "synthetic_stat"
+
+
+def write_synthetic_root(
+    root_dir: Path,
+    source_root: Path,
+    facilities: int,
+    orders_per_facility: int = 4,
+    npc_slots: int = 2,
+    item_kinds: int = 100,
+) -> Dict[str, Any]:
+    """
+    Create data/config + data/facilities under root_dir with one synthetic pack.
+    The base bastion_config.json is copied from source_root; settings.json is not.
+    """
+    config_dir = root_dir / "data" / "config"
+    facilities_dir = root_dir / "data" / "facilities"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    facilities_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source_root / "data" / "config" / "bastion_config.json", config_dir / "bastion_config.json")
+
+    pack = build_synthetic_pack(facilities, orders_per_facility, npc_slots, item_kinds)
+    (facilities_dir / f"{SYNTHETIC_PACK_ID}.json").write_text(json.dumps(pack, indent=2), encoding="utf-8")
+    return pack
+
+
+def build_synthetic_pack(
+    facilities: int,
+    orders_per_facility: int = 4,
+    npc_slots: int = 2,
+    item_kinds: int = 100,
+) -> Dict[str, Any]:
+    facility_defs: List[Dict[str, Any]] = []
+    for idx in range(facilities):
+        orders = []
+        for order_idx in range(orders_per_facility):
+            item = f"item_{(idx * orders_per_facility + order_idx) % max(item_kinds, 1)}"
+            success_effects: List[Dict[str, Any]] = [
+                {"item": item, "qty": 1},
+                {"gold": 1},
+                {"stat": SYNTHETIC_STAT, "delta": 1},
+                {"log": f"Synthetic order {order_idx} succeeded."},
+            ]
+            if order_idx == 0:
+                success_effects.append({"trigger": SYNTHETIC_FORMULA})
+            orders.append({
+                "id": f"order_{order_idx}",
+                "name": f"Synthetic Order {order_idx}",
+                "min_npc_level": 1,
+                "duration_turns": order_idx % 3 + 1,
+                "outcome": {
+                    "check_profile": "d20",
+                    "on_success": {"effects": success_effects},
+                    "on_failure": {"effects": [{"silver": -1}, {"log": "Synthetic order failed."}]},
+                },
+            })
+        facility_defs.append({
+            "id": synthetic_facility_id(idx),
+            "name": f"Synthetic Facility {idx}",
+            "tier": 1,
+            "parent": None,
+            "build": {"cost": {"gold": 10}, "duration_turns": 1},
+            "npc_slots": npc_slots,
+            "npc_allowed_professions": ["worker"],
+            "orders": orders,
+        })
+
+    return {
+        "pack_id": SYNTHETIC_PACK_ID,
+        "name": "Synthetic Benchmark Pack",
+        "version": 1,
+        "author": "benchmark",
+        "facilities": facility_defs,
+        "custom_mechanics": [
+            {
+                "name": "Synthetic Stat",
+                "type": "stat_counter",
+                "config": {"custom_stat_name": SYNTHETIC_STAT, "min_value": 0, "max_value": 1000000},
+            },
+            {
+                "name": SYNTHETIC_FORMULA,
+                "type": "formula_engine",
+                "config": {
+                    "inputs": [
+                        {"name": "stock", "source": "item", "default": "item_0"},
+                        {"name": "level", "source": "stat", "default": SYNTHETIC_STAT},
+                        {"name": "base", "source": "number", "default": 3},
+                    ],
+                    "calculations": [
+                        {"name": "demand", "formula": "1d6+level"},
+                        {"name": "income", "formula": "(stock - demand) * base"},
+                        {"name": "delta", "conditions": [{"if": "income > 0", "then": 1}, {"else": 0}]},
+                    ],
+                    "effects": [
+                        {"silver": "${income}"},
+                        {"stat": SYNTHETIC_STAT, "delta": "${delta}"},
+                    ],
+                },
+            },
+        ],
+    }
+
+
+def synthetic_facility_id(idx: int) -> str:
+    return f"{SYNTHETIC_PACK_ID}:f{idx}:t1"
+
+
+def build_synthetic_session(
+    pack: Dict[str, Any],
+    npcs: int,
+    orders: int,
+    inventory_items: int,
+    audit_entries: int,
+    current_turn: int = 10,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """
+    Build an operational bastion for the synthetic pack without going through the ledger.
+    NPCs fill facility slots round-robin (overflow goes to reserve); orders use assigned NPCs.
+    """
+    rng = random.Random(seed)
+    state = InitialStateGenerator.generate_session_state(
+        session_name="synthetic",
+        bastion_name="Synthetic Bastion",
+        players=[{"player_id": "player_1", "name": "Player 1"}],
+    )
+    state["current_turn"] = current_turn
+    bastion = state["bastion"]
+    bastion["treasury_base"] = 10 ** 9
+    bastion["stats"] = {SYNTHETIC_STAT: 0}
+
+    facility_defs = pack.get("facilities", [])
+    facilities = bastion["facilities"]
+    for facility_def in facility_defs:
+        facilities.append({
+            "facility_id": facility_def["id"],
+            "built_turn": 0,
+            "build_status": {"status": "operational"},
+            "current_orders": [],
+            "current_order": None,
+            "custom_stats": {},
+            "assigned_npcs": [],
+            "owner_player_id": "player_1",
+        })
+
+    slots = {f["id"]: f.get("npc_slots", 0) for f in facility_defs}
+    for idx in range(npcs):
+        npc = {
+            "npc_id": f"npc_{idx}",
+            "name": f"NPC {idx}",
+            "profession": "worker",
+            "level": 1 + idx % 3,
+            "xp": 0,
+            "upkeep": {"silver": 1 + idx % 5},
+            "hired_turn": 0,
+        }
+        facility = facilities[idx % len(facilities)] if facilities else None
+        if facility and len(facility["assigned_npcs"]) < slots.get(facility["facility_id"], 0):
+            facility["assigned_npcs"].append(npc)
+        else:
+            bastion["npcs_unassigned"].append(npc)
+
+    started = 0
+    defs_by_id = {f["id"]: f for f in facility_defs}
+    for facility in facilities:
+        order_defs = defs_by_id[facility["facility_id"]].get("orders", [])
+        for npc in facility["assigned_npcs"]:
+            if started >= orders or not order_defs:
+                break
+            order_def = order_defs[started % len(order_defs)]
+            duration = order_def.get("duration_turns", 1)
+            facility["current_orders"].append({
+                "order_id": order_def["id"],
+                "npc_id": npc["npc_id"],
+                "npc_name": npc["name"],
+                "npc_level": npc["level"],
+                "started_turn": current_turn,
+                "duration_turns": duration,
+                "progress": rng.randrange(duration),
+                "status": "in_progress",
+                "roll": None,
+                "roll_locked": False,
+                "roll_source": None,
+            })
+            started += 1
+
+    bastion["inventory"] = [{"item": f"item_{idx}", "qty": 5 + idx % 7} for idx in range(inventory_items)]
+
+    audit_log = state["audit_log"]
+    for idx in range(audit_entries):
+        turn = current_turn - (idx % 3)
+        audit_log.append({
+            "turn": turn,
+            "event_type": "synthetic",
+            "source_type": "facility",
+            "source_id": facility_defs[idx % len(facility_defs)]["id"] if facility_defs else "*",
+            "action": "synthetic",
+            "roll": "-",
+            "result": "applied",
+            "changes": "currency:gold:1",
+            "log_text": f"Synthetic audit entry {idx}",
+        })
+    audit_log.sort(key=lambda e: e["turn"])
+    return state
+
+
+def mark_orders_ready(session_state: Dict[str, Any], locked: bool, seed: int = 1) -> int:
+    """
+    Turn every active order into a ready order (optionally with a locked d20 roll).
+    """
+    rng = random.Random(seed)
+    count = 0
+    for facility in session_state.get("bastion", {}).get("facilities", []):
+        for order in facility.get("current_orders", []):
+            order["progress"] = order.get("duration_turns", 1)
+            order["status"] = "ready"
+            order["ready_turn"] = session_state.get("current_turn", 0)
+            if locked:
+                order["roll"] = rng.randint(1, 20)
+                order["roll_locked"] = True
+                order["roll_source"] = "auto"
+            count += 1
+    return count
@@ -0,0 +1,258 @@
+import heapq
+import itertools
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+DUE_KEY = "due_turn"
+
+
+class TurnScheduler:
+    """
+    Heap of upcoming completions (build, upgrade, order ready) keyed by due turn.
+    Each scheduled order / build_status carries its due turn (DUE_KEY); an advance only touches
+    the entries that complete. The visible progress / remaining_turns fields are derived from
+    the due turn when the session is read or saved (see visible_state).
+    """
+
+    def __init__(self, normalize_orders: Any, infer_order_status: Any) -> None:
+        self._normalize_orders = normalize_orders
+        self._infer_order_status = infer_order_status
+        self._session: Optional[Dict[str, Any]] = None
+        self._heap: List[Tuple[int, int, str, Dict[str, Any], Dict[str, Any]]] = []
+        self._pending: Dict[int, Tuple[int, int, str, Dict[str, Any], Dict[str, Any]]] = {}
+        self._ready: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._seq = itertools.count()
+
+    def bind(self, session_state: Dict[str, Any]) -> bool:
+        if self._session is session_state:
+            return False
+        self._session = session_state
+        self.rebuild(session_state)
+        return True
+
+    @contextmanager
+    def isolated(self):
+        """
+        Run against a throwaway session (e.g. a preview overlay) and restore the current
+        binding afterwards without a rebuild.
+        """
+        saved = (self._session, self._heap, self._pending, self._ready)
+        self._session = None
+        try:
+            yield self
+        finally:
+            self._session, self._heap, self._pending, self._ready = saved
+
+    def rebuild(self, session_state: Dict[str, Any]) -> None:
+        self._heap = []
+        self._pending = {}
+        self._ready = {}
+        current_turn = int(session_state.get("current_turn", 0))
+        bastion = session_state.get("bastion", {}) if isinstance(session_state, dict) else {}
+        facilities = bastion.get("facilities", []) or []
+        for facility in facilities:
+            if not isinstance(facility, dict):
+                continue
+            self._push_build(facility, current_turn)
+            for order in self._normalize_orders(facility):
+                if not isinstance(order, dict):
+                    continue
+                status = self._infer_order_status(order)
+                if status == "ready":
+                    self._ready[id(order)] = (facility, order)
+                elif status == "in_progress":
+                    self._push_order(facility, order, current_turn)
+
+    def schedule_build(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any]) -> None:
+        if self.bind(session_state):
+            return
+        self._push_build(facility_entry, int(session_state.get("current_turn", 0)))
+
+    def schedule_order(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any], order_entry: Dict[str, Any]) -> None:
+        if self.bind(session_state):
+            return
+        self._push_order(facility_entry, order_entry, int(session_state.get("current_turn", 0)))
+
+    def discard_facility(self, session_state: Dict[str, Any], facility_entry: Dict[str, Any]) -> None:
+        if self.bind(session_state):
+            return
+        for key, entry in list(self._pending.items()):
+            if entry[3] is facility_entry:
+                del self._pending[key]
+        for key, (facility, _order) in list(self._ready.items()):
+            if facility is facility_entry:
+                del self._ready[key]
+
+    def next_due_turn(self, session_state: Dict[str, Any]) -> Optional[int]:
+        self.bind(session_state)
+        while self._heap:
+            head = self._heap[0]
+            if self._pending.get(id(head[4])) is head:
+                return head[0]
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, session_state: Dict[str, Any], current_turn: int) -> List[Tuple[str, Dict[str, Any], Dict[str, Any], int]]:
+        """
+        Pop every entry due at or before current_turn that is still live.
+        Returns (kind, facility_entry, target, due_turn) tuples in due order.
+        """
+        self.bind(session_state)
+        due: List[Tuple[str, Dict[str, Any], Dict[str, Any], int]] = []
+        while self._heap and self._heap[0][0] <= current_turn:
+            entry = heapq.heappop(self._heap)
+            due_turn, _seq, kind, facility, target = entry
+            if self._pending.get(id(target)) is not entry:
+                continue
+            del self._pending[id(target)]
+            if kind == "build":
+                build_status = facility.get("build_status")
+                if build_status is not target or target.get("status") not in ["building", "upgrading"]:
+                    continue
+            else:
+                if self._infer_order_status(target) != "in_progress":
+                    continue
+                if not any(o is target for o in self._normalize_orders(facility)):
+                    continue
+                self._ready[id(target)] = (facility, target)
+            due.append((kind, facility, target, due_turn))
+        return due
+
+    def has_ready_orders(self, session_state: Dict[str, Any]) -> bool:
+        self.bind(session_state)
+        for key, (facility, order) in list(self._ready.items()):
+            if self._infer_order_status(order) == "ready" and any(o is order for o in self._normalize_orders(facility)):
+                return True
+            del self._ready[key]
+        return False
+
+    def _push_build(self, facility_entry: Dict[str, Any], current_turn: int) -> None:
+        build_status = facility_entry.get("build_status")
+        if not isinstance(build_status, dict):
+            return
+        if build_status.get("status") not in ["building", "upgrading"]:
+            return
+        due_turn = _due_turn(build_status)
+        if due_turn is None:
+            remaining = build_status.get("remaining_turns")
+            if not isinstance(remaining, int):
+                return
+            due_turn = current_turn + max(remaining, 1)
+        self._push(due_turn, "build", facility_entry, build_status)
+
+    def _push_order(self, facility_entry: Dict[str, Any], order_entry: Dict[str, Any], current_turn: int) -> None:
+        duration = order_entry.get("duration_turns")
+        if not isinstance(duration, int) or duration <= 0:
+            return
+        due_turn = _due_turn(order_entry)
+        if due_turn is None:
+            progress = order_entry.get("progress")
+            if not isinstance(progress, int):
+                progress = 0
+            due_turn = current_turn + max(duration - progress, 1)
+        self._push(due_turn, "order", facility_entry, order_entry)
+
+    def _push(self, due_turn: int, kind: str, facility_entry: Dict[str, Any], target: Dict[str, Any]) -> None:
+        entry = (due_turn, next(self._seq), kind, facility_entry, target)
+        target[DUE_KEY] = due_turn
+        self._pending[id(target)] = entry
+        heapq.heappush(self._heap, entry)
+
+
+def scheduled_remaining(target: Dict[str, Any], current_turn: int) -> Optional[int]:
+    """
+    Turns until a scheduled order / build_status completes, None if it carries no due turn.
+    """
+    due_turn = _due_turn(target)
+    return None if due_turn is None else max(due_turn - current_turn, 0)
+
+
+def order_progress(order: Dict[str, Any], current_turn: int) -> Any:
+    remaining = scheduled_remaining(order, current_turn)
+    duration = order.get("duration_turns")
+    if remaining is None or not isinstance(duration, int):
+        return order.get("progress", 0)
+    return max(duration - remaining, 0)
+
+
+def build_remaining(build_status: Dict[str, Any], current_turn: int) -> Any:
+    remaining = scheduled_remaining(build_status, current_turn)
+    return build_status.get("remaining_turns") if remaining is None else remaining
+
+
+def visible_state(session_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    session_state with order progress / build remaining_turns derived from the due turns.
+    Only the facilities whose stored fields lag are copied; session_state is not modified.
+    """
+    return _visible(session_state, in_place=False)
+
+
+def write_visible_fields(session_state: Dict[str, Any]) -> None:
+    """
+    Store the derived progress / remaining_turns in the session itself (before a save).
+    """
+    _visible(session_state, in_place=True)
+
+
+def _visible(session_state: Any, in_place: bool) -> Any:
+    bastion = session_state.get("bastion") if isinstance(session_state, dict) else None
+    facilities = bastion.get("facilities") if isinstance(bastion, dict) else None
+    if not isinstance(facilities, list):
+        return session_state
+    current_turn = int(session_state.get("current_turn", 0))
+    copied: Optional[List[Any]] = None
+    for idx, facility in enumerate(facilities):
+        visible = _visible_facility(facility, current_turn, in_place)
+        if visible is not facility:
+            if copied is None:
+                copied = list(facilities)
+            copied[idx] = visible
+    if copied is None:
+        return session_state
+    return {**session_state, "bastion": {**bastion, "facilities": copied}}
+
+
+def _visible_facility(facility: Any, current_turn: int, in_place: bool) -> Any:
+    if not isinstance(facility, dict):
+        return facility
+    updates: Dict[str, Any] = {}
+    build_status = facility.get("build_status")
+    if isinstance(build_status, dict) and build_status.get("status") in ["building", "upgrading"]:
+        remaining = build_remaining(build_status, current_turn)
+        if build_status.get("remaining_turns") != remaining:
+            updates["build_status"] = _with_field(build_status, "remaining_turns", remaining, in_place)
+    orders = facility.get("current_orders")
+    if isinstance(orders, list):
+        copied: Optional[List[Any]] = None
+        for idx, order in enumerate(orders):
+            if not isinstance(order, dict) or _due_turn(order) is None:
+                continue
+            if order.get("status") not in [None, "", "in_progress"]:
+                continue
+            progress = order_progress(order, current_turn)
+            if order.get("progress") != progress:
+                visible = _with_field(order, "progress", progress, in_place)
+                if visible is not order:
+                    if copied is None:
+                        copied = list(orders)
+                    copied[idx] = visible
+        if copied is not None:
+            updates["current_orders"] = copied
+    if in_place or not updates:
+        return facility
+    return {**facility, **updates}
+
+
+def _with_field(target: Dict[str, Any], key: str, value: Any, in_place: bool) -> Dict[str, Any]:
+    if in_place:
+        target[key] = value
+        return target
+    return {**target, key: value}
+
+
+def _due_turn(target: Dict[str, Any]) -> Optional[int]:
+    due_turn = target.get(DUE_KEY)
+    if not isinstance(due_turn, int) or isinstance(due_turn, bool):
+        return None
+    return due_turn
@@ -248,6 +248,8 @@ function logAuditEvent(event) {
     const log = appState.session.audit_log || [];
     log.push(entry);
     appState.session.audit_log = log;
+    // Local copy no longer matches the server's delta base.
+    appState.sessionVersion = null;
     renderAuditLog();
 
     if (window.pywebview && window.pywebview.api && window.pywebview.api.add_audit_entry) {
@@ -324,6 +326,13 @@ function scheduleAutosaveFromClick(reason = 'button_click') {
     }, 800);
 }
 
+function cancelScheduledAutosave() {
+    if (autosaveClickTimer) {
+        clearTimeout(autosaveClickTimer);
+        autosaveClickTimer = null;
+    }
+}
+
 document.addEventListener('click', event => {
     const button = event.target && event.target.closest ? event.target.closest('button') : null;
     if (!button) {
@@ -340,70 +349,23 @@ async function loadFacilityCatalog() {
         return;
     }
     try {
-        const facilityFiles = await window.pywebview.api.get_facilities();
-        const catalog = [];
-        const seenIds = new Set();
-        const formulaRegistry = {};
-
-        if (Array.isArray(facilityFiles)) {
-            for (const fileId of facilityFiles) {
-                const rawId = String(fileId || '');
-                let sourceHint = null;
-                let packStem = rawId;
-                const sepIndex = rawId.indexOf(':');
-                if (sepIndex > 0) {
-                    const candidate = rawId.slice(0, sepIndex);
-                    if (candidate === 'core' || candidate === 'custom') {
-                        sourceHint = candidate;
-                        packStem = rawId.slice(sepIndex + 1);
-                    }
-                }
-                const data = await window.pywebview.api.load_facility(fileId);
-                if (!data || data.error) {
-                    logClient('warn', `Failed to load facility pack ${fileId}: ${data && data.error ? data.error : 'unknown'}`);
-                    continue;
-                }
-                if (Array.isArray(data.custom_mechanics)) {
-                    data.custom_mechanics.forEach(mech => {
-                        if (!mech || typeof mech !== 'object') {
-                            return;
-                        }
-                        if (mech.type !== 'formula_engine') {
-                            return;
-                        }
-                        const key = mech.name || mech.id;
-                        if (!key || formulaRegistry[key]) {
-                            return;
-                        }
-                        formulaRegistry[key] = {
-                            id: mech.id || key,
-                            name: mech.name || key,
-                            config: mech.config && typeof mech.config === 'object' ? mech.config : {},
-                            pack_id: data.pack_id || packStem || fileId,
-                            pack_source: data._pack_source || sourceHint || 'core'
-                        };
-                    });
-                }
-                const packId = data.pack_id || packStem || fileId;
-                const packSource = data._pack_source || sourceHint || 'core';
-                const facilities = Array.isArray(data.facilities) ? data.facilities : [];
-                facilities.forEach(facility => {
-                    if (!facility || typeof facility !== 'object') {
-                        return;
-                    }
-                    if (!facility.id || typeof facility.id !== 'string') {
-                        return;
-                    }
-                    if (seenIds.has(facility.id)) {
-                        logClient('warn', `Duplicate facility id skipped: ${facility.id} (${packId})`);
-                        return;
-                    }
-                    seenIds.add(facility.id);
-                    const item = { ...facility, _pack_id: packId, _pack_source: packSource };
-                    catalog.push(item);
-                });
+        let loaded = null;
+        if (window.pywebview.api.get_catalog_bundle) {
+            const bundle = await window.pywebview.api.get_catalog_bundle(appState.catalogEtag);
+            if (bundle && bundle.success && bundle.unchanged && appState.facilityCatalog.length) {
+                refreshFacilityStates();
+                return;
+            }
+            if (bundle && bundle.success && Array.isArray(bundle.facilities)) {
+                loaded = { catalog: bundle.facilities, formulaRegistry: bundle.formulas || {} };
+                appState.catalogEtag = bundle.etag || null;
             }
         }
+        if (!loaded) {
+            loaded = await loadFacilityCatalogFromPacks();
+            appState.catalogEtag = null;
+        }
+        const { catalog, formulaRegistry } = loaded;
 
         appState.facilityCatalog = catalog;
         appState.facilityById = {};
@@ -422,9 +384,181 @@ async function loadFacilityCatalog() {
     }
 }
 
-async function refreshSessionState() {
+async function loadFacilityCatalogFromPacks() {
+    const facilityFiles = await window.pywebview.api.get_facilities();
+    const catalog = [];
+    const seenIds = new Set();
+    const formulaRegistry = {};
+
+    if (Array.isArray(facilityFiles)) {
+        for (const fileId of facilityFiles) {
+            const rawId = String(fileId || '');
+            let sourceHint = null;
+            let packStem = rawId;
+            const sepIndex = rawId.indexOf(':');
+            if (sepIndex > 0) {
+                const candidate = rawId.slice(0, sepIndex);
+                if (candidate === 'core' || candidate === 'custom') {
+                    sourceHint = candidate;
+                    packStem = rawId.slice(sepIndex + 1);
+                }
+            }
+            const data = await window.pywebview.api.load_facility(fileId);
+            if (!data || data.error) {
+                logClient('warn', `Failed to load facility pack ${fileId}: ${data && data.error ? data.error : 'unknown'}`);
+                continue;
+            }
+            if (Array.isArray(data.custom_mechanics)) {
+                data.custom_mechanics.forEach(mech => {
+                    if (!mech || typeof mech !== 'object') {
+                        return;
+                    }
+                    if (mech.type !== 'formula_engine') {
+                        return;
+                    }
+                    const key = mech.name || mech.id;
+                    if (!key || formulaRegistry[key]) {
+                        return;
+                    }
+                    formulaRegistry[key] = {
+                        id: mech.id || key,
+                        name: mech.name || key,
+                        config: mech.config && typeof mech.config === 'object' ? mech.config : {},
+                        pack_id: data.pack_id || packStem || fileId,
+                        pack_source: data._pack_source || sourceHint || 'core'
+                    };
+                });
+            }
+            const packId = data.pack_id || packStem || fileId;
+            const packSource = data._pack_source || sourceHint || 'core';
+            const facilities = Array.isArray(data.facilities) ? data.facilities : [];
+            facilities.forEach(facility => {
+                if (!facility || typeof facility !== 'object') {
+                    return;
+                }
+                if (!facility.id || typeof facility.id !== 'string') {
+                    return;
+                }
+                if (seenIds.has(facility.id)) {
+                    logClient('warn', `Duplicate facility id skipped: ${facility.id} (${packId})`);
+                    return;
+                }
+                seenIds.add(facility.id);
+                const item = { ...facility, _pack_id: packId, _pack_source: packSource };
+                catalog.push(item);
+            });
+        }
+    }
+    return { catalog, formulaRegistry };
+}
+
+function applySessionPatch(target, ops) {
+    let root = target;
+    ops.forEach(op => {
+        const parts = op.path.split('/').slice(1).map(part => part.replace(/~1/g, '/').replace(/~0/g, '~'));
+        if (parts.length === 0) {
+            root = op.value;
+            return;
+        }
+        let parent = root;
+        for (let i = 0; i < parts.length - 1; i++) {
+            parent = parent[Array.isArray(parent) ? Number(parts[i]) : parts[i]];
+            if (parent === null || typeof parent !== 'object') {
+                throw new Error(`Invalid patch path: ${op.path}`);
+            }
+        }
+        const last = parts[parts.length - 1];
+        if (Array.isArray(parent)) {
+            if (op.op === 'add' && last === '-') {
+                parent.push(op.value);
+            } else if (op.op === 'add') {
+                parent.splice(Number(last), 0, op.value);
+            } else if (op.op === 'remove') {
+                parent.splice(Number(last), 1);
+            } else {
+                parent[Number(last)] = op.value;
+            }
+        } else if (op.op === 'remove') {
+            delete parent[last];
+        } else {
+            parent[last] = op.value;
+        }
+    });
+    return root;
+}
+
+function resolveSessionDelta(delta) {
+    if (!delta || !delta.success) {
+        return null;
+    }
+    if (delta.full) {
+        appState.sessionVersion = delta.version;
+        return delta.session_state;
+    }
+    try {
+        const state = applySessionPatch(appState.session, delta.patch || []);
+        appState.sessionVersion = delta.version;
+        return state;
+    } catch (err) {
+        logClient('warn', `Session patch failed, reloading full state: ${err}`);
+        appState.sessionVersion = null;
+        return null;
+    }
+}
+
+async function fetchSessionState(prefetchedDelta = null) {
+    const api = window.pywebview.api;
+    let state = resolveSessionDelta(prefetchedDelta);
+    if (!state && api.get_session_delta) {
+        state = resolveSessionDelta(await api.get_session_delta(appState.sessionVersion));
+    }
+    return state || api.get_current_session();
+}
+
+// Several Api calls in one round trip; the session delta comes back with the results.
+// Returns the batch response ({success, results, failed_index}); call refreshSessionState(response.state).
+async function runApiBatch(operations, options = {}) {
+    const api = window.pywebview && window.pywebview.api;
+    if (!api || !api.execute_batch) {
+        const results = [];
+        for (const op of operations) {
+            const result = await api[op.method](...(op.params || []));
+            results.push(result);
+            if (!result || result.success === false) {
+                return { success: false, results, failed_index: results.length - 1, state: null };
+            }
+        }
+        return { success: true, results, failed_index: null, state: null };
+    }
+    return api.execute_batch(
+        operations,
+        options.stopOnError !== false,
+        Boolean(options.atomic),
+        appState.sessionVersion === null ? -1 : appState.sessionVersion
+    );
+}
+
+// Last operation of a runApiBatch call: the action and its autosave share one round trip.
+const SAVE_SESSION_OP = { method: 'save_session' };
+
+// Log the outcome of SAVE_SESSION_OP at results[index] (absent when an earlier operation failed).
+function reportBatchSave(batch, index, reason) {
+    const response = batch && Array.isArray(batch.results) ? batch.results[index] : undefined;
+    if (response === undefined) {
+        return;
+    }
+    if (!response || !response.success) {
+        const message = response && response.message ? response.message : 'unknown error';
+        logClient('warn', `Autosave failed (${reason}): ${message}`);
+        return;
+    }
+    cancelScheduledAutosave();
+    logClient('debug', `Autosave ok (${reason})`);
+}
+
+async function refreshSessionState(prefetchedDelta = null) {
     if (window.pywebview && window.pywebview.api && window.pywebview.api.get_current_session) {
-        const state = await window.pywebview.api.get_current_session();
+        const state = await fetchSessionState(prefetchedDelta);
         if (state && Object.keys(state).length > 0) {
             appState.session = state;
             if (typeof setHeaderSessionName === 'function') {
@@ -476,12 +610,12 @@ async function loadCheckProfiles() {
     }
 }
 
-async function refreshFacilityStates() {
+async function refreshFacilityStates(prefetched = null) {
     if (!(window.pywebview && window.pywebview.api && window.pywebview.api.get_facility_states)) {
         return;
     }
     try {
-        const response = await window.pywebview.api.get_facility_states();
+        const response = prefetched && prefetched.success ? prefetched : await window.pywebview.api.get_facility_states();
         if (response && response.success) {
             appState.facilityStates = response.states || [];
             renderFacilityStates();
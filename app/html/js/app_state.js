@@ -133,8 +133,10 @@ let appState = {
         npcs: [],
         players: [],
     },
+    sessionVersion: null,
     buildQueue: [],
     facilityCatalog: [],
+    catalogEtag: null,
     facilityById: {},
     facilityStates: [],
     currencyModel: null,
@@ -308,7 +310,25 @@ function getEventHistoryList() {
     return [];
 }
 
-function renderEventHistoryModal() {
+const EVENT_HISTORY_PAGE_SIZE = 500;
+
+async function fetchEventHistory() {
+    // Latest events from the server-side index; the local copy is the fallback.
+    if (!(window.pywebview && window.pywebview.api && window.pywebview.api.get_event_history)) {
+        return getEventHistoryList();
+    }
+    try {
+        const response = await window.pywebview.api.get_event_history(null, null, null, 0, EVENT_HISTORY_PAGE_SIZE, true);
+        if (response && response.success && Array.isArray(response.entries)) {
+            return response.entries.slice().reverse();
+        }
+    } catch (err) {
+        logClient('warn', `Failed to load event history: ${err}`);
+    }
+    return getEventHistoryList();
+}
+
+function renderEventHistoryModal(entryList) {
     const body = document.getElementById('event-history-body');
     const empty = document.getElementById('event-history-empty');
     const table = document.getElementById('event-history-table');
@@ -317,7 +337,7 @@ function renderEventHistoryModal() {
     }
     body.innerHTML = '';
 
-    const entries = getEventHistoryList();
+    const entries = Array.isArray(entryList) ? entryList : getEventHistoryList();
     if (!entries.length) {
         if (table) {
             table.classList.add('hidden');
@@ -364,13 +384,9 @@ function openEventHistoryModal() {
     if (modal) {
         modal.classList.remove('hidden');
     }
-    if (typeof refreshSessionState === 'function') {
-        refreshSessionState().then(() => {
-            renderEventHistoryModal();
-        });
-    } else {
-        renderEventHistoryModal();
-    }
+    fetchEventHistory().then(entries => {
+        renderEventHistoryModal(entries);
+    });
 }
 
 function closeModal(modalId) {
@@ -542,6 +558,16 @@ function renderAuditLog() {
         const parts = [turnLabel, icon, text].filter(Boolean);
         line.textContent = parts.join(' ').trim();
         logContent.appendChild(line);
+
+        if (Array.isArray(entry.details)) {
+            entry.details.forEach(detail => {
+                const sub = document.createElement('p');
+                sub.className = `log-entry log-sub ${cssType}`;
+                const where = detail.facility ? ` (${detail.facility})` : '';
+                sub.textContent = `↳ ${detail.name || detail.npc_id || ''}${where} -${formatCost(detail.cost || {}, getCurrencyOrder())}`;
+                logContent.appendChild(sub);
+            });
+        }
     });
 
     logContent.scrollTop = logContent.scrollHeight;
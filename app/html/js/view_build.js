@@ -1273,6 +1273,7 @@ function createSession() {
             if (response.success) {
                 logClient('info', 'Session created successfully');
                 appState.session = response.session_state;
+                appState.sessionVersion = null;
                 renderAuditLog();
                 updateTurnCounter();
                 updateQueueDisplay();
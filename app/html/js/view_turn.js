@@ -56,13 +56,15 @@ async function adjustTreasury(mode = 'add') {
         log_text: t('treasury.log_text', { amount: formatSigned(delta), currency })
     };
 
-    const response = await window.pywebview.api.apply_effects([effect], context);
+    const batch = await runApiBatch([{ method: 'apply_effects', params: [[effect], context] }, SAVE_SESSION_OP]);
+    const response = batch && Array.isArray(batch.results) ? batch.results[0] : null;
     if (!response || !response.success) {
         notifyUser(t('treasury.failed'));
         return;
     }
 
-    await refreshSessionState();
+    await refreshSessionState(batch.state);
+    reportBatchSave(batch, 1, 'treasury_adjust');
     renderInventoryPanel();
     const effectText = formatEffectEntries(response.entries || []);
     const summary = t('treasury.applied', { effects: effectText });
@@ -110,13 +112,15 @@ async function adjustInventoryItem(mode = 'add') {
         log_text: t('inventory.log_text', { item, qty: formatSigned(delta) })
     };
 
-    const response = await window.pywebview.api.apply_effects([effect], context);
+    const batch = await runApiBatch([{ method: 'apply_effects', params: [[effect], context] }, SAVE_SESSION_OP]);
+    const response = batch && Array.isArray(batch.results) ? batch.results[0] : null;
     if (!response || !response.success) {
         notifyUser(t('inventory.failed'));
         return;
     }
 
-    await refreshSessionState();
+    await refreshSessionState(batch.state);
+    reportBatchSave(batch, 1, 'inventory_adjust');
     renderInventoryPanel();
     const effectText = formatEffectEntries(response.entries || []);
     const summary = t('inventory.applied', { effects: effectText });
@@ -324,6 +328,7 @@ async function applyLoadedSession(filename, sessionState, options = {}) {
     const closeDialog = options.closeDialog !== false;
 
     appState.session = sessionState;
+    appState.sessionVersion = null;
     renderAuditLog();
     updateTurnCounter();
     updateQueueDisplay();
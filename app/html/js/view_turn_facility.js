@@ -1024,6 +1024,8 @@ function renderOrdersPanel(facilityId) {
             const formulaInfo = getFormulaInfoForOrder(orderDef, order);
             const needsRoll = !!checkProfile && !order.roll_locked;
             const missingFormula = formulaInfo.state === 'active' && formulaInfo.hasMissing;
+            // Without formula prompts nothing is left to enter after the roll: resolve right away.
+            const resolveOnLock = formulaInfo.state === 'none';
             const actions = document.createElement('div');
             actions.className = 'order-actions';
 
@@ -1050,13 +1052,13 @@ function renderOrdersPanel(facilityId) {
                 lockBtn.className = 'btn btn-secondary btn-small';
                 lockBtn.textContent = t('orders.lock_roll');
                 lockBtn.disabled = !!order.roll_locked;
-                lockBtn.addEventListener('click', () => lockOrderRoll(order.order_id, rollInput.value));
+                lockBtn.addEventListener('click', () => lockOrderRoll(order.order_id, rollInput.value, false, resolveOnLock));
 
                 const autoBtn = document.createElement('button');
                 autoBtn.className = 'btn btn-secondary btn-small';
                 autoBtn.textContent = t('orders.auto_roll');
                 autoBtn.disabled = !!order.roll_locked;
-                autoBtn.addEventListener('click', () => lockOrderRoll(order.order_id, null, true));
+                autoBtn.addEventListener('click', () => lockOrderRoll(order.order_id, null, true, resolveOnLock));
 
                 actions.appendChild(rollInput);
                 actions.appendChild(lockBtn);
@@ -1441,33 +1443,58 @@ async function startOrder() {
         notifyUser(t('alerts.pywebview_unavailable'));
         return;
     }
-    const response = await window.pywebview.api.start_order(facilityId, npcId, orderId);
+    const batch = await runApiBatch([
+        { method: 'start_order', params: [facilityId, npcId, orderId] },
+        { method: 'get_facility_states' },
+        SAVE_SESSION_OP
+    ]);
+    const response = batch && Array.isArray(batch.results) ? batch.results[0] : null;
     if (!response || !response.success) {
         notifyUser(t('alerts.order_start_failed', { message: response && response.message ? response.message : 'unknown error' }));
         return;
     }
-    await refreshSessionState();
-    await refreshFacilityStates();
+    await refreshSessionState(batch.state);
+    await refreshFacilityStates(batch.results[1]);
+    reportBatchSave(batch, 2, 'start_order');
     renderOrdersPanel(facilityId);
     renderSlotBubbles(appState.facilityById[facilityId], getFacilityEntry(facilityId));
     addLogEntry(t('alerts.order_start_success'), 'event');
 }
 
-async function lockOrderRoll(orderId, rollValue, auto = false) {
+async function lockOrderRoll(orderId, rollValue, auto = false, evaluate = false) {
     const facilityId = appState.selectedFacilityId;
     if (!(window.pywebview && window.pywebview.api && window.pywebview.api.lock_order_roll)) {
         notifyUser(t('alerts.pywebview_unavailable'));
         return;
     }
     const rollNumber = rollValue !== null && rollValue !== undefined && rollValue !== '' ? parseInt(rollValue, 10) : null;
-    const response = await window.pywebview.api.lock_order_roll(facilityId, orderId, rollNumber, auto);
+    // Lock, resolve (when nothing else blocks it) and save in one round trip.
+    const operations = [{ method: 'lock_order_roll', params: [facilityId, orderId, rollNumber, auto] }];
+    if (evaluate) {
+        operations.push({ method: 'evaluate_order', params: [facilityId, orderId] }, { method: 'get_facility_states' });
+    }
+    operations.push(SAVE_SESSION_OP);
+    const batch = await runApiBatch(operations);
+    const response = batch && Array.isArray(batch.results) ? batch.results[0] : null;
     if (!response || !response.success) {
         notifyUser(t('alerts.roll_lock_failed', { message: response && response.message ? response.message : 'unknown error' }));
         return;
     }
-    await refreshSessionState();
-    renderOrdersPanel(facilityId);
+    await refreshSessionState(batch.state);
     addLogEntry(t('alerts.roll_locked'), 'event');
+    if (!evaluate) {
+        renderOrdersPanel(facilityId);
+        reportBatchSave(batch, 1, 'lock_order_roll');
+        return;
+    }
+    const evaluated = batch.results[1];
+    if (!evaluated || !evaluated.success) {
+        renderOrdersPanel(facilityId);
+        notifyEvaluateFailed(evaluated);
+        return;
+    }
+    await showOrderEvaluation(facilityId, orderId, evaluated, batch.results[2]);
+    reportBatchSave(batch, 3, 'evaluate_order');
 }
 
 async function evaluateOrder(orderId) {
@@ -1476,15 +1503,29 @@ async function evaluateOrder(orderId) {
         notifyUser(t('alerts.pywebview_unavailable'));
         return;
     }
-    const response = await window.pywebview.api.evaluate_order(facilityId, orderId);
+    const batch = await runApiBatch([
+        { method: 'evaluate_order', params: [facilityId, orderId] },
+        { method: 'get_facility_states' },
+        SAVE_SESSION_OP
+    ]);
+    const response = batch && Array.isArray(batch.results) ? batch.results[0] : null;
     if (!response || !response.success) {
-        const rawMessage = response && response.message ? response.message : 'unknown error';
-        const message = formatFormulaErrorMessage(rawMessage);
-        notifyUser(t('alerts.evaluate_failed', { message }));
+        notifyEvaluateFailed(response);
         return;
     }
-    await refreshSessionState();
-    await refreshFacilityStates();
+    await refreshSessionState(batch.state);
+    await showOrderEvaluation(facilityId, orderId, response, batch.results[1]);
+    reportBatchSave(batch, 2, 'evaluate_order');
+}
+
+function notifyEvaluateFailed(response) {
+    const rawMessage = response && response.message ? response.message : 'unknown error';
+    const message = formatFormulaErrorMessage(rawMessage);
+    notifyUser(t('alerts.evaluate_failed', { message }));
+}
+
+async function showOrderEvaluation(facilityId, orderId, response, facilityStates) {
+    await refreshFacilityStates(facilityStates);
     renderOrdersPanel(facilityId);
     renderSlotBubbles(appState.facilityById[facilityId], getFacilityEntry(facilityId));
     renderNpcTab(facilityId);
@@ -1493,7 +1534,6 @@ async function evaluateOrder(orderId) {
     addLogEntry(summary, 'event');
     showToast(summary, 'success');
     handleEventNotifications(response.events);
-    await autoSaveSession('evaluate_order');
 }
 
 async function evaluateAllReady() {
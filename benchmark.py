@@ -0,0 +1,186 @@
+"""
+Engine benchmark suite on synthetic large bastions.
+
+Results are written as JSON (default: data/benchmarks/) so runs of different
+commits on the same machine can be compared:
+    python benchmark.py --facilities 200 --npcs 400 --orders 300
+    python benchmark.py --compare data/benchmarks/<older>.json
+"""
+import argparse
+import copy
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+APP_DIR = Path(__file__).parent / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from core_engine.config_manager import ConfigManager
+from core_engine.facility_manager import FacilityManager
+from core_engine.ledger import Ledger
+from core_engine.logger import quiet_logging
+from core_engine.session_manager import SessionManager
+from core_engine.synthetic import (
+    SYNTHETIC_FORMULA,
+    SYNTHETIC_STAT,
+    build_synthetic_session,
+    mark_orders_ready,
+    write_synthetic_root,
+)
+
+ROOT_DIR = Path(__file__).parent
+RESULTS_DIR = ROOT_DIR / "data" / "benchmarks"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time engine hot paths on a synthetic bastion.")
+    parser.add_argument("--facilities", type=int, default=100)
+    parser.add_argument("--npcs", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=150)
+    parser.add_argument("--items", type=int, default=1000, help="inventory entries")
+    parser.add_argument("--audit", type=int, default=10000, help="audit log entries")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", default=[], help="run only this benchmark (repeatable)")
+    parser.add_argument("--output", help="result file (default: data/benchmarks/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    return parser.parse_args(argv)
+
+
+def measure(setup, func, repeat):
+    samples = []
+    for _ in range(repeat):
+        arg = setup()
+        started = time.perf_counter()
+        func(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "max_ms": max(samples),
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_suite(args, work_dir):
+    synth_root = work_dir / "root"
+    pack = write_synthetic_root(synth_root, ROOT_DIR, args.facilities)
+    config_manager = ConfigManager(synth_root)
+    ledger = Ledger(synth_root, config_manager)
+    fm = FacilityManager(synth_root, ledger, config_manager)
+    base_state = build_synthetic_session(pack, args.npcs, args.orders, args.items, args.audit)
+    ready_state = copy.deepcopy(base_state)
+    mark_orders_ready(ready_state, locked=False)
+    locked_state = copy.deepcopy(base_state)
+    mark_orders_ready(locked_state, locked=True)
+    session_manager = SessionManager(str(work_dir / "sessions"))
+    saved_state = copy.deepcopy(base_state)
+    session_manager.create_session(saved_state)
+    session_file = saved_state["_session_filename"]
+
+    def fresh(state):
+        def setup():
+            session = copy.deepcopy(state)
+            fm.bind_session(session)
+            return session
+        return setup
+
+    def load_packs(root):
+        manager = ConfigManager(root)
+        return FacilityManager(root, Ledger(root, manager), manager)
+
+    effects = [{"gold": 1}, {"item": f"item_{args.items // 2}", "qty": 1}, {"stat": SYNTHETIC_STAT, "delta": 1}, {"log": "bench"}]
+
+    benchmarks = {
+        "advance_turn": (fresh(base_state), fm.advance_turn),
+        "evaluate_ready_orders": (fresh(locked_state), fm.evaluate_ready_orders),
+        "roll_and_evaluate_ready_orders": (fresh(ready_state), fm.roll_and_evaluate_ready_orders),
+        "ledger_apply_effects_x100": (
+            fresh(base_state),
+            lambda s: [ledger.apply_effects(s, effects) for _ in range(100)],
+        ),
+        "formula_engine_x100": (
+            fresh(base_state),
+            lambda s: [fm.run_formula(s, SYNTHETIC_FORMULA) for _ in range(100)],
+        ),
+        "resolve_facility_states": (fresh(locked_state), fm.resolve_facility_states),
+        "session_save": (lambda: copy.deepcopy(base_state), session_manager.create_session),
+        "session_load": (lambda: session_file, session_manager.load_session),
+        "pack_loading": (lambda: synth_root, load_packs),
+    }
+
+    results = {}
+    for name, (setup, func) in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(setup, func, args.repeat)
+        print(f"{name:34s} median {results[name]['median_ms']:10.3f} ms  (min {results[name]['min_ms']:.3f})")
+    return results
+
+
+def compare(current, previous_path):
+    previous = json.loads(Path(previous_path).read_text(encoding="utf-8"))
+    print(f"\nCompared to {previous_path} ({previous.get('meta', {}).get('commit')}):")
+    for name, result in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old or not old.get("median_ms"):
+            print(f"{name:34s} (no previous result)")
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        print(f"{name:34s} {old['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms  x{ratio:.2f}")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    quiet_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(args, Path(tmp))
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.node(),
+            "sizes": {
+                "facilities": args.facilities,
+                "npcs": args.npcs,
+                "orders": args.orders,
+                "items": args.items,
+                "audit": args.audit,
+            },
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
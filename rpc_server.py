@@ -0,0 +1,435 @@
+"""
+Headless JSON-RPC server for the Bastion Manager Api (no webview required).
+
+    python rpc_server.py --host 127.0.0.1 --port 8765
+
+POST /rpc   JSON-RPC 2.0 request or batch; "method" is any public Api method.
+GET  /ws    WebSocket; same JSON-RPC messages. Call "subscribe" to receive
+            "state_patch" notifications ({version, full, patch | session_state}) after every change.
+GET  /      server info and method list.
+
+Session mutations (Api methods marked @_session_writer) run one at a time on a dedicated worker
+thread. Session readers (@_session_reader) and calls that do not touch the session (catalog,
+config, packs) run concurrently on a thread pool; readers still take the Api's shared session
+lock. get_current_session / get_session_delta are answered from the last published copy, so
+dashboards never wait for the DM's writes.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import inspect
+import json
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+APP_DIR = Path(__file__).parent / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from core_engine.logger import setup_logger
+from core_engine.session_manager import client_session_state
+from core_engine.state_delta import StateDelta
+
+logger = setup_logger("rpc_server")
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+def session_access(handler: Any) -> Optional[str]:
+    """
+    "read" / "write" for Api methods marked @_session_reader / @_session_writer (the mark is
+    copied through functools.wraps), None for methods that never touch the session.
+    """
+    return getattr(handler, "session_access", None)
+
+
+class RpcServer:
+    def __init__(self, api: Any, host: str = "127.0.0.1", port: int = 8765, workers: int = 8) -> None:
+        self._api = api
+        self._host = host
+        self._port = port
+        self._read_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rpc-read")
+        self._write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpc-write")
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._delta = StateDelta(client_session_state)
+        self._published: Optional[Dict[str, Any]] = None
+        self._subscribers: Set["_WebSocket"] = set()
+
+    async def serve_forever(self) -> None:
+        self._write_lock = asyncio.Lock()
+        server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+        logger.info(f"RPC server listening on http://{self._host}:{self._port}")
+        async with server:
+            await server.serve_forever()
+
+    # ===== DISPATCH =====
+
+    async def call(self, method: Any, params: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        Run one Api call. Returns (result, error) with error in JSON-RPC form.
+        """
+        if method == "subscribe":
+            return {"success": True}, None
+        if method == "get_current_session":
+            return await self._published_state(), None
+        if method == "get_session_delta":
+            if isinstance(params, list):
+                since = params[0] if params else None
+            else:
+                since = params.get("since_version") if isinstance(params, dict) else None
+            return await self._published_delta(since), None
+        if not isinstance(method, str) or method.startswith("_"):
+            return None, {"code": METHOD_NOT_FOUND, "message": f"Method not found: {method}"}
+        handler = getattr(self._api, method, None)
+        if not callable(handler):
+            return None, {"code": METHOD_NOT_FOUND, "message": f"Method not found: {method}"}
+        if params is None:
+            args, kwargs = (), {}
+        elif isinstance(params, list):
+            args, kwargs = tuple(params), {}
+        elif isinstance(params, dict):
+            args, kwargs = (), params
+        else:
+            return None, {"code": INVALID_PARAMS, "message": "params must be an array or object"}
+        try:
+            inspect.signature(handler).bind(*args, **kwargs)
+        except TypeError as e:
+            return None, {"code": INVALID_PARAMS, "message": str(e)}
+        bound = partial(handler, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        try:
+            if session_access(handler) != "write":
+                return await loop.run_in_executor(self._read_pool, bound), None
+            async with self._write_lock:
+                result = await loop.run_in_executor(self._write_pool, bound)
+                message = await loop.run_in_executor(self._write_pool, self._publish)
+            if message is not None:
+                self._broadcast(message)
+            return result, None
+        except Exception as e:
+            logger.exception(f"RPC {method} failed")
+            return None, {"code": INTERNAL_ERROR, "message": str(e)}
+
+    async def handle_rpc(self, payload: Any) -> Any:
+        if isinstance(payload, list):
+            if not payload:
+                return _rpc_error(None, INVALID_REQUEST, "Empty batch")
+            responses = [await self._handle_single(item) for item in payload]
+            return [r for r in responses if r is not None] or None
+        return await self._handle_single(payload)
+
+    async def _handle_single(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            return _rpc_error(request.get("id") if isinstance(request, dict) else None, INVALID_REQUEST, "Invalid request")
+        result, error = await self.call(request.get("method"), request.get("params"))
+        if "id" not in request:
+            return None
+        if error:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": error}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    # ===== PUBLISHED STATE =====
+
+    def _publish(self) -> Optional[str]:
+        """
+        Diff the live session against the published copy and serialize the notification.
+        Runs on the write thread while the caller holds the write lock. Returns None if
+        nothing changed.
+        """
+        session = self._api.current_session
+        if not session:
+            self._published = None
+            return None
+        delta = self._delta.delta(session, self._delta.version)
+        if not delta.get("full") and not delta.get("patch"):
+            return None
+        # Readers get the client copy serialized on first request; it only changes in _publish.
+        self._published = {"version": delta["version"], "body": None}
+        return json.dumps({"jsonrpc": "2.0", "method": "state_patch", "params": delta})
+
+    async def _current_published(self) -> Optional[Dict[str, Any]]:
+        """
+        The published {version, body}, serializing the client copy on first request.
+        """
+        published = self._published
+        if published is None or published["body"] is None:
+            loop = asyncio.get_running_loop()
+            message = None
+            async with self._write_lock:
+                if self._published is None:
+                    message = await loop.run_in_executor(self._write_pool, self._publish)
+                published = self._published
+                if published is not None and published["body"] is None:
+                    # The client copy is only mutated by _publish, which needs the write lock.
+                    published["body"] = await loop.run_in_executor(
+                        self._write_pool, json.dumps, self._delta.client_copy()
+                    )
+            if message is not None:
+                self._broadcast(message)
+        return published
+
+    async def _published_state(self) -> Any:
+        published = await self._current_published()
+        if published is None:
+            return {}
+        return _RawJson(published["body"])
+
+    async def _published_delta(self, since_version: Any) -> Dict[str, Any]:
+        published = await self._current_published()
+        if published is None:
+            return {"success": False, "message": "No session loaded"}
+        version = published["version"]
+        if since_version == version:
+            return {"success": True, "full": False, "version": version, "patch": []}
+        return {"success": True, "full": True, "version": version, "session_state": _RawJson(published["body"])}
+
+    def _broadcast(self, message: str) -> None:
+        for ws in list(self._subscribers):
+            ws.send_nowait(message)
+
+    # ===== HTTP / WEBSOCKET =====
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await _read_http_request(reader)
+            if request is None:
+                return
+            method, path, headers, body = request
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_websocket(reader, writer, headers)
+                return
+            if method == "POST" and path == "/rpc":
+                try:
+                    payload = json.loads(body.decode("utf-8"))
+                except ValueError:
+                    response: Any = _rpc_error(None, PARSE_ERROR, "Parse error")
+                else:
+                    response = await self.handle_rpc(payload)
+                await _write_http(writer, 200 if response is not None else 204, response)
+            elif method == "GET" and path == "/":
+                methods = sorted(m for m in dir(self._api) if not m.startswith("_") and callable(getattr(self._api, m)))
+                await _write_http(writer, 200, {"name": "bastion-manager", "methods": methods + ["subscribe"]})
+            else:
+                await _write_http(writer, 404, {"error": "Not found"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: Dict[str, str]) -> None:
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode("ascii")
+        )
+        await writer.drain()
+        ws = _WebSocket(reader, writer)
+        sender = asyncio.create_task(ws.run_sender())
+        try:
+            while True:
+                text = await ws.receive()
+                if text is None:
+                    break
+                try:
+                    payload = json.loads(text)
+                except ValueError:
+                    ws.send_nowait(json.dumps(_rpc_error(None, PARSE_ERROR, "Parse error")))
+                    continue
+                if isinstance(payload, dict) and payload.get("method") == "subscribe":
+                    self._subscribers.add(ws)
+                # Handle calls concurrently so one slow read does not hold up this socket.
+                asyncio.create_task(self._answer(ws, payload))
+        finally:
+            self._subscribers.discard(ws)
+            ws.close()
+            try:
+                await asyncio.wait_for(sender, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                sender.cancel()
+
+    async def _answer(self, ws: "_WebSocket", payload: Any) -> None:
+        response = await self.handle_rpc(payload)
+        if response is not None:
+            ws.send_nowait(_dumps(response))
+
+
+class _RawJson:
+    """
+    Already serialized JSON spliced into a response without parsing it again.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+def _dumps(value: Any) -> str:
+    raw: List[str] = []
+
+    def default(obj: Any) -> Any:
+        if isinstance(obj, _RawJson):
+            raw.append(obj.text)
+            return f"\x00raw{len(raw) - 1}\x00"
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    text = json.dumps(value, default=default)
+    for idx, chunk in enumerate(raw):
+        text = text.replace(json.dumps(f"\x00raw{idx}\x00"), chunk, 1)
+    return text
+
+
+class _WebSocket:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+
+    def send_nowait(self, text: str) -> None:
+        self._queue.put_nowait(_ws_frame(0x1, text.encode("utf-8")))
+
+    def close(self) -> None:
+        self._queue.put_nowait(None)
+
+    async def run_sender(self) -> None:
+        while True:
+            frame = await self._queue.get()
+            if frame is None:
+                break
+            try:
+                self._writer.write(frame)
+                await self._writer.drain()
+            except ConnectionError:
+                break
+
+    async def receive(self) -> Optional[str]:
+        """
+        Next text message (fragments joined), None when the peer closed.
+        """
+        chunks: List[bytes] = []
+        while True:
+            try:
+                head = await self._reader.readexactly(2)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return None
+            fin = head[0] & 0x80
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self._reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self._reader.readexactly(8))[0]
+            if length > MAX_BODY_BYTES:
+                return None
+            mask = await self._reader.readexactly(4) if head[1] & 0x80 else None
+            data = await self._reader.readexactly(length)
+            if mask:
+                data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+            if opcode == 0x8:
+                self._queue.put_nowait(_ws_frame(0x8, data[:2]))
+                return None
+            if opcode == 0x9:
+                self._queue.put_nowait(_ws_frame(0xA, data))
+                continue
+            if opcode in (0x1, 0x2, 0x0):
+                chunks.append(data)
+                if fin:
+                    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def _read_http_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) < 2:
+        return None
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_BYTES:
+        return None
+    body = await reader.readexactly(length) if length else b""
+    return parts[0].upper(), parts[1].split("?", 1)[0], headers, body
+
+
+async def _write_http(writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+    reasons = {200: "OK", 204: "No Content", 404: "Not Found"}
+    body = _dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {reasons.get(status, 'OK')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("ascii")
+        + body
+    )
+    await writer.drain()
+
+
+def _rpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Bastion Manager Api over HTTP/WebSocket JSON-RPC.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8, help="threads for calls that do not touch the session")
+    parser.add_argument("--session", help="session file to load on start")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from app import Api
+
+    api = Api()
+    if args.session:
+        result = api.load_session(args.session)
+        if not result.get("success"):
+            logger.error(f"Could not load session {args.session}: {result.get('message')}")
+            return 1
+    server = RpcServer(api, args.host, args.port, args.workers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
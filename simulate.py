@@ -0,0 +1,61 @@
+"""
+Headless campaign simulation for balance and load testing.
+
+Example:
+    python simulate.py --campaigns 8 --turns 1000 --workers 4 --output sim.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).parent / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from core_engine.campaign_sim import DEFAULT_POLICY, run_campaigns
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless bastion campaigns and report economy statistics.")
+    parser.add_argument("--campaigns", type=int, default=1, help="number of independent campaigns")
+    parser.add_argument("--turns", type=int, default=DEFAULT_POLICY["turns"], help="turns per campaign")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 = cpu count)")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first campaign")
+    parser.add_argument("--pack", action="append", default=[], help="only build facilities from this pack_id (repeatable)")
+    parser.add_argument("--max-facilities", type=int, default=0, help="limit number of built facilities (0 = all)")
+    parser.add_argument("--gold", type=int, default=DEFAULT_POLICY["gold"], help="starting gold")
+    parser.add_argument("--npc-level", type=int, default=DEFAULT_POLICY["npc_level"], choices=[1, 2, 3])
+    parser.add_argument("--order-choice", default=DEFAULT_POLICY["order_choice"], choices=["random", "first", "longest", "shortest"])
+    parser.add_argument("--no-auto-start", action="store_true", help="do not start orders automatically")
+    parser.add_argument("--no-evaluate", action="store_true", help="do not roll/evaluate ready orders")
+    parser.add_argument("--fast-forward", action="store_true", help="use advance_turns to skip idle turns")
+    parser.add_argument("--output", help="write full JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep engine INFO logging enabled")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    policy = {
+        "turns": args.turns,
+        "packs": args.pack,
+        "max_facilities": args.max_facilities,
+        "gold": args.gold,
+        "npc_level": args.npc_level,
+        "auto_start_orders": not args.no_auto_start,
+        "order_choice": args.order_choice,
+        "evaluate": not args.no_evaluate,
+        "fast_forward": args.fast_forward,
+        "quiet": not args.verbose,
+    }
+    report = run_campaigns(Path(__file__).parent, policy, args.campaigns, args.workers, args.seed)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps({k: v for k, v in report.items() if k != "results"}, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())